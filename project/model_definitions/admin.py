@@ -1,4 +1,8 @@
+import json
+
 from django.contrib import admin
+
+from .connectors.landing import record_payload
 from .models import (
     ModelDefinition, 
     ModelDefinitionHistory, 
@@ -6,7 +10,11 @@ from .models import (
     DataBatchStatus, 
     DataUploadTemplate, 
     DataUpload, 
+    DataUploadIngestJob,
     APIUploadLog,
+    APIUploadRollup,
+    APIRecord,
+    RawLandingSegment,
     DocumentTypeConfig,
     CalculationConfig,
     ConversionConfig,
@@ -14,6 +22,7 @@ from .models import (
     LineOfBusiness,
     ReportType,
     IFRSEngineResult,
+    Run,
     SubmittedReport
 )
 
@@ -54,26 +63,26 @@ class ModelDefinitionAdmin(admin.ModelAdmin):
     ]
     
     def get_product_type(self, obj):
-        if obj.config and 'generalInfo' in obj.config:
-            return obj.config['generalInfo'].get('productType', 'Not specified')
+        if obj.resolved_config and 'generalInfo' in obj.resolved_config:
+            return obj.resolved_config['generalInfo'].get('productType', 'Not specified')
         return 'Not specified'
     get_product_type.short_description = 'Product Type'
     
     def get_measurement_model(self, obj):
-        if obj.config and 'generalInfo' in obj.config:
-            return obj.config['generalInfo'].get('measurementModel', 'GMM')
+        if obj.resolved_config and 'generalInfo' in obj.resolved_config:
+            return obj.resolved_config['generalInfo'].get('measurementModel', 'GMM')
         return 'GMM'
     get_measurement_model.short_description = 'Measurement Model'
     
     def get_status(self, obj):
-        if obj.config and 'generalInfo' in obj.config:
-            return obj.config['generalInfo'].get('status', 'draft')
+        if obj.resolved_config and 'generalInfo' in obj.resolved_config:
+            return obj.resolved_config['generalInfo'].get('status', 'draft')
         return 'draft'
     get_status.short_description = 'Status'
     
     def get_description(self, obj):
-        if obj.config and 'generalInfo' in obj.config:
-            return obj.config['generalInfo'].get('description', '')
+        if obj.resolved_config and 'generalInfo' in obj.resolved_config:
+            return obj.resolved_config['generalInfo'].get('description', '')
         return ''
     get_description.short_description = 'Description'
     
@@ -92,26 +101,26 @@ class ModelDefinitionHistoryAdmin(admin.ModelAdmin):
     readonly_fields = ['saved_at', 'get_product_type', 'get_measurement_model', 'get_status', 'get_description']
     
     def get_product_type(self, obj):
-        if obj.config and 'generalInfo' in obj.config:
-            return obj.config['generalInfo'].get('productType', 'Not specified')
+        if obj.resolved_config and 'generalInfo' in obj.resolved_config:
+            return obj.resolved_config['generalInfo'].get('productType', 'Not specified')
         return 'Not specified'
     get_product_type.short_description = 'Product Type'
     
     def get_measurement_model(self, obj):
-        if obj.config and 'generalInfo' in obj.config:
-            return obj.config['generalInfo'].get('measurementModel', 'GMM')
+        if obj.resolved_config and 'generalInfo' in obj.resolved_config:
+            return obj.resolved_config['generalInfo'].get('measurementModel', 'GMM')
         return 'GMM'
     get_measurement_model.short_description = 'Measurement Model'
     
     def get_status(self, obj):
-        if obj.config and 'generalInfo' in obj.config:
-            return obj.config['generalInfo'].get('status', 'draft')
+        if obj.resolved_config and 'generalInfo' in obj.resolved_config:
+            return obj.resolved_config['generalInfo'].get('status', 'draft')
         return 'draft'
     get_status.short_description = 'Status'
     
     def get_description(self, obj):
-        if obj.config and 'generalInfo' in obj.config:
-            return obj.config['generalInfo'].get('description', '')
+        if obj.resolved_config and 'generalInfo' in obj.resolved_config:
+            return obj.resolved_config['generalInfo'].get('description', '')
         return ''
     get_description.short_description = 'Description'
     
@@ -215,6 +224,44 @@ class DataUploadTemplateAdmin(admin.ModelAdmin):
     ]
 
 
+@admin.register(DataUploadIngestJob)
+class DataUploadIngestJobAdmin(admin.ModelAdmin):
+    list_display = ['job_id', 'batch', 'status', 'total_items', 'created_count', 'created_by', 'created_on', 'completed_at']
+    list_filter = ['status', 'created_on']
+    search_fields = ['job_id', 'batch__batch_id']
+    readonly_fields = ['job_id', 'created_on', 'modified_on', 'completed_at']
+
+
+@admin.register(APIRecord)
+class APIRecordAdmin(admin.ModelAdmin):
+    list_display = ['id', 'api_config', 'record_key', 'watermark_value', 'upload_log', 'modified_on']
+    list_filter = ['api_config']
+    search_fields = ['record_key']
+    readonly_fields = ['get_landed_payload', 'created_on', 'modified_on']
+
+    def get_landed_payload(self, obj):
+        if not obj.segment_path:
+            return '-'
+        return json.dumps(record_payload(obj), default=str, indent=2)
+    get_landed_payload.short_description = 'Landed Payload'
+
+
+@admin.register(APIUploadRollup)
+class APIUploadRollupAdmin(admin.ModelAdmin):
+    list_display = ['reporting_date', 'source', 'line_of_business', 'sum_of_premiums', 'sum_of_paid_claims', 'sum_of_commissions', 'upload_count']
+    list_filter = ['source', 'reporting_date']
+    search_fields = ['source', 'line_of_business']
+    readonly_fields = ['modified_on']
+
+
+@admin.register(RawLandingSegment)
+class RawLandingSegmentAdmin(admin.ModelAdmin):
+    list_display = ['path', 'source', 'partition_date', 'kind', 'record_count', 'byte_size', 'created_on']
+    list_filter = ['kind', 'compression', 'source', 'partition_date']
+    search_fields = ['path', 'source']
+    readonly_fields = ['created_on']
+
+
 @admin.register(APIUploadLog)
 class APIUploadLogAdmin(admin.ModelAdmin):
     list_display = ['reporting_date', 'upload_date', 'sum_of_premiums', 'sum_of_paid_claims', 'sum_of_commissions', 'status']
@@ -230,7 +277,10 @@ class APIUploadLogAdmin(admin.ModelAdmin):
             'fields': ['sum_of_premiums', 'sum_of_paid_claims', 'sum_of_commissions']
         }),
         ('Related Upload', {
-            'fields': ['data_upload']
+            'fields': ['data_upload', 'api_config']
+        }),
+        ('Run Progress', {
+            'fields': ['pages_fetched', 'records_fetched', 'records_inserted', 'records_updated', 'watermark_start', 'watermark_end', 'completed_at']
         }),
         ('API Data', {
             'fields': ['api_payload', 'error_message']
@@ -427,6 +477,7 @@ class SubmittedReportAdmin(admin.ModelAdmin):
     search_fields = ['report_type', 'run_id', 'model_type']
     ordering = ['-assign_year', '-assign_quarter', '-created_on']
     readonly_fields = ['created_on', 'modified_on', 'submitted_by']
+    raw_id_fields = ['ifrs_engine_result']
     
     fieldsets = [
         ('Report Information', {
@@ -436,9 +487,17 @@ class SubmittedReportAdmin(admin.ModelAdmin):
             'fields': ['assign_year', 'assign_quarter']
         }),
         ('Metadata', {
-            'fields': ['ifrs_engine_result_id', 'model_used', 'batch_used', 'line_of_business_used', 'conversion_engine_used', 'ifrs_engine_used']
+            'fields': ['ifrs_engine_result', 'model_used', 'batch_used', 'line_of_business_used', 'conversion_engine_used', 'ifrs_engine_used']
         }),
         ('Audit', {
             'fields': ['submitted_by', 'created_on', 'modified_on']
         }),
     ]
+
+
+@admin.register(Run)
+class RunAdmin(admin.ModelAdmin):
+    list_display = ['run_id', 'year', 'quarter', 'model_type', 'status', 'started_at', 'completed_at', 'result_count', 'error_count']
+    list_filter = ['model_type', 'year', 'quarter', 'status']
+    search_fields = ['run_id']
+    readonly_fields = ['modified_on']
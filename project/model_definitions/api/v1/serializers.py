@@ -1,4 +1,5 @@
 import os
+import zipfile
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from drf_yasg.utils import swagger_auto_schema
@@ -14,7 +15,9 @@ from model_definitions.models import (
     DataBatchStatus, 
     DataUploadTemplate, 
     DataUpload, 
+    DataUploadIngestJob,
     APIUploadLog,
+    APIUploadRollup,
     DocumentTypeConfig,
     CalculationConfig,
     ConversionConfig,
@@ -29,6 +32,15 @@ from model_definitions.models import (
     InputDataReference,
     SubmittedReport
 )
+from model_definitions.utils.ingest import (
+    ArchiveTooLarge,
+    bulk_create_uploads,
+    get_bulk_upload_max_items,
+    read_archive_files,
+    run_ingest_job,
+    validate_upload_file,
+)
+from model_definitions.utils.json_patch import config_hash
 
 User = get_user_model()
 
@@ -48,6 +60,9 @@ class ModelDefinitionListSerializer(serializers.ModelSerializer):
             'version',
             'definition_type',
             'config',
+            'measurement_model',
+            'product_type',
+            'status',
             'created_by',
             'created_by_name',
             'last_modified_by',
@@ -61,8 +76,8 @@ class ModelDefinitionListSerializer(serializers.ModelSerializer):
             'modified_on',
         ]
         read_only_fields = [
-            'id', 'created_by', 'last_modified_by', 'locked_by', 
-            'locked_at', 'created_on', 'modified_on'
+            'id', 'measurement_model', 'product_type', 'status', 'created_by',
+            'last_modified_by', 'locked_by', 'locked_at', 'created_on', 'modified_on'
         ]
 
     def get_can_edit(self, obj):
@@ -96,6 +111,15 @@ class ModelDefinitionListSerializer(serializers.ModelSerializer):
         return None
 
 
+class ModelDefinitionSummarySerializer(ModelDefinitionListSerializer):
+    """
+    List entry without ``config``, for pickers that only need to name a model.
+    """
+
+    class Meta(ModelDefinitionListSerializer.Meta):
+        fields = [field for field in ModelDefinitionListSerializer.Meta.fields if field != 'config']
+
+
 class ModelDefinitionDetailSerializer(serializers.ModelSerializer):
     created_by_name = serializers.SerializerMethodField()
     last_modified_by_name = serializers.SerializerMethodField()
@@ -112,6 +136,9 @@ class ModelDefinitionDetailSerializer(serializers.ModelSerializer):
             'version',
             'definition_type',
             'config',
+            'measurement_model',
+            'product_type',
+            'status',
             'created_by',
             'created_by_name',
             'last_modified_by',
@@ -127,8 +154,8 @@ class ModelDefinitionDetailSerializer(serializers.ModelSerializer):
             'modified_on',
         ]
         read_only_fields = [
-            'id', 'created_by', 'last_modified_by', 'locked_by', 
-            'locked_at', 'created_on', 'modified_on'
+            'id', 'measurement_model', 'product_type', 'status', 'created_by',
+            'last_modified_by', 'locked_by', 'locked_at', 'created_on', 'modified_on'
         ]
 
     def get_can_edit(self, obj):
@@ -257,13 +284,8 @@ class ModelDefinitionUpdateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         request = self.context.get('request')
         
-        ModelDefinitionHistory.objects.create(
-            model=instance,
-            name=instance.name,
-            version=instance.version,
-            config=instance.config,
-            modified_by=request.user
-        )
+        # No-op when the current version is already recorded
+        ModelDefinitionHistory.record(instance, request.user)
         
         if 'config' in validated_data:
             config = validated_data['config']
@@ -273,16 +295,30 @@ class ModelDefinitionUpdateSerializer(serializers.ModelSerializer):
                 instance.name = general_info['modelName']
             
             version_parts = instance.version.replace('v', '').split('.')
-            if len(version_parts) >= 2:
+            if len(version_parts) >= 2 and config_hash(config) != config_hash(instance.config):
                 minor = int(version_parts[1]) + 1
                 instance.version = f"v{version_parts[0]}.{minor}"
         
         instance.last_modified_by = request.user
         
-        return super().update(instance, validated_data)
+        instance = super().update(instance, validated_data)
+        ModelDefinitionHistory.record(instance, request.user)
+        return instance
+
+
+class ModelDefinitionHistoryListSerializer(serializers.ListSerializer):
+    """
+    Reconstructs the configs of all listed versions in one pass per model.
+    """
+
+    def to_representation(self, data):
+        entries = list(data.all() if hasattr(data, 'all') else data)
+        ModelDefinitionHistory.resolve_configs(entries)
+        return super().to_representation(entries)
 
 
 class ModelDefinitionHistorySerializer(serializers.ModelSerializer):
+    config = serializers.SerializerMethodField()
     modified_by_name = serializers.SerializerMethodField()
     model_name = serializers.CharField(source='model.name', read_only=True)
 
@@ -303,6 +339,42 @@ class ModelDefinitionHistorySerializer(serializers.ModelSerializer):
             'id', 'model', 'model_name', 'name', 'version',
             'config', 'saved_at', 'modified_by', 'modified_by_name'
         )
+        list_serializer_class = ModelDefinitionHistoryListSerializer
+
+    def get_config(self, obj):
+        return obj.resolved_config
+
+    def get_modified_by_name(self, obj):
+        if obj.modified_by:
+            full_name = obj.modified_by.get_full_name().strip()
+            if full_name:
+                return full_name
+            return f"{obj.modified_by.username}"
+        return "Unknown"
+
+
+class ModelDefinitionHistorySummarySerializer(serializers.ModelSerializer):
+    """
+    Version metadata without the config, for history listings.
+    """
+    modified_by_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ModelDefinitionHistory
+        fields = [
+            'id',
+            'model',
+            'sequence',
+            'name',
+            'version',
+            'saved_at',
+            'modified_by',
+            'modified_by_name',
+            'config_size',
+            'config_hash',
+            'is_snapshot',
+        ]
+        read_only_fields = fields
 
     def get_modified_by_name(self, obj):
         if obj.modified_by:
@@ -448,10 +520,54 @@ class APIUploadLogSerializer(serializers.ModelSerializer):
             'data_upload_id',
             'api_payload',
             'error_message',
+            'api_config',
+            'pages_fetched',
+            'records_fetched',
+            'records_inserted',
+            'records_updated',
+            'watermark_start',
+            'watermark_end',
+            'resume_token',
+            'replay_count',
+            'rollup_totals',
+            'completed_at',
             'created_on',
             'modified_on',
         ]
-        read_only_fields = ['id', 'upload_date', 'created_on', 'modified_on']
+        read_only_fields = [
+            'id', 'upload_date', 'api_config', 'pages_fetched', 'records_fetched', 'records_inserted',
+            'records_updated', 'watermark_start', 'watermark_end', 'resume_token', 'replay_count',
+            'rollup_totals', 'completed_at', 'created_on', 'modified_on'
+        ]
+
+
+class APIUploadRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = APIUploadRollup
+        fields = [
+            'id',
+            'reporting_date',
+            'source',
+            'line_of_business',
+            'sum_of_premiums',
+            'sum_of_paid_claims',
+            'sum_of_commissions',
+            'upload_count',
+            'record_count',
+            'modified_on',
+        ]
+        read_only_fields = fields
+
+
+class DataBatchStatusListSerializer(serializers.ListSerializer):
+    """
+    Loads the batches of all listed status records in one query.
+    """
+
+    def to_representation(self, data):
+        statuses = list(data.all() if hasattr(data, 'all') else data)
+        DataBatchStatus.attach_batches(statuses)
+        return super().to_representation(statuses)
 
 
 class DataBatchStatusSerializer(serializers.ModelSerializer):
@@ -471,6 +587,7 @@ class DataBatchStatusSerializer(serializers.ModelSerializer):
             'batch_status_display',
         ]
         read_only_fields = ['id', 'batch_name', 'batch_type_display', 'batch_status_display']
+        list_serializer_class = DataBatchStatusListSerializer
     
     def get_batch_name(self, obj):
         batch = obj.batch
@@ -523,8 +640,8 @@ class BulkUploadSerializer(serializers.Serializer):
     def validate_batch_id(self, value):
         try:
             batch = DataUploadBatch.objects.get(batch_id=value)
-            if batch.batch_status != 'draft':
-                raise ValidationError("Cannot add uploads to a batch that is not in draft status")
+            if batch.batch_status != 'pending':
+                raise ValidationError("Cannot add uploads to a batch that is not in pending status")
         except DataUploadBatch.DoesNotExist:
             raise ValidationError("Batch not found")
         return value
@@ -533,8 +650,9 @@ class BulkUploadSerializer(serializers.Serializer):
         if not isinstance(value, list):
             raise ValidationError("Uploads must be a list")
         
-        if len(value) < 1 or len(value) > 10:
-            raise ValidationError("Uploads list must contain between 1 and 10 items")
+        max_items = get_bulk_upload_max_items()
+        if len(value) < 1 or len(value) > max_items:
+            raise ValidationError(f"Uploads list must contain between 1 and {max_items} items")
         
         required_fields = ['source', 'insurance_type', 'data_type', 'quarter', 'year']
         
@@ -555,21 +673,156 @@ class BulkUploadSerializer(serializers.Serializer):
         batch = DataUploadBatch.objects.get(batch_id=batch_id)
         request = self.context.get('request')
         
-        created_uploads = []
         for upload_data in uploads_data:
             file_upload = upload_data.get('file_upload')
             if file_upload:
-                if file_upload.size > 50 * 1024 * 1024:  # 50MB limit
-                    raise ValidationError("File size cannot exceed 50MB")
-                if not file_upload.name.endswith(('.xlsx', '.xls')):
-                    raise ValidationError("Only Excel files (.xlsx, .xls) are allowed")
-            
-            upload_data['batch'] = batch
-            upload_data['uploaded_by'] = request.user
-            upload = DataUpload.objects.create(**upload_data)
-            created_uploads.append(upload)
+                error = validate_upload_file(file_upload)
+                if error:
+                    raise ValidationError(error)
+        
+        return bulk_create_uploads(batch, uploads_data, uploaded_by=request.user)
+
+
+class BulkIngestItemSerializer(serializers.ModelSerializer):
+    file = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Name of the uploaded file or archive member for this upload"
+    )
+    
+    class Meta:
+        model = DataUpload
+        fields = ['source', 'insurance_type', 'data_type', 'quarter', 'year', 'file']
+
+
+class BulkIngestSerializer(serializers.Serializer):
+    """
+    Validates a bulk ingest manifest together with its files.
+
+    Files are sent as repeated ``files`` parts and/or a single zip ``archive``;
+    each manifest item references its file by name.
+    """
+    batch_id = serializers.CharField(required=True)
+    manifest = serializers.JSONField(
+        help_text="List of upload objects with fields: source, insurance_type, data_type, quarter, year, file"
+    )
+    archive = serializers.FileField(required=False)
+    
+    def validate_batch_id(self, value):
+        try:
+            batch = DataUploadBatch.objects.get(batch_id=value)
+        except DataUploadBatch.DoesNotExist:
+            raise ValidationError("Batch not found")
+        if batch.batch_status != 'pending':
+            raise ValidationError("Cannot add uploads to a batch that is not in pending status")
+        return value
+    
+    def validate_manifest(self, value):
+        if not isinstance(value, list):
+            raise ValidationError("Manifest must be a list")
+        
+        max_items = get_bulk_upload_max_items()
+        if len(value) < 1 or len(value) > max_items:
+            raise ValidationError(f"Manifest must contain between 1 and {max_items} items")
+        
+        items = BulkIngestItemSerializer(data=value, many=True)
+        if not items.is_valid():
+            raise ValidationError(items.errors)
         
-        return created_uploads 
+        # Each upload stores (and moves) its own file, so a file can back only one item
+        seen = {}
+        errors = {}
+        for i, item in enumerate(items.validated_data):
+            file_name = item.get('file')
+            if not file_name:
+                continue
+            if file_name in seen:
+                errors[i] = {'file': [f"File '{file_name}' is already used by item {seen[file_name]}"]}
+            else:
+                seen[file_name] = i
+        if errors:
+            raise ValidationError(errors)
+        return items.validated_data
+    
+    def validate_archive(self, value):
+        if not value.name.lower().endswith('.zip'):
+            raise ValidationError("Archive must be a .zip file")
+        return value
+    
+    def validate(self, attrs):
+        request = self.context.get('request')
+        files = {}
+        if request is not None:
+            files.update({file.name: file for file in request.FILES.getlist('files')})
+        
+        if attrs.get('archive'):
+            referenced = {item.get('file') for item in attrs['manifest'] if item.get('file')}
+            try:
+                files.update(read_archive_files(attrs['archive'], referenced))
+            except zipfile.BadZipFile:
+                raise ValidationError({'archive': "Archive is not a valid zip file"})
+            except ArchiveTooLarge as e:
+                raise ValidationError({'archive': str(e)})
+        
+        errors = {}
+        uploads_data = []
+        for i, item in enumerate(attrs['manifest']):
+            item = dict(item)
+            file_name = item.pop('file', '')
+            if file_name:
+                file = files.get(file_name)
+                if file is None:
+                    errors[i] = {'file': [f"File '{file_name}' was not uploaded"]}
+                    continue
+                error = validate_upload_file(file)
+                if error:
+                    errors[i] = {'file': [error]}
+                    continue
+                item['file_upload'] = file
+            uploads_data.append(item)
+        
+        if errors:
+            raise ValidationError({'manifest': errors})
+        
+        attrs['uploads'] = uploads_data
+        return attrs
+    
+    def create(self, validated_data):
+        batch = DataUploadBatch.objects.get(batch_id=validated_data['batch_id'])
+        request = self.context.get('request')
+        try:
+            return run_ingest_job(batch, validated_data['uploads'], created_by=request.user)
+        finally:
+            # Releases the temporary files archive members were spooled to
+            for item in validated_data['uploads']:
+                if item.get('file_upload'):
+                    item['file_upload'].close()
+
+
+class DataUploadIngestJobSerializer(serializers.ModelSerializer):
+    batch_id = serializers.CharField(source='batch.batch_id', read_only=True)
+    upload_ids = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = DataUploadIngestJob
+        fields = [
+            'id',
+            'job_id',
+            'batch_id',
+            'status',
+            'total_items',
+            'created_count',
+            'errors',
+            'upload_ids',
+            'created_by',
+            'completed_at',
+            'created_on',
+            'modified_on',
+        ]
+        read_only_fields = fields
+    
+    def get_upload_ids(self, obj):
+        return list(obj.uploads.order_by('id').values_list('upload_id', flat=True))
 
 
 class DocumentTypeConfigSerializer(serializers.ModelSerializer):
@@ -1178,6 +1431,9 @@ class ReportTypeUpdateSerializer(serializers.ModelSerializer):
 
 class SubmittedReportSerializer(serializers.ModelSerializer):
     submitted_by = serializers.CharField(source='submitted_by.username', read_only=True)
+    ifrs_engine_result_id = serializers.PrimaryKeyRelatedField(
+        source='ifrs_engine_result', queryset=IFRSEngineResult.objects.all()
+    )
     created_at = serializers.DateTimeField(source='created_on', read_only=True)
     
     class Meta:
@@ -1288,7 +1544,7 @@ class IFRSApiConfigSerializer(serializers.ModelSerializer):
             'totalCountJsonpath', 'primaryKeyFields', 'behavior',
             'maxRps', 'retryCount', 'backoffMinMs', 'backoffMaxMs', 'timeoutMs',
             'secretReferences', 'tlsRequired', 'mtlsCerts', 'ipAllowlistNote',
-            'rawLandingMode', 'mappingProfile', 'validationProfile',
+            'rawLandingMode', 'mappingProfile', 'rollupFields', 'validationProfile',
             'owner', 'alertEmails', 'alertWebhooks', 'autoDisableOnFailures',
             'lastTestDate', 'lastTestStatus', 'lastRunDate', 'consecutiveFailures',
             'createdOn', 'modifiedOn'
@@ -1324,6 +1580,7 @@ class IFRSApiConfigSerializer(serializers.ModelSerializer):
             'ipAllowlistNote': {'source': 'ip_allowlist_note'},
             'rawLandingMode': {'source': 'raw_landing_mode'},
             'mappingProfile': {'source': 'mapping_profile'},
+            'rollupFields': {'source': 'rollup_fields'},
             'validationProfile': {'source': 'validation_profile'},
             'alertEmails': {'source': 'alert_emails'},
             'alertWebhooks': {'source': 'alert_webhooks'},
@@ -1356,7 +1613,7 @@ class IFRSApiConfigCreateSerializer(serializers.ModelSerializer):
             'primaryKeyFields', 'behavior', 'maxRps', 'retryCount',
             'backoffMinMs', 'backoffMaxMs', 'timeoutMs', 'secretReferences',
             'tlsRequired', 'mtlsCerts', 'ipAllowlistNote', 'rawLandingMode',
-            'mappingProfile', 'validationProfile', 'owner', 'alertEmails',
+            'mappingProfile', 'rollupFields', 'validationProfile', 'owner', 'alertEmails',
             'alertWebhooks', 'autoDisableOnFailures'
         ]
         extra_kwargs = {
@@ -1390,6 +1647,7 @@ class IFRSApiConfigCreateSerializer(serializers.ModelSerializer):
             'ipAllowlistNote': {'source': 'ip_allowlist_note'},
             'rawLandingMode': {'source': 'raw_landing_mode'},
             'mappingProfile': {'source': 'mapping_profile'},
+            'rollupFields': {'source': 'rollup_fields'},
             'validationProfile': {'source': 'validation_profile'},
             'alertEmails': {'source': 'alert_emails'},
             'alertWebhooks': {'source': 'alert_webhooks'},
@@ -1413,7 +1671,7 @@ class IFRSApiConfigUpdateSerializer(serializers.ModelSerializer):
             'primaryKeyFields', 'behavior', 'maxRps', 'retryCount',
             'backoffMinMs', 'backoffMaxMs', 'timeoutMs', 'secretReferences',
             'tlsRequired', 'mtlsCerts', 'ipAllowlistNote', 'rawLandingMode',
-            'mappingProfile', 'validationProfile', 'owner', 'alertEmails',
+            'mappingProfile', 'rollupFields', 'validationProfile', 'owner', 'alertEmails',
             'alertWebhooks', 'autoDisableOnFailures'
         ]
         extra_kwargs = {
@@ -1447,6 +1705,7 @@ class IFRSApiConfigUpdateSerializer(serializers.ModelSerializer):
             'ipAllowlistNote': {'source': 'ip_allowlist_note'},
             'rawLandingMode': {'source': 'raw_landing_mode'},
             'mappingProfile': {'source': 'mapping_profile'},
+            'rollupFields': {'source': 'rollup_fields'},
             'validationProfile': {'source': 'validation_profile'},
             'alertEmails': {'source': 'alert_emails'},
             'alertWebhooks': {'source': 'alert_webhooks'},
@@ -1553,4 +1812,17 @@ class ReportMetadataSerializer(serializers.Serializer):
     report_type_display = serializers.CharField()
     status = serializers.CharField()
     value_count = serializers.IntegerField()
- 
\ No newline at end of file
+ 
+
+class ValueVarianceSerializer(serializers.Serializer):
+    value_id = serializers.CharField()
+    label = serializers.CharField(allow_null=True)
+    report_type = serializers.CharField(allow_null=True)
+    unit = serializers.CharField(allow_null=True)
+    line_of_business = serializers.CharField(allow_null=True)
+    current_value = serializers.DecimalField(max_digits=21, decimal_places=2, allow_null=True)
+    prior_value = serializers.DecimalField(max_digits=21, decimal_places=2, allow_null=True)
+    absolute_change = serializers.DecimalField(max_digits=21, decimal_places=2)
+    percentage_change = serializers.FloatField(allow_null=True)
+    change_type = serializers.CharField()
+    ai_insight = serializers.CharField(required=False)
@@ -9,6 +9,7 @@ from .views import (
     DataUploadViewSet,
     DataUploadTemplateViewSet,
     APIUploadLogViewSet,
+    APIUploadRollupViewSet,
     DataBatchStatusViewSet,
     DocumentTypeConfigViewSet,
     CalculationConfigViewSet,
@@ -30,6 +31,7 @@ router.register(r"data-upload-batches", DataUploadBatchViewSet, basename="data-u
 router.register(r"data-uploads", DataUploadViewSet, basename="data-upload")
 router.register(r"data-upload-templates", DataUploadTemplateViewSet, basename="data-upload-template")
 router.register(r"api-upload-logs", APIUploadLogViewSet, basename="api-upload-log")
+router.register(r"api-upload-rollups", APIUploadRollupViewSet, basename="api-upload-rollup")
 router.register(r"data-batch-status", DataBatchStatusViewSet, basename="data-batch-status")
 router.register(r"document-type-config", DocumentTypeConfigViewSet, basename="document-type-config")
 router.register(r"calculation-config", CalculationConfigViewSet, basename="calculation-config")
@@ -9,35 +9,39 @@ from rest_framework.pagination import PageNumberPagination
 
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Sum
 from django.http import HttpResponse, Http404
 from django.conf import settings
 
 import logging
+from decimal import Decimal, InvalidOperation
 import json
 
 logger = logging.getLogger(__name__)
 
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    logger.warning("OpenAI package not installed. AI insights will use fallback generation.")
-
-from model_definitions.models import ModelDefinition, ModelDefinitionHistory, DataUploadBatch, DataUpload, DataUploadTemplate, APIUploadLog, DataBatchStatus, DocumentTypeConfig, CalculationConfig, ConversionConfig, Currency, LineOfBusiness, ReportType, IFRSEngineResult, IFRSEngineInput, IFRSApiConfig, CalculationValue, AssumptionReference, InputDataReference, SubmittedReport, AIVarianceAnalysis
+from utils.views import KeysetPaginationMixin, RelationLoadingMixin
+from model_definitions import connectors
+from model_definitions.utils import ai_insights, run_summaries, run_variances
+from model_definitions.utils.json_patch import make_patch
+from model_definitions.models import ModelDefinition, ModelDefinitionHistory, DataUploadBatch, DataUpload, DataUploadIngestJob, DataUploadTemplate, APIUploadLog, APIUploadRollup, DataBatchStatus, DocumentTypeConfig, CalculationConfig, ConversionConfig, Currency, LineOfBusiness, ReportType, IFRSEngineResult, IFRSEngineInput, IFRSApiConfig, CalculationValue, AssumptionReference, InputDataReference, SubmittedReport, AIVarianceAnalysis, Run, ResultValueIndex, ResultSnapshot
 from .serializers import (
     ModelDefinitionListSerializer,
+    ModelDefinitionSummarySerializer,
     ModelDefinitionDetailSerializer,
     ModelDefinitionCreateSerializer,
     ModelDefinitionUpdateSerializer,
     ModelDefinitionHistorySerializer,
+    ModelDefinitionHistorySummarySerializer,
     DataUploadBatchSerializer,
     DataUploadSerializer,
     DataUploadTemplateSerializer,
     APIUploadLogSerializer,
+    APIUploadRollupSerializer,
     DataBatchStatusSerializer,
     FileUploadSerializer,
     BulkUploadSerializer,
+    BulkIngestSerializer,
+    DataUploadIngestJobSerializer,
     DocumentTypeConfigSerializer,
     DocumentTypeConfigListSerializer,
     DocumentTypeConfigCreateSerializer,
@@ -73,13 +77,15 @@ from .serializers import (
     InputDataReferenceSerializer,
     RunSummarySerializer,
     ReportMetadataSerializer,
+    ValueVarianceSerializer,
     SubmittedReportSerializer,
     SubmittedReportCreateSerializer,
 )
 
 
-class ModelDefinitionViewSet(viewsets.ModelViewSet):
+class ModelDefinitionViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = ModelDefinition.objects.all()
+    select_related_fields = ('created_by', 'last_modified_by', 'locked_by', 'cloned_from')
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['created_by', 'definition_type']
@@ -89,6 +95,8 @@ class ModelDefinitionViewSet(viewsets.ModelViewSet):
 
     def get_serializer_class(self):
         if self.action == 'list':
+            if self.is_summary_view():
+                return ModelDefinitionSummarySerializer
             return ModelDefinitionListSerializer
         elif self.action == 'create':
             return ModelDefinitionCreateSerializer
@@ -96,20 +104,26 @@ class ModelDefinitionViewSet(viewsets.ModelViewSet):
             return ModelDefinitionUpdateSerializer
         return ModelDefinitionDetailSerializer
 
+    def is_summary_view(self):
+        return self.request.query_params.get('view') == 'summary'
+
     def get_queryset(self):
         queryset = super().get_queryset()
         
+        if self.action == 'list' and self.is_summary_view():
+            queryset = queryset.defer('config')
+        
         measurement_model = self.request.query_params.get('measurement_model')
         if measurement_model:
-            queryset = queryset.filter(config__general_info__measurement_model=measurement_model)
+            queryset = queryset.filter(measurement_model=measurement_model)
         
         product_type = self.request.query_params.get('product_type')
         if product_type:
-            queryset = queryset.filter(config__general_info__product_type=product_type)
+            queryset = queryset.filter(product_type=product_type)
         
         status = self.request.query_params.get('status')
         if status:
-            queryset = queryset.filter(config__general_info__status=status)
+            queryset = queryset.filter(status=status)
         
         definition_type = self.request.query_params.get('definition_type')
         if definition_type:
@@ -142,13 +156,7 @@ class ModelDefinitionViewSet(viewsets.ModelViewSet):
         with transaction.atomic():
             model_def = serializer.save()
             
-            ModelDefinitionHistory.objects.create(
-                model=model_def,
-                name=model_def.name,
-                version=model_def.version,
-                config=model_def.config,
-                modified_by=request.user
-            )
+            ModelDefinitionHistory.record(model_def, request.user)
         
         detail_serializer = ModelDefinitionDetailSerializer(
             model_def, context={'request': request}
@@ -282,13 +290,7 @@ class ModelDefinitionViewSet(viewsets.ModelViewSet):
         with transaction.atomic():
             cloned_instance = serializer.save()
             
-            ModelDefinitionHistory.objects.create(
-                model=cloned_instance,
-                name=cloned_instance.name,
-                version=cloned_instance.version,
-                config=cloned_instance.config,
-                modified_by=request.user
-            )
+            ModelDefinitionHistory.record(cloned_instance, request.user)
         
         detail_serializer = ModelDefinitionDetailSerializer(
             cloned_instance, context={'request': request}
@@ -301,21 +303,109 @@ class ModelDefinitionViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'])
     def history(self, request, pk=None):
+        """
+        Paginated version metadata, newest first. Configs are fetched per
+        version with ``history/<id>`` or compared with ``history/diff``.
+        """
         instance = self.get_object()
-        history_records = ModelDefinitionHistory.objects.filter(model=instance)
+        history_records = ModelDefinitionHistory.objects.filter(
+            model=instance
+        ).select_related('modified_by').order_by('-sequence')
+        
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+        except ValueError:
+            return Response({
+                "detail": "page and page_size must be integers."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        total_count = history_records.count()
+        start = (page - 1) * page_size
+        end = start + page_size
         
-        serializer = ModelDefinitionHistorySerializer(
-            history_records, many=True, context={'request': request}
+        serializer = ModelDefinitionHistorySummarySerializer(
+            history_records[start:end], many=True, context={'request': request}
         )
         
+        total_pages = (total_count + page_size - 1) // page_size
+        has_next = page < total_pages
+        has_previous = page > 1
+        
         return Response({
             "detail": "Model definition history retrieved successfully.",
+            "count": total_count,
+            "next": f"?page={page + 1}&page_size={page_size}" if has_next else None,
+            "previous": f"?page={page - 1}&page_size={page_size}" if has_previous else None,
             "history": serializer.data
         })
 
+    @action(detail=True, methods=['get'], url_path=r'history/(?P<history_id>\d+)')
+    def history_version(self, request, pk=None, history_id=None):
+        instance = self.get_object()
+        try:
+            entry = ModelDefinitionHistory.objects.select_related('modified_by', 'model').get(
+                model=instance, pk=history_id
+            )
+        except ModelDefinitionHistory.DoesNotExist:
+            return Response({
+                "detail": "History version not found."
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        serializer = ModelDefinitionHistorySerializer(entry, context={'request': request})
+        return Response({
+            "detail": "Model definition version retrieved successfully.",
+            "version": serializer.data
+        })
+
+    @action(detail=True, methods=['get'], url_path='history/diff')
+    def history_diff(self, request, pk=None):
+        """
+        JSON patch turning version ``from`` into version ``to`` (history ids).
+        ``to`` defaults to the model's current config.
+        """
+        instance = self.get_object()
+        from_id = request.query_params.get('from')
+        to_id = request.query_params.get('to')
+        if not from_id:
+            return Response({
+                "detail": "from parameter is required."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        ids = [from_id] + ([to_id] if to_id else [])
+        try:
+            entries = ModelDefinitionHistory.objects.in_bulk(
+                [int(value) for value in ids]
+            )
+        except ValueError:
+            return Response({
+                "detail": "from and to must be history ids."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        entries = {pk: entry for pk, entry in entries.items() if entry.model_id == instance.pk}
+        if any(int(value) not in entries for value in ids):
+            return Response({
+                "detail": "History version not found."
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        ModelDefinitionHistory.resolve_configs(list(entries.values()))
+        source = entries[int(from_id)]
+        if to_id:
+            target = entries[int(to_id)]
+            target_config, target_version = target.resolved_config, target.version
+        else:
+            target_config, target_version = instance.config, instance.version
+        
+        return Response({
+            "detail": "Model definition diff retrieved successfully.",
+            "from_version": source.version,
+            "to_version": target_version,
+            "operations": make_patch(source.resolved_config, target_config)
+        })
+
 
-class ModelDefinitionHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class ModelDefinitionHistoryViewSet(RelationLoadingMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ModelDefinitionHistory.objects.all()
+    select_related_fields = ('model', 'modified_by')
     serializer_class = ModelDefinitionHistorySerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -333,8 +423,9 @@ class ModelDefinitionHistoryViewSet(viewsets.ReadOnlyModelViewSet):
             })
         return response
 
-class DataUploadBatchViewSet(viewsets.ModelViewSet):
+class DataUploadBatchViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = DataUploadBatch.objects.all()
+    select_related_fields = ('created_by', 'last_modified_by')
     serializer_class = DataUploadBatchSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -371,7 +462,8 @@ class DataUploadBatchViewSet(viewsets.ModelViewSet):
                 "detail": "Only pending batches can be completed."
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        if batch.upload_count == 0:
+        # Recount rather than trust the counter: bulk queryset deletes bypass DataUpload.delete
+        if batch.refresh_upload_count() == 0:
             return Response({
                 "detail": "Cannot complete batch without any uploads."
             }, status=status.HTTP_400_BAD_REQUEST)
@@ -396,8 +488,9 @@ class DataUploadBatchViewSet(viewsets.ModelViewSet):
         })
 
 
-class DataUploadViewSet(viewsets.ModelViewSet):
+class DataUploadViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = DataUpload.objects.all()
+    select_related_fields = ('batch', 'uploaded_by')
     serializer_class = DataUploadSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
@@ -412,6 +505,8 @@ class DataUploadViewSet(viewsets.ModelViewSet):
             return FileUploadSerializer
         elif self.action == 'bulk_upload':
             return BulkUploadSerializer
+        elif self.action == 'bulk_ingest':
+            return BulkIngestSerializer
         return DataUploadSerializer
 
     def list(self, request, *args, **kwargs):
@@ -455,6 +550,38 @@ class DataUploadViewSet(viewsets.ModelViewSet):
             "uploads": [DataUploadSerializer(upload).data for upload in uploads]
         }, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'])
+    def bulk_ingest(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            job = serializer.save()
+        except Exception as e:
+            logger.error(f"Bulk ingest failed for batch {serializer.validated_data['batch_id']}: {str(e)}")
+            return Response({
+                "detail": f"Error: {str(e)}"
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        return Response({
+            "detail": f"{job.created_count} uploads ingested successfully.",
+            "job": DataUploadIngestJobSerializer(job).data
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path=r'ingest_jobs/(?P<job_id>[^/.]+)')
+    def ingest_job(self, request, job_id=None):
+        try:
+            job = DataUploadIngestJob.objects.select_related('batch').get(job_id=job_id)
+        except DataUploadIngestJob.DoesNotExist:
+            return Response({
+                "detail": "Ingest job not found."
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            "detail": "Ingest job retrieved successfully.",
+            "job": DataUploadIngestJobSerializer(job).data
+        })
+
     @action(detail=True, methods=['get'])
     def download(self, request, pk=None):
         upload = self.get_object()
@@ -495,7 +622,7 @@ class DataUploadViewSet(viewsets.ModelViewSet):
         })
 
 
-class DataUploadTemplateViewSet(viewsets.ModelViewSet):
+class DataUploadTemplateViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = DataUploadTemplate.objects.all()
     serializer_class = DataUploadTemplateSerializer
     permission_classes = [IsAuthenticated]
@@ -550,12 +677,13 @@ class DataUploadTemplateViewSet(viewsets.ModelViewSet):
         })
 
 
-class APIUploadLogViewSet(viewsets.ReadOnlyModelViewSet):
+class APIUploadLogViewSet(RelationLoadingMixin, viewsets.ReadOnlyModelViewSet):
     queryset = APIUploadLog.objects.all()
+    select_related_fields = ('data_upload',)
     serializer_class = APIUploadLogSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['status', 'reporting_date']
+    filterset_fields = ['status', 'reporting_date', 'api_config']
     search_fields = ['data_upload__upload_id']
     ordering_fields = ['upload_date', 'reporting_date']
     ordering = ['-upload_date']
@@ -571,6 +699,10 @@ class APIUploadLogViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=True, methods=['post'])
     def retry_upload(self, request, pk=None):
+        """
+        Replay a failed upload: pages it already committed are kept and the
+        run resumes after them (or re-processes its stored payload).
+        """
         api_log = self.get_object()
         
         if api_log.status != 'failed':
@@ -578,16 +710,103 @@ class APIUploadLogViewSet(viewsets.ReadOnlyModelViewSet):
                 "detail": "Only failed uploads can be retried."
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # TODO: Implement retry upload logic
-        # This would typically involve re-processing the API payload
+        try:
+            api_log = connectors.replay_upload(api_log)
+        except connectors.ConnectorError as e:
+            return Response({
+                "detail": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Error retrying API upload log {api_log.pk}: {str(e)}")
+            return Response({
+                "detail": f"Error: {str(e)}"
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        if api_log.status == 'failed':
+            return Response({
+                "detail": f"API upload retry failed: {api_log.error_message}",
+                "log": APIUploadLogSerializer(api_log).data
+            }, status=status.HTTP_502_BAD_GATEWAY)
         
         return Response({
-            "detail": "API upload retry initiated.",
+            "detail": "API upload retried successfully.",
             "log": APIUploadLogSerializer(api_log).data
         })
 
 
-class DataBatchStatusViewSet(viewsets.ModelViewSet):
+class APIUploadRollupViewSet(RelationLoadingMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = APIUploadRollup.objects.all()
+    serializer_class = APIUploadRollupSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filterset_fields = {
+        'reporting_date': ['exact', 'gte', 'lte'],
+        'source': ['exact'],
+        'line_of_business': ['exact'],
+    }
+    search_fields = ['source', 'line_of_business']
+    ordering_fields = ['reporting_date', 'source', 'line_of_business']
+    ordering = ['-reporting_date', 'source', 'line_of_business']
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            return Response({
+                "detail": "API upload rollups retrieved successfully.",
+                "results": response.data
+            })
+        return response
+
+    @action(detail=False, methods=['get'])
+    def control_totals(self, request):
+        """
+        Totals for one reporting date (``reporting_date``) or month (``year`` and
+        ``month``), optionally narrowed to a ``source`` and ``line_of_business``.
+        """
+        rollups = APIUploadRollup.objects.all()
+        reporting_date = request.query_params.get('reporting_date')
+        year = request.query_params.get('year')
+        month = request.query_params.get('month')
+
+        try:
+            if reporting_date:
+                rollups = rollups.filter(reporting_date=reporting_date)
+            elif year and month:
+                rollups = rollups.filter(reporting_date__year=int(year), reporting_date__month=int(month))
+            else:
+                return Response({
+                    "detail": "reporting_date or year and month parameters are required."
+                }, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({
+                "detail": "Invalid reporting_date, year or month."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        for param in ('source', 'line_of_business'):
+            if request.query_params.get(param) is not None:
+                rollups = rollups.filter(**{param: request.query_params[param]})
+
+        totals = rollups.aggregate(
+            sum_of_premiums=Sum('sum_of_premiums'),
+            sum_of_paid_claims=Sum('sum_of_paid_claims'),
+            sum_of_commissions=Sum('sum_of_commissions'),
+            record_count=Sum('record_count'),
+        )
+
+        return Response({
+            "detail": "Control totals retrieved successfully.",
+            "results": {
+                "reporting_date": reporting_date,
+                "year": year,
+                "month": month,
+                "source": request.query_params.get('source'),
+                "line_of_business": request.query_params.get('line_of_business'),
+                **{name: value or 0 for name, value in totals.items()}
+            }
+        })
+
+
+class DataBatchStatusViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = DataBatchStatus.objects.all()
     serializer_class = DataBatchStatusSerializer
     permission_classes = [IsAuthenticated]
@@ -651,7 +870,7 @@ class DataBatchStatusViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_404_NOT_FOUND)
 
 
-class DocumentTypeConfigViewSet(viewsets.ModelViewSet):
+class DocumentTypeConfigViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = DocumentTypeConfig.objects.all()
     serializer_class = DocumentTypeConfigSerializer
     permission_classes = [IsAuthenticated]
@@ -738,7 +957,7 @@ class DocumentTypeConfigViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class CalculationConfigViewSet(viewsets.ModelViewSet):
+class CalculationConfigViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = CalculationConfig.objects.all()
     serializer_class = CalculationConfigSerializer
     permission_classes = [IsAuthenticated]
@@ -825,7 +1044,7 @@ class CalculationConfigViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class ConversionConfigViewSet(viewsets.ModelViewSet):
+class ConversionConfigViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = ConversionConfig.objects.all()
     serializer_class = ConversionConfigSerializer
     permission_classes = [IsAuthenticated]
@@ -903,7 +1122,7 @@ class ConversionConfigViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_404_NOT_FOUND)
 
 
-class CurrencyViewSet(viewsets.ModelViewSet):
+class CurrencyViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = Currency.objects.all()
     serializer_class = CurrencySerializer
     permission_classes = [IsAuthenticated]
@@ -968,8 +1187,9 @@ class CurrencyViewSet(viewsets.ModelViewSet):
         })
 
 
-class LineOfBusinessViewSet(viewsets.ModelViewSet):
+class LineOfBusinessViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = LineOfBusiness.objects.all()
+    select_related_fields = ('currency',)
     serializer_class = LineOfBusinessSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -1025,7 +1245,7 @@ class LineOfBusinessViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Get only active lines of business"""
-        lines_of_business = LineOfBusiness.objects.filter(is_active=True).order_by('batch_model', 'insurance_type', 'line_of_business')
+        lines_of_business = self.get_queryset().filter(is_active=True).order_by('batch_model', 'insurance_type', 'line_of_business')
         serializer = LineOfBusinessListSerializer(lines_of_business, many=True)
         return Response({
             "detail": "Active lines of business retrieved successfully.",
@@ -1038,7 +1258,7 @@ class LineOfBusinessViewSet(viewsets.ModelViewSet):
         batch_model = request.query_params.get('batch_model')
         insurance_type = request.query_params.get('insurance_type')
         
-        queryset = LineOfBusiness.objects.filter(is_active=True)
+        queryset = self.get_queryset().filter(is_active=True)
         
         if batch_model:
             queryset = queryset.filter(batch_model=batch_model)
@@ -1053,7 +1273,7 @@ class LineOfBusinessViewSet(viewsets.ModelViewSet):
             "results": serializer.data
         })
 
-class ReportTypeViewSet(viewsets.ModelViewSet):
+class ReportTypeViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = ReportType.objects.all()
     serializer_class = ReportTypeSerializer
     permission_classes = [IsAuthenticated]
@@ -1101,7 +1321,7 @@ class ReportTypeViewSet(viewsets.ModelViewSet):
         })
 
 
-class IFRSEngineInputViewSet(viewsets.ReadOnlyModelViewSet):
+class IFRSEngineInputViewSet(RelationLoadingMixin, viewsets.ReadOnlyModelViewSet):
     queryset = IFRSEngineInput.objects.all()
     serializer_class = IFRSEngineInputSerializer
     permission_classes = [IsAuthenticated]
@@ -1121,8 +1341,10 @@ class IFRSEngineInputViewSet(viewsets.ReadOnlyModelViewSet):
         return response
 
 
-class SubmittedReportViewSet(viewsets.ModelViewSet):
+class SubmittedReportViewSet(RelationLoadingMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = SubmittedReport.objects.all()
+    select_related_fields = ('submitted_by',)
+    keyset_ordering = ('-assign_year', '-assign_quarter', '-created_on', '-id')
     serializer_class = SubmittedReportSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -1132,7 +1354,7 @@ class SubmittedReportViewSet(viewsets.ModelViewSet):
     ordering = ['-assign_year', '-assign_quarter', '-created_on']
     
     def get_queryset(self):
-        queryset = SubmittedReport.objects.all()
+        queryset = super().get_queryset()
         
         year = self.request.query_params.get('year', None)
         quarter = self.request.query_params.get('quarter', None)
@@ -1153,6 +1375,10 @@ class SubmittedReportViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         
+        keyset_response = self.keyset_response(request, queryset)
+        if keyset_response is not None:
+            return keyset_response
+        
         page = int(request.query_params.get('page', 1))
         page_size = int(request.query_params.get('page_size', 12))
         
@@ -1186,10 +1412,27 @@ class SubmittedReportViewSet(viewsets.ModelViewSet):
         assign_year = data['assign_year']
         assign_quarter = data['assign_quarter']
         
-        ifrs_results = IFRSEngineResult.objects.filter(id__in=report_ids)
-        if not ifrs_results.exists():
+        ifrs_results = list(IFRSEngineResult.objects.filter(id__in=report_ids).only(
+            'id', 'run_id', 'engine_run_id', 'report_type', 'model_type', 'created_at'
+        ))
+        if not ifrs_results:
             return Response({'error': 'No reports found with provided IDs'}, status=status.HTTP_400_BAD_REQUEST)
         
+        engine_inputs = IFRSEngineInput.objects.only(
+            'run_id', 'model_definition', 'batch_data', 'field_parameters'
+        ).in_bulk({result.run_id for result in ifrs_results}, field_name='run_id')
+        ifrs_engine_ids = {
+            str(engine_input.field_parameters.get('ifrs_engine_id'))
+            for engine_input in engine_inputs.values()
+            if engine_input.field_parameters and engine_input.field_parameters.get('ifrs_engine_id')
+        }
+        ifrs_engine_types = {
+            str(config_id): config.engine_type
+            for config_id, config in CalculationConfig.objects.only('engine_type').in_bulk(
+                [engine_id for engine_id in ifrs_engine_ids if engine_id.isdigit()]
+            ).items()
+        }
+        
         submitted_reports = []
         for result in ifrs_results:
             model_name = ''
@@ -1198,9 +1441,8 @@ class SubmittedReportViewSet(viewsets.ModelViewSet):
             conversion_engine = ''
             ifrs_engine = ''
             
-            try:
-                engine_input = IFRSEngineInput.objects.get(run_id=result.run_id)
-                
+            engine_input = engine_inputs.get(result.run_id)
+            if engine_input is not None:
                 if engine_input.model_definition:
                     model_def = engine_input.model_definition
                     model_name = f"{model_def.get('name', 'N/A')} (v{model_def.get('version', 'N/A')})"
@@ -1219,15 +1461,11 @@ class SubmittedReportViewSet(viewsets.ModelViewSet):
                     
                     ifrs_engine_id = engine_input.field_parameters.get('ifrs_engine_id')
                     if ifrs_engine_id:
-                        try:
-                            ifrs_calc_config = CalculationConfig.objects.get(id=ifrs_engine_id)
-                            ifrs_engine = ifrs_calc_config.engine_type
-                        except CalculationConfig.DoesNotExist:
-                            ifrs_engine = f"Engine ID: {ifrs_engine_id}"
+                        ifrs_engine = ifrs_engine_types.get(str(ifrs_engine_id), f"Engine ID: {ifrs_engine_id}")
                     else:
                         ifrs_engine = 'Default IFRS Engine'
                         
-            except IFRSEngineInput.DoesNotExist:
+            else:
                 model_name = 'N/A'
                 batch_info = 'N/A'
                 lob_info = 'N/A'
@@ -1243,6 +1481,7 @@ class SubmittedReportViewSet(viewsets.ModelViewSet):
                 assign_quarter=assign_quarter,
                 status='active',
                 ifrs_engine_result_id=result.id,
+                engine_run_id=result.engine_run_id,
                 model_used=model_name,
                 batch_used=batch_info,
                 line_of_business_used=lob_info,
@@ -1250,9 +1489,10 @@ class SubmittedReportViewSet(viewsets.ModelViewSet):
                 ifrs_engine_used=ifrs_engine,
                 submitted_by=request.user
             )
-            submitted_report.save()
             submitted_reports.append(submitted_report)
         
+        SubmittedReport.bulk_submit(submitted_reports)
+        
         serializer = SubmittedReportSerializer(submitted_reports, many=True)
         return Response({
             'message': f'Successfully submitted {len(submitted_reports)} reports',
@@ -1306,8 +1546,9 @@ class SubmittedReportViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class IFRSEngineResultViewSet(viewsets.ModelViewSet):
+class IFRSEngineResultViewSet(RelationLoadingMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = IFRSEngineResult.objects.all()
+    keyset_ordering = ('-created_at', '-id')
     serializer_class = IFRSEngineResultSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -1324,6 +1565,10 @@ class IFRSEngineResultViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         
+        keyset_response = self.keyset_response(request, queryset)
+        if keyset_response is not None:
+            return keyset_response
+        
         page = int(request.query_params.get('page', 1))
         page_size = int(request.query_params.get('page_size', 12))
         
@@ -1348,7 +1593,8 @@ class IFRSEngineResultViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         username = self.request.user.username if self.request.user else 'system'
-        serializer.save(created_by=username)
+        result = serializer.save(created_by=username)
+        run_summaries.refresh_run_summaries([result.run_id])
 
     @action(detail=True, methods=['get'])
     def download_pdf(self, request, pk=None):
@@ -1852,6 +2098,7 @@ class IFRSEngineResultViewSet(viewsets.ModelViewSet):
         try:
             result = self.get_object()
             result.delete()
+            run_summaries.refresh_run_summaries([result.run_id])
             return Response({
                 'detail': 'IFRS engine result deleted successfully'
             }, status=status.HTTP_204_NO_CONTENT)
@@ -1986,8 +2233,19 @@ class IFRSEngineResultViewSet(viewsets.ModelViewSet):
             results = []
             
             with transaction.atomic():
+                run, _ = Run.objects.update_or_create(
+                    run_id=run_id,
+                    defaults={
+                        'year': data['year'],
+                        'quarter': data['quarter'],
+                        'model_type': data['model_type'],
+                        'status': 'Running',
+                        'started_at': timezone.now(),
+                    }
+                )
                 engine_input = IFRSEngineInput.objects.create(
                     run_id=run_id,
+                    engine_run=run,
                     model_definition=model_definition,
                     batch_data=batch_data,
                     field_parameters=field_parameters,
@@ -2008,6 +2266,7 @@ class IFRSEngineResultViewSet(viewsets.ModelViewSet):
                         
                         result = IFRSEngineResult.objects.create(
                             run_id=run_id,
+                            engine_run=run,
                             model_guid=model.id,
                             model_type=data['model_type'],
                             report_type='staging_table',
@@ -2023,6 +2282,7 @@ class IFRSEngineResultViewSet(viewsets.ModelViewSet):
                     except Exception as e:
                         result = IFRSEngineResult.objects.create(
                             run_id=run_id,
+                            engine_run=run,
                             model_guid=model.id,
                             model_type=data['model_type'],
                             report_type='staging_table',
@@ -2051,6 +2311,7 @@ class IFRSEngineResultViewSet(viewsets.ModelViewSet):
                             
                             result = IFRSEngineResult.objects.create(
                                 run_id=run_id,
+                                engine_run=run,
                                 model_guid=model.id,
                                 model_type=data['model_type'],
                                 report_type=report_type.report_type,
@@ -2085,6 +2346,7 @@ class IFRSEngineResultViewSet(viewsets.ModelViewSet):
                         except Exception as e:
                             result = IFRSEngineResult.objects.create(
                                 run_id=run_id,
+                                engine_run=run,
                                 model_guid=model.id,
                                 model_type=data['model_type'],
                                 report_type=report_type.report_type,
@@ -2097,6 +2359,8 @@ class IFRSEngineResultViewSet(viewsets.ModelViewSet):
                             )
                             results.append(result)
             
+            run_summaries.refresh_run_summaries([run_id])
+            
             result_serializer = IFRSEngineResultSerializer(results, many=True, context={'request': request})
             
             return Response({
@@ -2377,7 +2641,7 @@ class IFRSEngineResultViewSet(viewsets.ModelViewSet):
                 pass
 
 
-class IFRSApiConfigViewSet(viewsets.ModelViewSet):
+class IFRSApiConfigViewSet(RelationLoadingMixin, viewsets.ModelViewSet):
     queryset = IFRSApiConfig.objects.all()
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -2403,27 +2667,24 @@ class IFRSApiConfigViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def test_connection(self, request, pk=None):
         """
-        Test API connection for the given configuration
+        Test API connection for the given configuration by fetching its first page
         """
         api_config = self.get_object()
         
         try:
-            # Here will implement actual connection testing logic
-            # For now, just update the test status
-            api_config.last_test_date = timezone.now()
-            api_config.last_test_status = 'success'
-            api_config.save()
+            stats = connectors.test_connection(api_config)
+            api_config.refresh_from_db(fields=['last_test_date', 'last_test_status'])
             
             return Response({
                 'detail': 'Connection test successful',
                 'lastTestDate': api_config.last_test_date,
-                'lastTestStatus': api_config.last_test_status
+                'lastTestStatus': api_config.last_test_status,
+                'statusCode': stats.status_code,
+                'recordsOnFirstPage': stats.records_fetched
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            api_config.last_test_date = timezone.now()
-            api_config.last_test_status = 'failed'
-            api_config.save()
+            api_config.refresh_from_db(fields=['last_test_date', 'last_test_status'])
             
             return Response({
                 'detail': f'Connection test failed: {str(e)}',
@@ -2434,24 +2695,23 @@ class IFRSApiConfigViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def dry_run(self, request, pk=None):
         """
-        Perform a dry run to fetch sample data (100 rows)
+        Perform a dry run to fetch sample data (100 rows) without writing anything
         """
         api_config = self.get_object()
         
         try:
-            # Here will implement actual dry run logic
-            # For now, return a mock response
+            stats = connectors.dry_run(api_config, max_records=100)
             sample_data = {
-                'records_fetched': 100,
-                'sample_record': {
-                    'id': 1,
-                    'timestamp': '2024-01-01T00:00:00Z',
-                    'data': 'Sample data record'
-                },
+                'records_fetched': stats.records_fetched,
+                'pages_fetched': stats.pages,
+                'total_count': stats.total_count,
+                'sample_record': stats.sample_records[0] if stats.sample_records else None,
+                'sample_records': stats.sample_records,
+                'watermark': stats.watermark,
                 'parsed_successfully': True,
                 'jsonpath_results': {
-                    'records': '$.data.items[*]',
-                    'total_count': '$.pagination.total'
+                    'records': api_config.records_jsonpath,
+                    'total_count': api_config.total_count_jsonpath
                 }
             }
             
@@ -2465,6 +2725,51 @@ class IFRSApiConfigViewSet(viewsets.ModelViewSet):
                 'detail': f'Dry run failed: {str(e)}'
             }, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=True, methods=['post'])
+    def run(self, request, pk=None):
+        """
+        Run an ingestion for the configuration. Optional ``batch_id`` attaches
+        the landed records to a data upload in that batch; ``full_refresh``
+        ignores the stored watermark.
+        """
+        api_config = self.get_object()
+        
+        batch = None
+        batch_id = request.data.get('batch_id')
+        if batch_id:
+            try:
+                batch = DataUploadBatch.objects.get(batch_id=batch_id)
+            except DataUploadBatch.DoesNotExist:
+                return Response({
+                    'detail': 'Batch not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+        
+        full_refresh = str(request.data.get('full_refresh', '')).lower() in ('1', 'true', 'yes')
+        
+        try:
+            upload_log = connectors.run_config(
+                api_config,
+                batch=batch,
+                uploaded_by=request.user,
+                full_refresh=full_refresh
+            )
+        except Exception as e:
+            logger.error(f"Error running API config {api_config.pk}: {str(e)}")
+            return Response({
+                'detail': f'Error: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        if upload_log.status == 'failed':
+            return Response({
+                'detail': f'Ingestion failed: {upload_log.error_message}',
+                'log': APIUploadLogSerializer(upload_log).data
+            }, status=status.HTTP_502_BAD_GATEWAY)
+        
+        return Response({
+            'detail': f'{upload_log.records_fetched} records ingested successfully.',
+            'log': APIUploadLogSerializer(upload_log).data
+        }, status=status.HTTP_200_OK)
+    
     @action(detail=False, methods=['get'])
     def active(self, request):
         active_configs = self.queryset.filter(status='active')
@@ -2497,8 +2802,9 @@ class IFRSApiConfigViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class AuditViewSet(viewsets.ReadOnlyModelViewSet):
+class AuditViewSet(RelationLoadingMixin, viewsets.ReadOnlyModelViewSet):
     queryset = CalculationValue.objects.all()
+    prefetch_related_fields = ('assumptions', 'input_refs')
     serializer_class = CalculationValueSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -2510,40 +2816,42 @@ class AuditViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def runs_by_period(self, request):
         try:
-            results = IFRSEngineResult.objects.values(
-                'run_id',
-                'year',
-                'quarter',
-                'model_type',
-                'currency',
-                'status',
-                'created_at'
-            ).distinct().order_by('-created_at')
-            
-            runs_dict = {}
-            for result in results:
-                run_id = result['run_id']
-                if run_id not in runs_dict:
-                    report_types = IFRSEngineResult.objects.filter(
-                        run_id=run_id
-                    ).values_list('report_type', flat=True).distinct()
-                    
-                    runs_dict[run_id] = {
-                        'run_id': run_id,
-                        'period': f"{result['year']} {result['quarter']}",
-                        'legal_entity': 'Default Entity',  # TODO: Get from config
-                        'currency': result['currency'] or 'USD',
-                        'status': 'Final' if result['status'] == 'Success' else 'Draft',
-                        'execution_date': result['created_at'],
-                        'model_type': result['model_type'],
-                        'available_reports': list(report_types)
-                    }
-            
-            runs_list = list(runs_dict.values())
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+        except ValueError:
+            return Response({
+                'detail': 'page and page_size must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start = (page - 1) * page_size
+            end = start + page_size
+
+            if run_summaries.run_summaries_enabled():
+                runs = run_summaries.filter_results(Run.objects.filter(result_count__gt=0), request.query_params)
+                total_count = runs.count()
+                summaries = list(runs[start:end])
+            else:
+                results = run_summaries.filter_results(IFRSEngineResult.objects.all(), request.query_params)
+                runs = run_summaries.grouped_runs(results)
+                total_count = runs.count()
+                summaries = run_summaries.expand_runs(results, list(runs[start:end]))
+
+            runs_list = [run_summaries.summary_representation(summary) for summary in summaries]
             serializer = RunSummarySerializer(runs_list, many=True)
-            
+
+            query = request.query_params.copy()
+            query['page_size'] = page_size
+            query['page'] = page + 1
+            next_link = f"?{query.urlencode()}" if end < total_count else None
+            query['page'] = page - 1
+            previous_link = f"?{query.urlencode()}" if page > 1 else None
+
             return Response({
                 'detail': 'Success',
+                'count': total_count,
+                'next': next_link,
+                'previous': previous_link,
                 'results': serializer.data
             })
             
@@ -2566,25 +2874,17 @@ class AuditViewSet(viewsets.ReadOnlyModelViewSet):
             results = IFRSEngineResult.objects.filter(run_id=run_id).values(
                 'id',
                 'report_type',
-                'status'
+                'status',
+                'value_count'
             )
             
             report_data = []
             for result in results:
-                value_count = 0
-                try:
-                    value_count = CalculationValue.objects.filter(
-                        run_id=run_id,
-                        report_type=result['report_type']
-                    ).count()
-                except Exception:
-                    value_count = 0
-                
                 report_data.append({
                     'report_type': result['report_type'],
                     'report_type_display': result['report_type'].replace('_', ' ').title(),
                     'status': result['status'],
-                    'value_count': value_count
+                    'value_count': result['value_count']
                 })
             
             serializer = ReportMetadataSerializer(report_data, many=True)
@@ -2625,66 +2925,53 @@ class AuditViewSet(viewsets.ReadOnlyModelViewSet):
             
         except CalculationValue.DoesNotExist:
             try:
-                engine_results = IFRSEngineResult.objects.filter(
-                    run_id=run_id,
-                    report_type='disclosure_report'
-                )
+                located = ResultValueIndex.lookup(run_id, value_id, report_type='disclosure_report')
                 
-                for result in engine_results:
-                    result_json = result.result_json
+                if located is not None:
+                    calc_data = located['calculation'] or {}
+                    metadata = located['metadata'] or {}
+                    period = f"{metadata.get('year', '')} {metadata.get('quarter', '')}"
+                    legal_entity = metadata.get('legal_entity_name', 'Unknown')
+                    currency = metadata.get('currency_name', 'USD')
+                    label = value_id.replace('_', ' ').replace('.', ' - ')
+                    amount = calc_data.get('amount', 0)
                     
-                    if isinstance(result_json, dict) and 'calculations' in result_json:
-                        calculations = result_json['calculations']
-                        metadata = result_json.get('metadata', {})
-                        
-                        for key, calc_data in calculations.items():
-                            if calc_data.get('value_id') == value_id:
-                                period = f"{metadata.get('year', '')} {metadata.get('quarter', '')}"
-                                legal_entity = metadata.get('legal_entity_name', 'Unknown')
-                                currency = metadata.get('currency_name', 'USD')
-                                label = value_id.replace('_', ' ').replace('.', ' - ')
-                                amount = calc_data.get('amount', 0)
-                                
-                                fallback_data = {
-                                    'valueId': value_id,
-                                    'runId': run_id,
-                                    'reportType': 'disclosure_report',
-                                    'period': period,
-                                    'legalEntity': legal_entity,
-                                    'currency': currency,
-                                    'label': label,
-                                    'value': float(amount),
-                                    'unit': 'currency',
-                                    'lineOfBusiness': metadata.get('run_name', ''),
-                                    'cohort': None,
-                                    'groupId': None,
-                                    'formulaHumanReadable': None,
-                                    'dependencies': [],
-                                    'calculationMethod': metadata.get('method_name', 'PAA').split()[0],
-                                    'notes': 'Temporary data from classification engine - full audit trail not yet available',
-                                    'isMissingData': False,
-                                    'isOverride': False,
-                                    'isFallback': True,
-                                    'hasRounding': False,
-                                    'calcEngineVersion': '1.0.0',
-                                    'timestamp': result_json.get('calculation_date', ''),
-                                    'assumptions': [],
-                                    'inputRefs': []
-                                }
-                                
-                                return Response({
-                                    'detail': 'Success (Fallback Mode)',
-                                    'result': fallback_data
-                                })
+                    fallback_data = {
+                        'valueId': value_id,
+                        'runId': run_id,
+                        'reportType': 'disclosure_report',
+                        'period': period,
+                        'legalEntity': legal_entity,
+                        'currency': currency,
+                        'label': label,
+                        'value': float(amount),
+                        'unit': 'currency',
+                        'lineOfBusiness': metadata.get('run_name', ''),
+                        'cohort': None,
+                        'groupId': None,
+                        'formulaHumanReadable': None,
+                        'dependencies': [],
+                        'calculationMethod': metadata.get('method_name', 'PAA').split()[0],
+                        'notes': 'Temporary data from classification engine - full audit trail not yet available',
+                        'isMissingData': False,
+                        'isOverride': False,
+                        'isFallback': True,
+                        'hasRounding': False,
+                        'calcEngineVersion': '1.0.0',
+                        'timestamp': located['calculation_date'] or '',
+                        'assumptions': [],
+                        'inputRefs': []
+                    }
+                    
+                    return Response({
+                        'detail': 'Success (Fallback Mode)',
+                        'result': fallback_data
+                    })
                 
                 return Response({
                     'detail': f'Value {value_id} not found in disclosure report for run {run_id}. The calculation engine needs to be updated to track audit metadata.'
                 }, status=status.HTTP_404_NOT_FOUND)
                 
-            except IFRSEngineResult.DoesNotExist:
-                return Response({
-                    'detail': f'No disclosure report found for run_id={run_id}'
-                }, status=status.HTTP_404_NOT_FOUND)
             except Exception as fallback_error:
                 logger.error(f"Fallback extraction failed: {str(fallback_error)}")
                 return Response({
@@ -2706,34 +2993,52 @@ class AuditViewSet(viewsets.ReadOnlyModelViewSet):
                 'detail': 'report_type parameter is required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+        except ValueError:
+            return Response({
+                'detail': 'page and page_size must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
         try:
             submitted_reports = SubmittedReport.objects.filter(
                 report_type=report_type,
-                status='active'
-            ).select_related().order_by('-assign_year', '-assign_quarter', '-created_on')
+                status='active',
+                ifrs_engine_result__isnull=False
+            ).order_by('-assign_year', '-assign_quarter', '-created_on')
+            
+            total_count = submitted_reports.count()
+            start = (page - 1) * page_size
+            end = start + page_size
             
             results = []
-            for report in submitted_reports:
-                try:
-                    engine_result = IFRSEngineResult.objects.get(id=report.ifrs_engine_result_id)
-                    results.append({
-                        'id': report.id,
-                        'run_id': report.run_id,
-                        'report_type': report.report_type,
-                        'report_type_display': report.report_type_display or report.report_type.replace('_', ' ').title(),
-                        'model_type': report.model_type,
-                        'assign_year': report.assign_year,
-                        'assign_quarter': report.assign_quarter,
-                        'status': report.status,
-                        'created_at': report.created_on,
-                        'display_name': f"{report.report_type_display or report.report_type.replace('_', ' ').title()} - {report.run_id} - {report.assign_year} {report.assign_quarter}"
-                    })
-                except IFRSEngineResult.DoesNotExist:
-                    logger.warning(f"IFRSEngineResult not found for submitted report {report.id}")
-                    continue
+            for report in submitted_reports[start:end]:
+                results.append({
+                    'id': report.id,
+                    'run_id': report.run_id,
+                    'report_type': report.report_type,
+                    'report_type_display': report.report_type_display or report.report_type.replace('_', ' ').title(),
+                    'model_type': report.model_type,
+                    'assign_year': report.assign_year,
+                    'assign_quarter': report.assign_quarter,
+                    'status': report.status,
+                    'created_at': report.created_on,
+                    'display_name': f"{report.report_type_display or report.report_type.replace('_', ' ').title()} - {report.run_id} - {report.assign_year} {report.assign_quarter}"
+                })
+            
+            query = request.query_params.copy()
+            query['page_size'] = page_size
+            query['page'] = page + 1
+            next_link = f"?{query.urlencode()}" if end < total_count else None
+            query['page'] = page - 1
+            previous_link = f"?{query.urlencode()}" if page > 1 else None
             
             return Response({
                 'detail': 'Success',
+                'count': total_count,
+                'next': next_link,
+                'previous': previous_link,
                 'results': results
             })
             
@@ -2743,6 +3048,90 @@ class AuditViewSet(viewsets.ReadOnlyModelViewSet):
                 'detail': f'Error: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @action(detail=False, methods=['get'])
+    def compare_run_values(self, request):
+        """
+        Every value that differs between two runs, ranked by the size of the
+        change and paged. Optional ``min_abs_change`` / ``min_pct_change``
+        keep lines reaching either threshold; ``with_insights=true`` adds an
+        AI insight to each line of the page.
+        """
+        current_run_id = request.query_params.get('current_run_id')
+        prior_run_id = request.query_params.get('prior_run_id')
+        
+        if not current_run_id or not prior_run_id:
+            return Response({
+                'detail': 'current_run_id and prior_run_id parameters are required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        ordering = request.query_params.get('ordering', 'absolute')
+        if ordering not in run_variances.ORDERINGS:
+            return Response({
+                'detail': f"ordering must be one of: {', '.join(run_variances.ORDERINGS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', 50)), 1), 500)
+            min_abs_change = request.query_params.get('min_abs_change')
+            min_abs_change = Decimal(min_abs_change) if min_abs_change else None
+            min_pct_change = request.query_params.get('min_pct_change')
+            min_pct_change = float(min_pct_change) if min_pct_change else None
+        except (ValueError, InvalidOperation):
+            return Response({
+                'detail': 'page, page_size, min_abs_change and min_pct_change must be numbers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            variances = run_variances.value_variances(
+                current_run_id, prior_run_id, report_type=request.query_params.get('report_type')
+            )
+            change_type = request.query_params.get('change_type')
+            if change_type:
+                variances = variances.filter(change_type=change_type)
+            variances = run_variances.apply_thresholds(
+                variances,
+                min_abs_change=min_abs_change,
+                min_pct_change=min_pct_change,
+                include_unchanged=request.query_params.get('include_unchanged') == 'true'
+            )
+            
+            totals = run_variances.variance_totals(variances)
+            total_count = sum(totals.values())
+            start = (page - 1) * page_size
+            end = start + page_size
+            rows = variances.order_by(*run_variances.ORDERINGS[ordering])[start:end]
+            representations = [run_variances.variance_representation(row) for row in rows]
+            if request.query_params.get('with_insights') == 'true':
+                insights = ai_insights.generate_insights(representations)
+                for representation, insight in zip(representations, insights):
+                    representation['ai_insight'] = insight
+            serializer = ValueVarianceSerializer(representations, many=True)
+            
+            query = request.query_params.copy()
+            query['page_size'] = page_size
+            query['page'] = page + 1
+            next_link = f"?{query.urlencode()}" if end < total_count else None
+            query['page'] = page - 1
+            previous_link = f"?{query.urlencode()}" if page > 1 else None
+            
+            return Response({
+                'detail': 'Success',
+                'current_run_id': current_run_id,
+                'prior_run_id': prior_run_id,
+                'totals': totals,
+                'count': total_count,
+                'next': next_link,
+                'previous': previous_link,
+                'results': serializer.data
+            })
+            
+        except Exception as e:
+            logger.error(f"Error comparing run values: {str(e)}")
+            return Response({
+                'detail': f'Error: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
     @action(detail=False, methods=['get'])
     def compare_runs(self, request):
         current_run_id = request.query_params.get('current_run_id')
@@ -2766,46 +3155,35 @@ class AuditViewSet(viewsets.ReadOnlyModelViewSet):
                     'result': existing.ai_response_json,
                 })
             
-            current_result = IFRSEngineResult.objects.filter(run_id=current_run_id).first()
-            prior_result = IFRSEngineResult.objects.filter(run_id=prior_run_id).first()
+            current_located = ResultValueIndex.lookup(current_run_id, value_id)
+            prior_located = ResultValueIndex.lookup(prior_run_id, value_id)
             
-            if not current_result:
+            if not current_located and not IFRSEngineResult.objects.filter(run_id=current_run_id).exists():
                 return Response({
                     'detail': f'Current run {current_run_id} not found'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            if not prior_result:
+            if not prior_located and not IFRSEngineResult.objects.filter(run_id=prior_run_id).exists():
                 return Response({
                     'detail': f'Prior run {prior_run_id} not found'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            current_json = current_result.result_json or {}
-            prior_json = prior_result.result_json or {}
-            
             current_value = None
             prior_value = None
             
-            if isinstance(current_json, dict) and 'calculations' in current_json:
-                calculations = current_json['calculations']
-                for key, calc_data in calculations.items():
-                    if calc_data.get('value_id') == value_id:
-                        current_value = {
-                            'value_id': value_id,
-                            'amount': calc_data.get('amount', 0),
-                            'metadata': current_json.get('metadata', {})
-                        }
-                        break
-            
-            if isinstance(prior_json, dict) and 'calculations' in prior_json:
-                calculations = prior_json['calculations']
-                for key, calc_data in calculations.items():
-                    if calc_data.get('value_id') == value_id:
-                        prior_value = {
-                            'value_id': value_id,
-                            'amount': calc_data.get('amount', 0),
-                            'metadata': prior_json.get('metadata', {})
-                        }
-                        break
+            if current_located:
+                current_value = {
+                    'value_id': value_id,
+                    'amount': (current_located['calculation'] or {}).get('amount', 0),
+                    'metadata': current_located['metadata'] or {}
+                }
+            
+            if prior_located:
+                prior_value = {
+                    'value_id': value_id,
+                    'amount': (prior_located['calculation'] or {}).get('amount', 0),
+                    'metadata': prior_located['metadata'] or {}
+                }
             
             if not current_value:
                 return Response({
@@ -2911,16 +3289,15 @@ class AuditViewSet(viewsets.ReadOnlyModelViewSet):
                     current_calc_value.formula_human_readable != prior_calc_value.formula_human_readable
                 )
             
-            ai_insight = self._generate_ai_insight(comparison_data)
-            comparison_data['ai_insight'] = ai_insight
+            comparison_data['ai_insight'] = ai_insights.generate_insights([comparison_data])[0]
             
             try:
                 AIVarianceAnalysis.objects.create(
                     run_id_current=current_run_id,
                     run_id_prior=prior_run_id,
                     value_id=value_id,
-                    current_json_snapshot=current_json if isinstance(current_json, dict) else {},
-                    prior_json_snapshot=prior_json if isinstance(prior_json, dict) else {},
+                    current_snapshot=ResultSnapshot.for_result(current_located['result_id']),
+                    prior_snapshot=ResultSnapshot.for_result(prior_located['result_id']),
                     ai_response_json=comparison_data,
                 )
             except Exception as save_err:
@@ -2936,180 +3313,3 @@ class AuditViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({
                 'detail': f'Error: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    def _get_openai_client(self):
-        api_key = settings.OPENAI_API_KEY
-        try:
-            return OpenAI(api_key=api_key)
-        except TypeError as e:
-            if "proxies" in str(e):
-                try:
-                    import httpx
-                    return OpenAI(api_key=api_key, http_client=httpx.Client())
-                except Exception:
-                    raise e
-            raise
-
-    def _generate_ai_insight(self, comparison_data):
-        if OPENAI_AVAILABLE and settings.OPENAI_API_KEY:
-            try:
-                return self._generate_ai_insight_with_openai(comparison_data)
-            except Exception as e:
-                logger.error(f"OpenAI API call failed: {str(e)}")
-                return self._generate_fallback_insight(comparison_data)
-        else:
-            return self._generate_fallback_insight(comparison_data)
-    
-    def _generate_ai_insight_with_openai(self, comparison_data):
-        client = self._get_openai_client()
-        
-        absolute_change = comparison_data['absolute_change']
-        percentage_change = comparison_data['percentage_change']
-        current_value = comparison_data['current_value']
-        prior_value = comparison_data['prior_value']
-        value_id = comparison_data['value_id']
-        
-        prompt_parts = [
-            f"You are an IFRS 17 audit analyst reviewing changes in insurance contract valuations.",
-            f"\n\nValue ID: {value_id}",
-            f"\nCurrent Value: ${current_value:,.2f}",
-            f"Prior Value: ${prior_value:,.2f}",
-            f"Absolute Change: ${absolute_change:,.2f}",
-            f"Percentage Change: {percentage_change:.2f}%"
-        ]
-        
-        if comparison_data.get('has_audit_data'):
-            prompt_parts.append("\n\nDetailed Change Information:")
-            
-            if comparison_data.get('formula_changed'):
-                prompt_parts.append("\n- The calculation formula was modified between runs")
-            
-            assumption_changes = comparison_data.get('assumption_changes', [])
-            if assumption_changes:
-                prompt_parts.append(f"\n\nAssumption Changes ({len(assumption_changes)} total):")
-                for change in assumption_changes[:10]:
-                    change_type = change['type'].replace('_', ' ')
-                    assumption_type = change['assumption_type'].replace('_', ' ')
-                    if change['type'] == 'version_changed':
-                        prompt_parts.append(
-                            f"\n- {change_type.upper()}: {assumption_type} (ID: {change['assumption_id']}) "
-                            f"version changed from {change.get('prior_version', 'N/A')} to {change.get('current_version', 'N/A')}"
-                        )
-                    else:
-                        prompt_parts.append(
-                            f"\n- {change_type.upper()}: {assumption_type} (ID: {change['assumption_id']})"
-                        )
-                if len(assumption_changes) > 10:
-                    prompt_parts.append(f"\n- ... and {len(assumption_changes) - 10} more assumption changes")
-            
-            input_changes = comparison_data.get('input_changes', [])
-            if input_changes:
-                prompt_parts.append(f"\n\nInput Data Changes ({len(input_changes)} total):")
-                for change in input_changes[:10]:
-                    change_type = change['type'].replace('_', ' ')
-                    if change['type'] == 'snapshot_changed':
-                        record_change = change.get('current_record_count', 0) - change.get('prior_record_count', 0)
-                        prompt_parts.append(
-                            f"\n- {change_type.upper()}: {change['dataset_name']} "
-                            f"(snapshot: {change.get('prior_snapshot', 'N/A')} → {change.get('current_snapshot', 'N/A')}, "
-                            f"records changed by {record_change:+,})"
-                        )
-                    else:
-                        prompt_parts.append(
-                            f"\n- {change_type.upper()}: {change['dataset_name']}"
-                        )
-                if len(input_changes) > 10:
-                    prompt_parts.append(f"\n- ... and {len(input_changes) - 10} more input changes")
-        
-        prompt_parts.append(
-            "\n\nProvide your analysis structured into exactly these 4 numbered sections with bold headers. "
-            "Each section should be 1-3 sentences, specific and actionable:"
-            "\n\n1. Magnitude Assessment: Describe the size of the change (negligible/minor/moderate/significant) with context."
-            "\n\n2. Primary Drivers of the Change: Explain what specifically caused this movement based on the data provided."
-            "\n\n3. Potential Implications for IFRS 17 Compliance: Describe what this means from a regulatory and reporting perspective."
-            "\n\n4. Red Flags or Items Requiring Auditor Attention: List any concerns, risks, or items needing follow-up."
-            "\n\nReturn only the 4 numbered sections. No introduction, no conclusion. Focus on what an auditor needs to know."
-        )
-        
-        prompt = ''.join(prompt_parts)
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert IFRS 17 audit analyst with deep knowledge of insurance contract accounting, actuarial assumptions, and regulatory compliance. Provide clear, professional insights."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.3,
-            max_tokens=500
-        )
-        
-        ai_insight = response.choices[0].message.content.strip()
-        return ai_insight
-    
-    def _generate_fallback_insight(self, comparison_data):
-        absolute_change = comparison_data['absolute_change']
-        percentage_change = comparison_data['percentage_change']
-        
-        if abs(percentage_change) < 0.01:
-            magnitude = "negligible"
-        elif abs(percentage_change) < 5:
-            magnitude = "minor"
-        elif abs(percentage_change) < 20:
-            magnitude = "moderate"
-        else:
-            magnitude = "significant"
-        
-        direction = "increased" if absolute_change > 0 else "decreased"
-        
-        insight_parts = [
-            f"The value has {direction} by {abs(percentage_change):.2f}% (${abs(absolute_change):,.2f}), which represents a {magnitude} change."
-        ]
-        
-        if comparison_data.get('has_audit_data'):
-            changes = []
-            
-            if comparison_data.get('formula_changed'):
-                changes.append("calculation formula was modified")
-            
-            assumption_changes = comparison_data.get('assumption_changes', [])
-            if assumption_changes:
-                added = len([c for c in assumption_changes if c['type'] == 'added'])
-                removed = len([c for c in assumption_changes if c['type'] == 'removed'])
-                version_changed = len([c for c in assumption_changes if c['type'] == 'version_changed'])
-                
-                if added:
-                    changes.append(f"{added} assumption(s) were added")
-                if removed:
-                    changes.append(f"{removed} assumption(s) were removed")
-                if version_changed:
-                    changes.append(f"{version_changed} assumption(s) were updated to new versions")
-            
-            input_changes = comparison_data.get('input_changes', [])
-            if input_changes:
-                snapshot_changed = len([c for c in input_changes if c['type'] == 'snapshot_changed'])
-                added = len([c for c in input_changes if c['type'] == 'added'])
-                removed = len([c for c in input_changes if c['type'] == 'removed'])
-                
-                if snapshot_changed:
-                    changes.append(f"{snapshot_changed} input dataset(s) were updated with new data snapshots")
-                if added:
-                    changes.append(f"{added} input dataset(s) were added")
-                if removed:
-                    changes.append(f"{removed} input dataset(s) were removed")
-            
-            if changes:
-                insight_parts.append("\n\nKey drivers of the change:")
-                for i, change in enumerate(changes, 1):
-                    insight_parts.append(f"\n{i}. {change.capitalize()}")
-            else:
-                insight_parts.append("\n\nNo significant changes detected in assumptions, inputs, or formulas. The change may be due to indirect factors or rounding differences.")
-        else:
-            insight_parts.append("\n\nNote: Detailed audit data is not available for these runs. Enable audit trail tracking for more comprehensive change analysis.")
-        
-        return ''.join(insight_parts)
@@ -0,0 +1,16 @@
+"""
+Runtime for pulling data from the API sources configured in ``IFRSApiConfig``.
+"""
+from .client import ConnectorError
+from .replay import replay_upload
+from .runtime import RunStats, dry_run, record_run_outcome, run_config, test_connection
+
+__all__ = [
+    'ConnectorError',
+    'RunStats',
+    'dry_run',
+    'record_run_outcome',
+    'replay_upload',
+    'run_config',
+    'test_connection',
+]
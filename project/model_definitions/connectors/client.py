@@ -0,0 +1,206 @@
+"""
+Pooled async HTTP client for API connectors with rate limiting and retries.
+"""
+import asyncio
+import base64
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .throttling import TokenBucket, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class ConnectorError(Exception):
+    """
+    Raised when an API source cannot be reached or returns an unusable response.
+    """
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def resolve_secret(reference: Optional[str]) -> Optional[str]:
+    """
+    Secrets are referenced by environment variable name in ``secret_references``;
+    the values themselves are never stored on the config.
+    """
+    if not reference:
+        return None
+    value = os.environ.get(reference)
+    if value is None:
+        raise ConnectorError(f"Secret reference '{reference}' is not set in the environment")
+    return value
+
+
+def split_headers_query_params(headers_query_params: Optional[Dict[str, Any]]):
+    """
+    ``headers_query_params`` may hold ``headers`` / ``query_params`` sub-objects;
+    any other top level keys are treated as query parameters.
+    """
+    values = dict(headers_query_params or {})
+    headers = dict(values.pop('headers', None) or {})
+    params = dict(values.pop('query_params', None) or values.pop('params', None) or {})
+    params.update(values)
+    return {str(k): str(v) for k, v in headers.items()}, params
+
+
+class ConnectorClient:
+    """
+    Wraps an ``httpx.AsyncClient`` configured from an ``IFRSApiConfig``.
+
+    A ``transport`` can be injected (e.g. ``httpx.MockTransport``) to run the
+    connector against a local mock server without network access.
+    """
+
+    def __init__(self, config, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 rate_limiter: Optional[TokenBucket] = None, max_connections: int = 10):
+        self.config = config
+        self.rate_limiter = rate_limiter or TokenBucket(config.max_rps)
+        self.request_count = 0
+
+        headers, self.base_params = split_headers_query_params(config.headers_query_params)
+        headers.setdefault('Accept', 'application/json')
+
+        client_kwargs = {
+            'headers': headers,
+            'timeout': httpx.Timeout(max(config.timeout_ms or 0, 1) / 1000.0),
+            'limits': httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            'follow_redirects': True,
+        }
+        if transport is not None:
+            client_kwargs['transport'] = transport
+        elif config.mtls_certs:
+            client_kwargs['cert'] = config.mtls_certs.path
+
+        self._client = httpx.AsyncClient(**client_kwargs)
+        self._auth_headers = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def _get_auth_headers(self) -> Dict[str, str]:
+        if self._auth_headers is not None:
+            return self._auth_headers
+
+        refs = self.config.secret_references or {}
+        auth_type = self.config.auth_type
+        headers = {}
+
+        if auth_type == 'api_key':
+            api_key = resolve_secret(refs.get('api_key'))
+            if api_key:
+                headers[refs.get('api_key_header', 'X-API-Key')] = api_key
+        elif auth_type == 'bearer':
+            token = resolve_secret(refs.get('token'))
+            if token:
+                headers['Authorization'] = f"Bearer {token}"
+        elif auth_type == 'basic':
+            username = resolve_secret(refs.get('username')) or ''
+            password = resolve_secret(refs.get('password')) or ''
+            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+            headers['Authorization'] = f"Basic {credentials}"
+        elif auth_type == 'oauth':
+            headers['Authorization'] = f"Bearer {await self._fetch_oauth_token(refs)}"
+
+        self._auth_headers = headers
+        return headers
+
+    async def _fetch_oauth_token(self, refs) -> str:
+        token_url = refs.get('token_url')
+        if not token_url:
+            raise ConnectorError("OAuth configs require a 'token_url' in secret_references")
+
+        data = {
+            'grant_type': 'client_credentials',
+            'client_id': resolve_secret(refs.get('client_id')) or self.config.client_id,
+            'client_secret': resolve_secret(refs.get('client_secret')) or '',
+        }
+        if refs.get('scope'):
+            data['scope'] = refs['scope']
+
+        response = await self._send('POST', token_url, data=data)
+        try:
+            return response.json()['access_token']
+        except (ValueError, KeyError):
+            raise ConnectorError("OAuth token response did not contain an access_token")
+
+    async def _send(self, method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+        """
+        Send with retries. With ``stream=True`` the body is not read; the caller
+        must close the returned response.
+        """
+        max_attempts = max(self.config.retry_count or 0, 0) + 1
+
+        for attempt in range(1, max_attempts + 1):
+            await self.rate_limiter.acquire()
+            self.request_count += 1
+            try:
+                request = self._client.build_request(method, url, **kwargs)
+                response = await self._client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                if attempt >= max_attempts:
+                    raise ConnectorError(f"Request to {self.config.mask_endpoint()} failed: {str(e)}")
+                delay = backoff_delay(attempt, self.config.backoff_min_ms, self.config.backoff_max_ms)
+                logger.warning(f"API request error ({e.__class__.__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code >= 400:
+                await response.aclose()
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < max_attempts:
+                delay = backoff_delay(attempt, self.config.backoff_min_ms, self.config.backoff_max_ms)
+                retry_after = response.headers.get('Retry-After')
+                if retry_after and retry_after.isdigit():
+                    # Honour the server's hint, but never wait longer than the configured ceiling
+                    delay = max(delay, min(float(retry_after), (self.config.backoff_max_ms or 0) / 1000.0))
+                logger.warning(f"API returned {response.status_code}, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code >= 400:
+                raise ConnectorError(
+                    f"API returned HTTP {response.status_code}",
+                    status_code=response.status_code
+                )
+            return response
+
+        raise ConnectorError("API request retries exhausted")
+
+    async def request(self, url: Optional[str] = None, params: Optional[Dict[str, Any]] = None,
+                      headers: Optional[Dict[str, str]] = None, json_body: Any = None,
+                      include_base_params: bool = True, stream: bool = False) -> httpx.Response:
+        """
+        Send one request to ``url`` (the configured endpoint by default).
+
+        ``include_base_params=False`` is used for absolute "next" links that
+        already carry their query string. ``stream=True`` leaves the body unread.
+        """
+        url = url or self.config.api_endpoint
+        if self.config.tls_required and httpx.URL(url).scheme != 'https':
+            raise ConnectorError("TLS is required for this API source but the endpoint is not https")
+
+        request_headers = dict(await self._get_auth_headers())
+        request_headers.update(headers or {})
+
+        request_params = dict(self.base_params) if include_base_params else {}
+        request_params.update(params or {})
+
+        kwargs = {'params': request_params, 'headers': request_headers}
+        if self.config.method == 'POST':
+            kwargs['json'] = json_body if json_body is not None else {}
+
+        return await self._send(self.config.method, url, stream=stream, **kwargs)
@@ -0,0 +1,105 @@
+"""
+Minimal JSONPath evaluation for API connector configs.
+
+Supports the subset used by ``IFRSApiConfig`` paths: ``$``, dotted keys,
+``['quoted keys']``, ``[index]`` and the ``[*]`` / ``.*`` wildcards,
+e.g. ``$.data.items[*]`` or ``$.meta['next-token']``.
+"""
+import re
+from typing import Any, List, Union
+
+_TOKEN_RE = re.compile(
+    r"""
+    \.(?P<key>[^.\[\]]+)           # .key or .*
+    | \[\s*(?P<index>-?\d+)\s*\]   # [0]
+    | \[\s*\*\s*\]                 # [*]
+    | \[\s*'(?P<sq>[^']*)'\s*\]    # ['key']
+    | \[\s*"(?P<dq>[^"]*)"\s*\]    # ["key"]
+    """,
+    re.VERBOSE
+)
+
+WILDCARD = object()
+
+
+class JSONPathError(ValueError):
+    pass
+
+
+def parse(path: str) -> List[Union[str, int, object]]:
+    """
+    Split a JSONPath expression into a list of keys, indexes and ``WILDCARD`` markers.
+    """
+    path = (path or '').strip()
+    if not path or path == '$':
+        return []
+    if path.startswith('$'):
+        path = path[1:]
+    elif not path.startswith(('.', '[')):
+        path = '.' + path
+
+    steps = []
+    position = 0
+    for match in _TOKEN_RE.finditer(path):
+        if match.start() != position:
+            raise JSONPathError(f"Unsupported JSONPath syntax near '{path[position:]}'")
+        position = match.end()
+
+        if match.group('key') is not None:
+            key = match.group('key')
+            steps.append(WILDCARD if key == '*' else key)
+        elif match.group('index') is not None:
+            steps.append(int(match.group('index')))
+        elif match.group('sq') is not None:
+            steps.append(match.group('sq'))
+        elif match.group('dq') is not None:
+            steps.append(match.group('dq'))
+        else:
+            steps.append(WILDCARD)
+
+    if position != len(path):
+        raise JSONPathError(f"Unsupported JSONPath syntax near '{path[position:]}'")
+    return steps
+
+
+def find(path: str, document: Any) -> List[Any]:
+    """
+    Return every value matched by ``path`` in ``document``.
+    """
+    matches = [document]
+    for step in parse(path):
+        next_matches = []
+        for value in matches:
+            if step is WILDCARD:
+                if isinstance(value, list):
+                    next_matches.extend(value)
+                elif isinstance(value, dict):
+                    next_matches.extend(value.values())
+            elif isinstance(step, int):
+                if isinstance(value, list) and -len(value) <= step < len(value):
+                    next_matches.append(value[step])
+            elif isinstance(value, dict) and step in value:
+                next_matches.append(value[step])
+        matches = next_matches
+    return matches
+
+
+def first(path: str, document: Any, default: Any = None) -> Any:
+    matches = find(path, document)
+    return matches[0] if matches else default
+
+
+def find_records(path: str, document: Any) -> List[Any]:
+    """
+    Resolve the records of a response page.
+
+    A path ending in a wildcard already yields one match per record; a path that
+    points at an array (``$.data.items``) is expanded into its elements.
+    """
+    if not path:
+        return document if isinstance(document, list) else [document]
+
+    matches = find(path, document)
+    if len(matches) == 1 and isinstance(matches[0], list) and parse(path)[-1:] != [WILDCARD]:
+        return matches[0]
+    return matches
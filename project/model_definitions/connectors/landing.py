@@ -0,0 +1,231 @@
+"""
+Raw landing store: append-only, compressed NDJSON segments on disk.
+
+Layout under ``RAW_LANDING_ROOT``::
+
+    <source>/<YYYY>/<MM>/<DD>/<timestamp>-<id>.ndjson.gz   (or .zst)
+
+Only an index of segments (``RawLandingSegment``) is kept in the database.
+"""
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import logging
+import os
+import uuid
+from datetime import date
+from typing import Any, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+from model_definitions.models import RawLandingSegment
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+EXTENSIONS = {
+    'gzip': '.ndjson.gz',
+    'zstd': '.ndjson.zst',
+}
+
+
+def landing_root() -> str:
+    return getattr(settings, 'RAW_LANDING_ROOT', os.path.join(settings.MEDIA_ROOT, 'raw_landing'))
+
+
+def landing_compression() -> str:
+    compression = getattr(settings, 'RAW_LANDING_COMPRESSION', 'gzip')
+    if compression == 'zstd' and not ZSTD_AVAILABLE:
+        logger.warning("zstandard package not installed. Raw landing segments will use gzip.")
+        return 'gzip'
+    return compression if compression in EXTENSIONS else 'gzip'
+
+
+def source_partition(name: Optional[str]) -> str:
+    return slugify(name or '') or 'unknown'
+
+
+class _HashingFile:
+    """
+    Binary file wrapper that tracks the size and checksum of what is written.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.size = 0
+        self.digest = hashlib.sha256()
+
+    def write(self, data):
+        self.size += len(data)
+        self.digest.update(data)
+        return self.raw.write(data)
+
+    def flush(self):
+        self.raw.flush()
+
+    def close(self):
+        self.raw.close()
+
+
+class SegmentWriter:
+    """
+    Streams records into one new segment file.
+
+    The file is written under a temporary name and moved into place on
+    ``close``, which also records its ``RawLandingSegment`` index row. Nothing
+    is indexed for a segment that received no records.
+    """
+
+    def __init__(self, source: str, partition_date: Optional[date] = None, kind: str = 'api_page',
+                 api_config=None, upload_log=None, data_upload=None, page_number: Optional[int] = None):
+        self.source = source_partition(source)
+        self.partition_date = partition_date or timezone.localdate()
+        self.kind = kind
+        self.compression = landing_compression()
+        self.api_config = api_config
+        self.upload_log = upload_log
+        self.data_upload = data_upload
+        self.page_number = page_number
+        self.record_count = 0
+        self.uncompressed_size = 0
+
+        name = f"{timezone.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:12]}{EXTENSIONS[self.compression]}"
+        self.path = '/'.join([
+            self.source,
+            f"{self.partition_date:%Y}",
+            f"{self.partition_date:%m}",
+            f"{self.partition_date:%d}",
+            name,
+        ])
+        self.full_path = os.path.join(landing_root(), self.path)
+        self._temp_path = f"{self.full_path}.partial"
+        self._file = None
+        self._stream = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.full_path), exist_ok=True)
+        self._file = _HashingFile(open(self._temp_path, 'xb'))
+        if self.compression == 'zstd':
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._file, closefd=False)
+        else:
+            self._stream = gzip.GzipFile(fileobj=self._file, mode='wb', mtime=0)
+
+    def append(self, records: Iterable[Any]):
+        lines = [
+            json.dumps(record, default=str, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\n'
+            for record in records
+        ]
+        if not lines:
+            return
+        if self._stream is None:
+            self._open()
+        data = b''.join(lines)
+        self._stream.write(data)
+        self.record_count += len(lines)
+        self.uncompressed_size += len(data)
+
+    def abort(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._file.close()
+            os.remove(self._temp_path)
+            self._stream = None
+
+    def close(self) -> Optional[RawLandingSegment]:
+        if self._stream is None:
+            return None
+
+        self._stream.close()
+        self._file.flush()
+        os.fsync(self._file.raw.fileno())
+        self._file.close()
+        os.rename(self._temp_path, self.full_path)
+        self._stream = None
+
+        return RawLandingSegment.objects.create(
+            source=self.source,
+            partition_date=self.partition_date,
+            path=self.path,
+            kind=self.kind,
+            compression=self.compression,
+            api_config=self.api_config,
+            upload_log=self.upload_log,
+            data_upload=self.data_upload,
+            page_number=self.page_number,
+            record_count=self.record_count,
+            byte_size=self._file.size,
+            uncompressed_size=self.uncompressed_size,
+            sha256=self._file.digest.hexdigest(),
+        )
+
+
+def write_segment(records: Iterable[Any], source: str, **kwargs) -> Optional[RawLandingSegment]:
+    writer = SegmentWriter(source, **kwargs)
+    try:
+        writer.append(records)
+    except Exception:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+def read_segment(segment: RawLandingSegment) -> Iterator[Any]:
+    """
+    Yield the records of a segment one at a time.
+    """
+    full_path = os.path.join(landing_root(), segment.path)
+    if segment.compression == 'zstd':
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard package is required to read zstd segments")
+        with open(full_path, 'rb') as raw:
+            reader = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw))
+            for line in reader:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    with gzip.open(full_path, 'rb') as reader:
+        for line in reader:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_segment_records(segments: Iterable[RawLandingSegment]) -> Iterator[Any]:
+    for segment in segments:
+        yield from read_segment(segment)
+
+
+def offloaded_payload(instance) -> Any:
+    """
+    ``api_payload`` of a ``DataUpload`` / ``APIUploadLog``, read back from its
+    offload segment when it has been moved out of the database.
+    """
+    if instance.api_payload is not None:
+        return instance.api_payload
+    segment = instance.raw_segments.filter(kind='payload_offload').order_by('-id').first()
+    if segment is None:
+        return None
+    return next(read_segment(segment), None)
+
+
+def record_payload(record) -> Any:
+    """
+    Full payload of an ``APIRecord``, read back from its landing segment when
+    only the segment reference was kept in the database.
+    """
+    if not record.segment_path:
+        return record.payload
+    segment = RawLandingSegment.objects.filter(path=record.segment_path).first()
+    if segment is None:
+        return None
+    return next(itertools.islice(read_segment(segment), record.segment_offset, None), None)
@@ -0,0 +1,163 @@
+"""
+Page iteration for the pagination strategies supported by ``IFRSApiConfig``.
+
+Each yielded page exposes its records through ``page.batches()``. Consume (or
+skip) them before asking for the next page: the pagination decision may depend
+on values that only become known once the page body has been read.
+"""
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from .client import ConnectorClient, ConnectorError
+from .streaming import BufferedPage, StreamingPage, can_stream, should_stream
+
+DEFAULT_MAX_PAGES = 10000
+
+
+class _OpenPage:
+    """
+    Async context manager requesting one page; a streamed response stays open
+    until the block exits.
+    """
+
+    def __init__(self, client: ConnectorClient, number: int, stream: bool, request_kwargs: Dict[str, Any]):
+        self.client = client
+        self.number = number
+        self.stream = stream
+        self.request_kwargs = request_kwargs
+        self.response = None
+
+    async def __aenter__(self):
+        config = self.client.config
+        if not self.stream:
+            response = await self.client.request(**self.request_kwargs)
+            return BufferedPage(config, self.number, response)
+
+        self.response = await self.client.request(stream=True, **self.request_kwargs)
+        if not should_stream(self.response):
+            await self.response.aread()
+            return BufferedPage(config, self.number, self.response)
+        return StreamingPage(config, self.number, self.response)
+
+    async def __aexit__(self, *exc_info):
+        if self.response is not None:
+            await self.response.aclose()
+
+
+def resume_token(config, page) -> Optional[str]:
+    """
+    The cursor (or next-page URL) to request after ``page``, for strategies
+    that cannot be resumed from a page number alone.
+    """
+    strategy = config.pagination_strategy or 'none'
+    if strategy == 'cursor_next_token':
+        return str(page.next_token) if page.next_token else None
+    if strategy == 'link_based':
+        next_url = page.links.get('next', {}).get('url') or page.next_token
+        if not next_url:
+            return None
+        next_url = str(httpx.URL(page.url).join(next_url))
+        return None if next_url == page.url else next_url
+    return None
+
+
+async def iter_pages(client: ConnectorClient, params: Optional[Dict[str, Any]] = None,
+                     headers: Optional[Dict[str, str]] = None, json_body: Any = None,
+                     start_page: int = 1, start_token: Optional[str] = None,
+                     max_pages: int = DEFAULT_MAX_PAGES, stream: Optional[bool] = None) -> AsyncIterator[Any]:
+    """
+    Yield response pages following the config's pagination strategy.
+
+    ``start_page`` / ``start_token`` let a run resume part way through a
+    traversal: the token is the cursor, or the next URL for link-based
+    pagination, and pages are numbered on from ``start_page``. ``stream`` defaults to incremental parsing
+    whenever the config's paths allow it.
+    """
+    config = client.config
+    strategy = config.pagination_strategy or 'none'
+    params = dict(params or {})
+    json_body = dict(json_body) if isinstance(json_body, dict) else json_body
+    if stream is None:
+        stream = can_stream(config)
+
+    def open_page(number, **request_kwargs):
+        request_kwargs.setdefault('headers', headers)
+        request_kwargs.setdefault('json_body', json_body)
+        return _OpenPage(client, number, stream, request_kwargs)
+
+    if strategy == 'none':
+        async with open_page(start_page, params=params) as page:
+            yield page
+            await page.drain()
+        return
+
+    if strategy == 'page_limit':
+        page_param = config.page_param_name or 'page'
+        limit_param = config.limit_param_name or 'limit'
+        limit = config.limit_value
+        fetched = (start_page - 1) * (limit or 0)
+        number = start_page
+
+        for _ in range(max_pages):
+            page_params = dict(params, **{page_param: number})
+            if limit:
+                page_params[limit_param] = limit
+            async with open_page(number, params=page_params) as page:
+                yield page
+                await page.drain()
+
+            fetched += page.record_count
+            if not page.record_count or (limit and page.record_count < limit):
+                return
+            if page.total_count is not None and fetched >= page.total_count:
+                return
+            number += 1
+        return
+
+    if strategy == 'cursor_next_token':
+        if not (config.next_page_token_jsonpath or config.next_token_jsonpath):
+            raise ConnectorError("Cursor pagination requires a next page token JSONPath")
+        token_param = config.page_param_name or 'next_token'
+        token = start_token
+        seen_tokens = set()
+        number = start_page
+
+        for _ in range(max_pages):
+            page_params = dict(params)
+            if token:
+                page_params[token_param] = token
+            if config.limit_value:
+                page_params[config.limit_param_name or 'limit'] = config.limit_value
+            async with open_page(number, params=page_params) as page:
+                yield page
+                await page.drain()
+
+            token = page.next_token
+            if not token or token in seen_tokens:
+                return
+            seen_tokens.add(token)
+            number += 1
+        return
+
+    if strategy == 'link_based':
+        url = start_token
+        number = start_page
+
+        for _ in range(max_pages):
+            if url is None:
+                context = open_page(number, params=params)
+            else:
+                context = open_page(number, url=url, include_base_params=False)
+            async with context as page:
+                yield page
+                await page.drain()
+
+            url = resume_token(config, page)
+            if not url:
+                return
+            number += 1
+        return
+
+    raise ConnectorError(f"Unsupported pagination strategy '{strategy}'")
+
@@ -0,0 +1,166 @@
+"""
+Replays a failed ``APIUploadLog`` without redoing the work it already committed.
+
+A run checkpoints its log after every page it commits, so a replay:
+
+* discards what was written for the page that was in flight when it failed,
+* re-processes the stored ``api_payload`` (or its offload segment) when the
+  log carries one, or otherwise resumes fetching after the last committed
+  page / cursor, with the run's original watermark window,
+* skips records whose ``primary_key_fields`` were already written by the run
+  (``upsert_on_key`` sources are idempotent by construction).
+"""
+import logging
+import os
+from typing import Optional, Set
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from model_definitions.models import APIRecord, APIUploadLog
+
+from . import jsonpath
+from .client import ConnectorError
+from .landing import landing_root, offloaded_payload
+from .runtime import RunStats, _fail_run, _finish_run, ingest, max_watermark
+from .writer import RecordWriter, record_key_for
+
+logger = logging.getLogger(__name__)
+
+
+def _claim(upload_log: APIUploadLog) -> bool:
+    """
+    Move a failed log back to running; only one replay can win the claim.
+    """
+    claimed = APIUploadLog.objects.filter(pk=upload_log.pk, status='failed').update(
+        status='running',
+        error_message='',
+        completed_at=None,
+        replay_count=F('replay_count') + 1,
+        modified_on=timezone.now()
+    )
+    upload_log.refresh_from_db()
+    return bool(claimed)
+
+
+def _discard_uncommitted(config, upload_log: APIUploadLog):
+    """
+    Remove what the failed attempt wrote past its last committed page.
+    """
+    committed = upload_log.pages_fetched
+    with transaction.atomic():
+        tail = APIRecord.objects.filter(upload_log=upload_log, page_number__gt=committed)
+        tail_count = tail.count()
+        if tail_count:
+            updates = {'records_fetched': F('records_fetched') - tail_count}
+            # Upserted rows may predate this run; they are rewritten by the replay, not removed
+            if config.behavior != 'upsert_on_key' or not config.primary_key_fields:
+                tail.delete()
+                updates['records_inserted'] = F('records_inserted') - tail_count
+            APIUploadLog.objects.filter(pk=upload_log.pk).update(**updates)
+
+        for segment in upload_log.raw_segments.filter(kind='api_page', page_number__gt=committed):
+            full_path = os.path.join(landing_root(), segment.path)
+            if os.path.exists(full_path):
+                os.remove(full_path)
+            segment.delete()
+
+    upload_log.refresh_from_db()
+
+
+def _seen_keys(config, upload_log: APIUploadLog) -> Optional[Set[str]]:
+    key_fields = list(config.primary_key_fields or [])
+    if not key_fields or config.behavior == 'upsert_on_key':
+        return None
+    records = APIRecord.objects.filter(upload_log=upload_log).only('payload', 'mapped_fields', 'segment_path')
+    return {record_key_for(record.stored_fields, key_fields) for record in records.iterator(chunk_size=2000)}
+
+
+def _replay_payload(config, upload_log: APIUploadLog, data_upload, payload, seen_keys) -> RunStats:
+    """
+    Write the records of a stored payload as page 1 of the run.
+    """
+    records = jsonpath.find_records(config.records_jsonpath, payload)
+    writer = RecordWriter(config, upload_log=upload_log, data_upload=data_upload, seen_keys=seen_keys)
+    stats = RunStats(watermark=upload_log.watermark_start)
+
+    for start in range(0, len(records), writer.batch_size):
+        batch = records[start:start + writer.batch_size]
+        inserted, updated = writer.write(batch, page_number=1)
+        stats.records_fetched += len(batch)
+        stats.records_inserted += inserted
+        stats.records_updated += updated
+        stats.watermark = max_watermark(stats.watermark, batch, config)
+
+    stats.pages = 1
+    APIUploadLog.objects.filter(pk=upload_log.pk).update(
+        pages_fetched=1,
+        records_fetched=F('records_fetched') + stats.records_fetched,
+        records_inserted=F('records_inserted') + stats.records_inserted,
+        records_updated=F('records_updated') + stats.records_updated,
+        modified_on=timezone.now()
+    )
+    return stats
+
+
+def _prepare(upload_log: APIUploadLog):
+    config = upload_log.api_config
+    if config is None:
+        raise ConnectorError("Upload log is not linked to an API source and cannot be replayed")
+    if not _claim(upload_log):
+        raise ConnectorError("Only failed uploads can be retried")
+
+    try:
+        _discard_uncommitted(config, upload_log)
+        return config, upload_log.data_upload, _seen_keys(config, upload_log), offloaded_payload(upload_log)
+    except Exception as e:
+        _fail_run(config, upload_log, e)
+        raise
+
+
+async def areplay_upload(upload_log: APIUploadLog, transport=None) -> APIUploadLog:
+    """
+    Replay a failed ``upload_log`` and return it. Failures are recorded on the
+    log rather than raised; a log that cannot be replayed raises ``ConnectorError``.
+    """
+    config, data_upload, seen_keys, payload = await sync_to_async(_prepare)(upload_log)
+    strategy = config.pagination_strategy or 'none'
+    committed = upload_log.pages_fetched
+
+    if payload is not None and committed == 0:
+        logger.info(f"Replaying stored payload for upload log {upload_log.pk}")
+        try:
+            stats = await sync_to_async(_replay_payload)(config, upload_log, data_upload, payload, seen_keys)
+        except Exception as e:
+            logger.error(f"Replay of upload log {upload_log.pk} failed: {str(e)}")
+            await sync_to_async(_fail_run)(config, upload_log, e)
+            return upload_log
+        await sync_to_async(_finish_run)(config, upload_log, data_upload, stats)
+        return upload_log
+
+    traversal_done = committed > 0 and (
+        strategy == 'none'
+        or (strategy in ('cursor_next_token', 'link_based') and not upload_log.resume_token)
+    )
+    if traversal_done:
+        # Every page was committed; the run failed while finishing up
+        stats = RunStats(watermark=upload_log.watermark_end)
+        await sync_to_async(_finish_run)(config, upload_log, data_upload, stats)
+        return upload_log
+
+    logger.info(f"Resuming upload log {upload_log.pk} after page {committed}")
+    return await ingest(
+        config, upload_log, data_upload, transport=transport,
+        start_page=committed + 1,
+        start_token=upload_log.resume_token if committed else None,
+        seen_keys=seen_keys
+    )
+
+
+def replay_upload(upload_log: APIUploadLog, transport=None) -> APIUploadLog:
+    """
+    Synchronous entry point for ``areplay_upload``.
+    """
+    return async_to_sync(areplay_upload)(upload_log, transport=transport)
@@ -0,0 +1,176 @@
+"""
+Upload totals for ``APIUploadLog`` and their ``APIUploadRollup`` aggregates.
+
+A config's ``rollup_fields`` names the record fields holding premiums, paid
+claims and commissions (and optionally the line of business). When a run
+succeeds its totals are computed once from the records it wrote, stored on
+the log and added to the rollups.
+
+An ``upsert_on_key`` run can overwrite records an earlier run already rolled
+up. The writer keeps the totals of those earlier payloads on the log
+(``superseded_totals``), keyed by the reporting date and source of the run
+that rolled them up, and they are taken off those rollups when the run
+succeeds. A record is so only counted once, at its latest amounts, under the
+reporting date of the run that last wrote it.
+"""
+import logging
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from model_definitions.models import APIRecord, APIUploadLog, APIUploadRollup
+
+logger = logging.getLogger(__name__)
+
+SUM_FIELDS = {
+    'premiums': 'sum_of_premiums',
+    'paid_claims': 'sum_of_paid_claims',
+    'commissions': 'sum_of_commissions',
+}
+
+
+def _amount(value) -> Decimal:
+    if value is None or value == '':
+        return Decimal('0')
+    try:
+        return Decimal(str(value).replace(',', ''))
+    except InvalidOperation:
+        return Decimal('0')
+
+
+def _empty_totals() -> Dict[str, Decimal]:
+    totals = {name: Decimal('0') for name in SUM_FIELDS.values()}
+    totals['record_count'] = 0
+    return totals
+
+
+def _rollup_fields(config):
+    fields = (config.rollup_fields or {}) if config is not None else {}
+    sum_fields = {SUM_FIELDS[key]: field for key, field in fields.items() if key in SUM_FIELDS and field}
+    return sum_fields, fields.get('line_of_business')
+
+
+def payload_totals(payloads: Iterable[Any], config) -> Dict[str, Dict[str, Decimal]]:
+    """
+    Totals per line of business of record payloads, by the config's
+    ``rollup_fields``. Empty when the config has none.
+    """
+    sum_fields, lob_field = _rollup_fields(config)
+    totals: Dict[str, Dict[str, Decimal]] = {}
+    if not sum_fields:
+        return totals
+
+    for payload in payloads:
+        if not isinstance(payload, dict):
+            continue
+        lob = str(payload.get(lob_field) or '')[:100] if lob_field else ''
+        group = totals.setdefault(lob, _empty_totals())
+        for name, field in sum_fields.items():
+            group[name] += _amount(payload.get(field))
+        group['record_count'] += 1
+    return totals
+
+
+def serialize_totals(totals: Dict[str, Dict[str, Decimal]]) -> Dict[str, Dict[str, str]]:
+    return {
+        lob: {name: str(value) for name, value in group.items()}
+        for lob, group in totals.items()
+    }
+
+
+def parse_totals(stored: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, Decimal]]:
+    return {
+        lob: {name: (int(value) if name == 'record_count' else Decimal(value)) for name, value in group.items()}
+        for lob, group in (stored or {}).items()
+    }
+
+
+def merge_totals(totals: Dict[str, Dict[str, Decimal]], other: Dict[str, Dict[str, Decimal]], sign: int = 1):
+    """
+    Add (or with ``sign=-1`` take off) ``other`` into ``totals`` in place.
+    """
+    for lob, amounts in other.items():
+        group = totals.setdefault(lob, _empty_totals())
+        for name, value in amounts.items():
+            group[name] += sign * value
+    return totals
+
+
+def add_superseded(stored: Dict[str, Any], reporting_date, source: str,
+                   totals: Dict[str, Dict[str, Decimal]]) -> Dict[str, Any]:
+    """
+    Add ``totals`` of overwritten records, rolled up under ``reporting_date``
+    and ``source``, to a log's stored ``superseded_totals``.
+    """
+    stored = dict(stored or {})
+    by_source = dict(stored.get(str(reporting_date)) or {})
+    by_source[source] = serialize_totals(merge_totals(parse_totals(by_source.get(source)), totals))
+    stored[str(reporting_date)] = by_source
+    return stored
+
+
+def superseded_rollups(upload_log: APIUploadLog) -> Iterator[Tuple[str, str, Dict[str, Dict[str, Decimal]]]]:
+    """
+    ``(reporting_date, source, totals)`` of the records ``upload_log`` overwrote.
+    """
+    for reporting_date, by_source in (upload_log.superseded_totals or {}).items():
+        for source, stored in by_source.items():
+            yield reporting_date, source, parse_totals(stored)
+
+
+def apply_superseded(upload_log: APIUploadLog):
+    """
+    Take the records ``upload_log`` overwrote off the rollups that counted them.
+    """
+    for reporting_date, source, totals in superseded_rollups(upload_log):
+        APIUploadRollup.add_totals(reporting_date, source, merge_totals({}, totals, sign=-1), uploads=0)
+
+
+def compute_totals(upload_log: APIUploadLog, config) -> Dict[str, Dict[str, Decimal]]:
+    """
+    Totals per line of business for the records ``upload_log`` wrote.
+
+    Sources without ``rollup_fields`` fall back to the sums already set on the
+    log, under a blank line of business.
+    """
+    sum_fields, _ = _rollup_fields(config)
+
+    if not sum_fields:
+        if all(getattr(upload_log, name) is None for name in SUM_FIELDS.values()):
+            return {}
+        totals = _empty_totals()
+        for name in SUM_FIELDS.values():
+            totals[name] = getattr(upload_log, name) or Decimal('0')
+        totals['record_count'] = upload_log.records_fetched
+        return {'': totals}
+
+    records = APIRecord.objects.filter(upload_log=upload_log).only('payload', 'mapped_fields', 'segment_path')
+    return payload_totals((record.stored_fields for record in records.iterator(chunk_size=2000)), config)
+
+
+def apply_upload(upload_log: APIUploadLog, config):
+    """
+    Record the totals of a successful ``upload_log`` on the log, add them to
+    the rollups and take the records it overwrote off theirs. Call it once
+    per log, inside the transaction that marks the log successful.
+    """
+    apply_superseded(upload_log)
+    totals = compute_totals(upload_log, config)
+    if not totals:
+        return
+
+    for name in SUM_FIELDS.values():
+        setattr(upload_log, name, sum((group[name] for group in totals.values()), Decimal('0')))
+    upload_log.rollup_totals = serialize_totals(totals)
+    upload_log.save(update_fields=[*SUM_FIELDS.values(), 'rollup_totals', 'modified_on'])
+
+    source = config.api_source_name if config is not None else ''
+    APIUploadRollup.add_totals(upload_log.reporting_date, source, totals)
+
+
+def stored_totals(upload_log: APIUploadLog) -> Dict[str, Dict[str, Decimal]]:
+    """
+    Totals recorded on a log by ``apply_upload`` (or its legacy sums).
+    """
+    if upload_log.rollup_totals:
+        return parse_totals(upload_log.rollup_totals)
+    return compute_totals(upload_log, None)
@@ -0,0 +1,380 @@
+"""
+Connector runtime: runs an ``IFRSApiConfig`` end to end.
+
+HTTP work happens on an asyncio event loop (``async_to_sync``); database
+writes are handed back to Django's sync thread with ``sync_to_async``.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone as dt_timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from model_definitions.models import APIUploadLog, DataUpload, IFRSApiConfig
+
+from .client import ConnectorClient
+from .landing import SegmentWriter
+from .pagination import DEFAULT_MAX_PAGES, iter_pages, resume_token
+from .rollups import apply_upload
+from .streaming import DEFAULT_BATCH_SIZE
+from .throttling import TokenBucket
+from .writer import RecordWriter
+
+logger = logging.getLogger(__name__)
+
+BATCH_TO_UPLOAD_INSURANCE_TYPE = {
+    'direct': 'direct_insurance',
+    'reinsurance': 'reinsurance',
+    'group': 'group_insurance',
+}
+
+
+@dataclass
+class RunStats:
+    pages: int = 0
+    records_fetched: int = 0
+    records_inserted: int = 0
+    records_updated: int = 0
+    requests: int = 0
+    status_code: Optional[int] = None
+    total_count: Optional[int] = None
+    watermark: Optional[str] = None
+    sample_records: List[Any] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'pages': self.pages,
+            'records_fetched': self.records_fetched,
+            'records_inserted': self.records_inserted,
+            'records_updated': self.records_updated,
+            'requests': self.requests,
+            'status_code': self.status_code,
+            'total_count': self.total_count,
+            'watermark': self.watermark,
+            'sample_records': self.sample_records,
+        }
+
+
+def watermark_sort_key(value: Any, watermark_format: Optional[str]):
+    """
+    Comparable form of a watermark value, or None when it cannot be parsed.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        if watermark_format == 'epoch':
+            return float(value)
+        if watermark_format == 'date':
+            return date.fromisoformat(str(value)[:10])
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=dt_timezone.utc)
+        return parsed
+    except (TypeError, ValueError):
+        return None
+
+
+def max_watermark(current: Optional[str], records: List[Any], config) -> Optional[str]:
+    field_name = config.watermark_field_name
+    if not field_name:
+        return current
+
+    best = current
+    best_key = watermark_sort_key(current, config.watermark_format)
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        value = record.get(field_name)
+        key = watermark_sort_key(value, config.watermark_format)
+        if key is None:
+            continue
+        if best_key is None or key > best_key:
+            best, best_key = str(value), key
+    return best
+
+
+def later_watermark(first: Optional[str], second: Optional[str], config) -> Optional[str]:
+    first_key = watermark_sort_key(first, config.watermark_format)
+    second_key = watermark_sort_key(second, config.watermark_format)
+    if first_key is None:
+        return second if second_key is not None else first
+    if second_key is None or first_key >= second_key:
+        return first
+    return second
+
+
+def watermark_request_parts(config, watermark: Optional[str]):
+    """
+    Place the starting watermark in the query string, headers or body as configured.
+    """
+    params, headers, json_body = {}, {}, None
+    if watermark and config.watermark_field_name:
+        location = config.watermark_location or 'query_param'
+        if location == 'header':
+            headers[config.watermark_field_name] = str(watermark)
+        elif location == 'body':
+            json_body = {config.watermark_field_name: watermark}
+        else:
+            params[config.watermark_field_name] = watermark
+    return params, headers, json_body
+
+
+async def collect(config, transport=None, write: Optional[Callable[[int, List[Any]], Any]] = None,
+                  checkpoint: Optional[Callable[[Any], Any]] = None,
+                  watermark: Optional[str] = None, max_records: Optional[int] = None,
+                  max_pages: int = DEFAULT_MAX_PAGES, sample_size: int = 0,
+                  rate_limiter: Optional[TokenBucket] = None,
+                  batch_size: int = DEFAULT_BATCH_SIZE, stream: Optional[bool] = None,
+                  start_page: int = 1, start_token: Optional[str] = None) -> RunStats:
+    """
+    Fetch pages for ``config``, passing records to the synchronous
+    ``write(page_number, records)`` in batches of ``batch_size`` and calling
+    the synchronous ``checkpoint(page)`` once each page is complete.
+    ``start_page`` / ``start_token`` resume a traversal (see ``iter_pages``).
+    """
+    stats = RunStats(watermark=watermark)
+    params, headers, json_body = watermark_request_parts(config, watermark)
+    write_async = sync_to_async(write) if write else None
+    checkpoint_async = sync_to_async(checkpoint) if checkpoint else None
+    limit_reached = False
+
+    async with ConnectorClient(config, transport=transport, rate_limiter=rate_limiter) as client:
+        try:
+            async for page in iter_pages(client, params=params, headers=headers, json_body=json_body,
+                                         start_page=start_page, start_token=start_token,
+                                         max_pages=max_pages, stream=stream):
+                stats.status_code = page.status_code
+
+                async for records in page.batches(batch_size):
+                    if max_records is not None:
+                        records = records[:max(max_records - stats.records_fetched, 0)]
+
+                    stats.records_fetched += len(records)
+                    if len(stats.sample_records) < sample_size:
+                        stats.sample_records.extend(records[:sample_size - len(stats.sample_records)])
+                    stats.watermark = max_watermark(stats.watermark, records, config)
+
+                    if write_async and records:
+                        inserted, updated = await write_async(page.number, records)
+                        stats.records_inserted += inserted
+                        stats.records_updated += updated
+
+                    if max_records is not None and stats.records_fetched >= max_records:
+                        limit_reached = True
+                        break
+
+                if page.total_count is not None:
+                    stats.total_count = page.total_count
+                stats.pages += 1
+                if checkpoint_async:
+                    await checkpoint_async(page)
+                if limit_reached:
+                    break
+        finally:
+            stats.requests = client.request_count
+
+    return stats
+
+
+def test_connection(config: IFRSApiConfig, transport=None) -> RunStats:
+    """
+    Fetch the first page only and record the outcome on the config.
+    """
+    try:
+        stats = async_to_sync(collect)(config, transport=transport, max_pages=1, sample_size=1)
+    except Exception:
+        IFRSApiConfig.objects.filter(pk=config.pk).update(
+            last_test_date=timezone.now(), last_test_status='failed'
+        )
+        raise
+
+    IFRSApiConfig.objects.filter(pk=config.pk).update(
+        last_test_date=timezone.now(), last_test_status='success'
+    )
+    return stats
+
+
+def dry_run(config: IFRSApiConfig, transport=None, max_records: int = 100) -> RunStats:
+    """
+    Fetch up to ``max_records`` records without writing anything or moving the watermark.
+    """
+    watermark = config.last_watermark or config.default_initial_watermark
+    return async_to_sync(collect)(
+        config, transport=transport, watermark=watermark,
+        max_records=max_records, sample_size=max_records
+    )
+
+
+def record_run_outcome(config: IFRSApiConfig, success: bool, watermark: Optional[str] = None):
+    """
+    Update the config's run bookkeeping, auto-disabling it after too many consecutive failures.
+    """
+    now = timezone.now()
+    configs = IFRSApiConfig.objects.filter(pk=config.pk)
+    if success:
+        updates = {'last_run_date': now, 'consecutive_failures': 0}
+        if watermark is not None:
+            updates['last_watermark'] = watermark
+        configs.update(**updates)
+    else:
+        configs.update(last_run_date=now, consecutive_failures=F('consecutive_failures') + 1)
+        if config.auto_disable_on_failures:
+            disabled = configs.filter(
+                status='active',
+                consecutive_failures__gte=config.auto_disable_on_failures
+            ).update(status='disabled')
+            if disabled:
+                logger.warning(f"API source {config} disabled after repeated failures")
+    config.refresh_from_db(fields=['last_run_date', 'consecutive_failures', 'last_watermark', 'status'])
+
+
+def _create_data_upload(config, batch, uploaded_by) -> DataUpload:
+    data_types = dict(DataUpload.DATA_TYPE_CHOICES)
+    data_upload = DataUpload(
+        batch=batch,
+        source='api',
+        insurance_type=BATCH_TO_UPLOAD_INSURANCE_TYPE.get(batch.insurance_type, 'direct_insurance'),
+        data_type=config.data_type if config.data_type in data_types else 'manual_data',
+        quarter=batch.batch_quarter,
+        year=batch.batch_year,
+        uploaded_by=uploaded_by,
+    )
+    data_upload.save()
+    return data_upload
+
+
+def _start_run(config, batch, reporting_date, uploaded_by, watermark_start):
+    data_upload = _create_data_upload(config, batch, uploaded_by) if batch is not None else None
+    upload_log = APIUploadLog.objects.create(
+        api_config=config,
+        reporting_date=reporting_date or timezone.localdate(),
+        status='running',
+        data_upload=data_upload,
+        watermark_start=watermark_start,
+    )
+    return upload_log, data_upload
+
+
+def _fail_run(config, upload_log, error):
+    upload_log.refresh_from_db()
+    upload_log.status = 'failed'
+    upload_log.error_message = str(error)
+    upload_log.completed_at = timezone.now()
+    upload_log.save()
+    record_run_outcome(config, success=False)
+
+
+def _finish_run(config, upload_log, data_upload, stats):
+    with transaction.atomic():
+        upload_log.refresh_from_db()
+        upload_log.status = 'success'
+        upload_log.watermark_end = later_watermark(upload_log.watermark_end, stats.watermark, config)
+        upload_log.resume_token = None
+        upload_log.completed_at = timezone.now()
+        upload_log.save()
+        apply_upload(upload_log, config)
+
+    if data_upload is not None:
+        data_upload.rows_processed = upload_log.records_fetched
+        data_upload.save(sync_batch=False, update_fields=['rows_processed', 'modified_on'])
+        data_upload.batch.register_uploads(uploaded_document_types=[data_upload.data_type])
+
+    record_run_outcome(config, success=True, watermark=upload_log.watermark_end)
+
+
+async def arun_config(config: IFRSApiConfig, batch=None, reporting_date=None, uploaded_by=None,
+                      transport=None, full_refresh: bool = False,
+                      rate_limiter: Optional[TokenBucket] = None) -> APIUploadLog:
+    """
+    Run an ingestion for ``config`` and return its ``APIUploadLog``.
+
+    Records land in ``APIRecord``; when a ``batch`` is given, a ``DataUpload``
+    with ``source='api'`` is also created in it and linked to the records.
+    The config's watermark only moves forward after a successful run.
+    Failures are recorded on the log rather than raised.
+    """
+    watermark_start = None if full_refresh else (config.last_watermark or config.default_initial_watermark)
+    upload_log, data_upload = await sync_to_async(_start_run)(
+        config, batch, reporting_date, uploaded_by, watermark_start
+    )
+    return await ingest(config, upload_log, data_upload, transport=transport, rate_limiter=rate_limiter)
+
+
+async def ingest(config: IFRSApiConfig, upload_log: APIUploadLog, data_upload: Optional[DataUpload] = None,
+                 transport=None, rate_limiter: Optional[TokenBucket] = None, start_page: int = 1,
+                 start_token: Optional[str] = None, seen_keys=None) -> APIUploadLog:
+    """
+    Fetch into an already started ``upload_log`` from its ``watermark_start``.
+
+    Progress is checkpointed on the log after every committed page (page
+    count, resume token, watermark so far), which is what ``replay`` resumes from.
+    """
+    writer = RecordWriter(config, upload_log=upload_log, data_upload=data_upload, seen_keys=seen_keys)
+    landing_segments = {}
+    progress = {'watermark': None}
+
+    def write_batch(page_number, records):
+        landing = {}
+        if config.raw_landing_mode:
+            if page_number not in landing_segments:
+                landing_segments[page_number] = SegmentWriter(
+                    config.api_source_name,
+                    api_config=config,
+                    upload_log=upload_log,
+                    data_upload=data_upload,
+                    page_number=page_number
+                )
+            segment = landing_segments[page_number]
+            landing = {'segment_path': segment.path, 'segment_offset': segment.record_count}
+            segment.append(records)
+
+        inserted, updated = writer.write(records, page_number=page_number, **landing)
+        progress['watermark'] = max_watermark(progress['watermark'], records, config)
+        APIUploadLog.objects.filter(pk=upload_log.pk).update(
+            records_fetched=F('records_fetched') + len(records),
+            records_inserted=F('records_inserted') + inserted,
+            records_updated=F('records_updated') + updated,
+            modified_on=timezone.now()
+        )
+        return inserted, updated
+
+    def close_segments():
+        while landing_segments:
+            landing_segments.popitem()[1].close()
+
+    def complete_page(page):
+        close_segments()
+        watermark = APIUploadLog.objects.filter(pk=upload_log.pk).values_list('watermark_end', flat=True).first()
+        APIUploadLog.objects.filter(pk=upload_log.pk).update(
+            pages_fetched=F('pages_fetched') + 1,
+            resume_token=resume_token(config, page),
+            watermark_end=later_watermark(watermark, progress['watermark'], config),
+            modified_on=timezone.now()
+        )
+
+    try:
+        stats = await collect(
+            config, transport=transport, write=write_batch, checkpoint=complete_page,
+            watermark=upload_log.watermark_start, rate_limiter=rate_limiter,
+            start_page=start_page, start_token=start_token
+        )
+    except Exception as e:
+        logger.error(f"API ingestion failed for {config}: {str(e)}")
+        # Keep what was landed so far: those records are already in APIRecord
+        await sync_to_async(close_segments)()
+        await sync_to_async(_fail_run)(config, upload_log, e)
+        return upload_log
+
+    await sync_to_async(_finish_run)(config, upload_log, data_upload, stats)
+    return upload_log
+
+
+def run_config(config: IFRSApiConfig, **kwargs) -> APIUploadLog:
+    """
+    Synchronous entry point for ``arun_config``.
+    """
+    return async_to_sync(arun_config)(config, **kwargs)
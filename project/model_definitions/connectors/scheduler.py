@@ -0,0 +1,120 @@
+"""
+Runs due ``IFRSApiConfig`` sources concurrently according to their ``schedule``.
+"""
+import asyncio
+import calendar
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.utils import timezone
+
+from model_definitions.models import APIUploadLog, IFRSApiConfig
+
+from .runtime import arun_config, record_run_outcome
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_MONTHS = {
+    'monthly': 1,
+    'quarterly': 3,
+    'semi_annually': 6,
+    'yearly': 12,
+}
+
+SCHEDULE_DAYS = {
+    'daily': 1,
+    'weekly': 7,
+}
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def next_run_after(schedule: str, last_run: datetime) -> Optional[datetime]:
+    if schedule in SCHEDULE_DAYS:
+        return last_run + timedelta(days=SCHEDULE_DAYS[schedule])
+    if schedule in SCHEDULE_MONTHS:
+        return add_months(last_run, SCHEDULE_MONTHS[schedule])
+    return None
+
+
+def is_due(config: IFRSApiConfig, now: datetime) -> bool:
+    if config.status != 'active' or config.schedule == 'manual':
+        return False
+    if config.last_run_date is None:
+        return True
+    next_run = next_run_after(config.schedule, config.last_run_date)
+    return next_run is not None and next_run <= now
+
+
+def due_configs(now: Optional[datetime] = None, config_ids: Optional[List[int]] = None) -> List[IFRSApiConfig]:
+    now = now or timezone.now()
+    configs = IFRSApiConfig.objects.filter(status='active').exclude(schedule='manual')
+    if config_ids:
+        configs = configs.filter(pk__in=config_ids)
+    return [config for config in configs if is_due(config, now)]
+
+
+def claim_configs(configs: List[IFRSApiConfig], now: Optional[datetime] = None) -> List[IFRSApiConfig]:
+    """
+    Stamp ``last_run_date`` on each config with a compare-and-set so that a
+    second scheduler process picking the same configs skips them.
+    """
+    now = now or timezone.now()
+    claimed = []
+    for config in configs:
+        previous = config.last_run_date
+        lookup = Q(last_run_date__isnull=True) if previous is None else Q(last_run_date=previous)
+        if IFRSApiConfig.objects.filter(lookup, pk=config.pk, status='active').update(last_run_date=now):
+            config.last_run_date = now
+            claimed.append(config)
+    return claimed
+
+
+async def run_configs(configs: List[IFRSApiConfig], max_concurrency: int = 8,
+                      transport=None) -> Dict[int, Optional[APIUploadLog]]:
+    """
+    Run ``configs`` concurrently, at most ``max_concurrency`` at a time.
+
+    Each source keeps its own ``max_rps`` token bucket inside its client, so a
+    slow or throttled source never holds up the others beyond its semaphore slot.
+    """
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def run_one(config):
+        async with semaphore:
+            logger.info(f"Running API source {config}")
+            try:
+                return await arun_config(config, transport=transport)
+            except Exception:
+                await sync_to_async(record_run_outcome)(config, success=False)
+                raise
+
+    results = await asyncio.gather(*(run_one(config) for config in configs), return_exceptions=True)
+
+    outcome = {}
+    for config, result in zip(configs, results):
+        if isinstance(result, BaseException):
+            logger.error(f"API source {config} crashed: {str(result)}")
+            outcome[config.pk] = None
+        else:
+            outcome[config.pk] = result
+    return outcome
+
+
+async def run_due(max_concurrency: int = 8, config_ids: Optional[List[int]] = None,
+                  transport=None) -> Dict[int, Optional[APIUploadLog]]:
+    now = timezone.now()
+    configs = await sync_to_async(due_configs)(now, config_ids)
+    configs = await sync_to_async(claim_configs)(configs, now)
+    if not configs:
+        return {}
+    return await run_configs(configs, max_concurrency=max_concurrency, transport=transport)
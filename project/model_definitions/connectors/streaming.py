@@ -0,0 +1,231 @@
+"""
+Incremental record extraction for large API responses.
+
+When ``ijson`` is installed and the configured JSONPaths can be expressed as
+ijson prefixes, a response body is parsed as it streams in: records matching
+``records_jsonpath`` are built one at a time and handed out in batches, while
+the total count and next-page token are captured on the way past. Memory use
+stays proportional to one batch rather than to the page.
+"""
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from django.conf import settings
+
+from . import jsonpath
+from .client import ConnectorError
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    ijson = None
+    IJSON_AVAILABLE = False
+    logger.warning("ijson package not installed. API responses will be parsed in full.")
+
+SCALAR_EVENTS = {'string', 'number', 'boolean', 'null'}
+DEFAULT_BATCH_SIZE = 1000
+# Bodies with a known length below this are cheaper to parse in one go
+DEFAULT_STREAM_THRESHOLD_BYTES = 8 * 1024 * 1024
+
+
+def ijson_prefix(path: Optional[str]) -> Optional[str]:
+    """
+    Translate a JSONPath into an ijson prefix, or return None when it cannot be
+    streamed (explicit indexes). Wildcards are taken to iterate over arrays.
+    """
+    try:
+        steps = jsonpath.parse(path or '$')
+    except jsonpath.JSONPathError:
+        return None
+
+    parts = []
+    for step in steps:
+        if step is jsonpath.WILDCARD:
+            parts.append('item')
+        elif isinstance(step, int) or '.' in step:
+            return None
+        else:
+            parts.append(step)
+    return '.'.join(parts)
+
+
+def stream_threshold_bytes() -> int:
+    return getattr(settings, 'CONNECTOR_STREAM_THRESHOLD_BYTES', DEFAULT_STREAM_THRESHOLD_BYTES)
+
+
+def should_stream(response: httpx.Response) -> bool:
+    """
+    Stream bodies that are large or of unknown (chunked) length.
+    """
+    content_length = response.headers.get('content-length')
+    if content_length is None or not content_length.isdigit():
+        return True
+    return int(content_length) >= stream_threshold_bytes()
+
+
+def can_stream(config) -> bool:
+    if not IJSON_AVAILABLE:
+        return False
+    paths = [config.records_jsonpath, config.total_count_jsonpath, config.next_page_token_jsonpath or config.next_token_jsonpath]
+    return all(ijson_prefix(path) is not None for path in paths if path)
+
+
+class BufferedPage:
+    """
+    A page whose JSON body is parsed in full.
+    """
+
+    def __init__(self, config, number: int, response: httpx.Response):
+        self.config = config
+        self.number = number
+        self.url = str(response.request.url)
+        self.status_code = response.status_code
+        self.links = response.links
+        try:
+            self.payload = response.json()
+        except ValueError:
+            raise ConnectorError("API response is not valid JSON", status_code=response.status_code)
+
+        self.records = jsonpath.find_records(config.records_jsonpath, self.payload)
+        self.record_count = 0
+        self.total_count = _to_int(jsonpath.first(config.total_count_jsonpath, self.payload)) if config.total_count_jsonpath else None
+        token_path = config.next_page_token_jsonpath or config.next_token_jsonpath
+        self.next_token = jsonpath.first(token_path, self.payload) if token_path else None
+
+    async def batches(self, size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[List[Any]]:
+        for start in range(self.record_count, len(self.records), size):
+            batch = self.records[start:start + size]
+            self.record_count += len(batch)
+            yield batch
+
+    async def drain(self):
+        self.record_count = len(self.records)
+
+
+class StreamingPage:
+    """
+    A page whose JSON body is parsed incrementally with ijson as chunks arrive.
+
+    Records are built by ijson's C pipeline; the total count and next-page token
+    are picked out of the event stream only when those paths are configured.
+    Both values are only reliable once the records have been consumed (or
+    ``drain`` has been awaited), since they may appear anywhere in the document.
+    """
+
+    def __init__(self, config, number: int, response: httpx.Response):
+        self.config = config
+        self.number = number
+        self.url = str(response.request.url)
+        self.status_code = response.status_code
+        self.links = response.links
+        self.record_count = 0
+        self.total_count = None
+        self.next_token = None
+
+        self._response = response
+        self._chunks = None
+        self._pipelines = []
+        self._record_sink = None
+        self._event_sink = None
+        self._pending: List[Any] = []
+        self._finished = False
+
+        # A path ending in a wildcard names the records directly; any other
+        # path is taken to name the array holding them.
+        records_prefix = ijson_prefix(config.records_jsonpath)
+        steps = jsonpath.parse(config.records_jsonpath or '$')
+        if steps[-1:] == [jsonpath.WILDCARD]:
+            self._record_prefix = records_prefix
+        else:
+            self._record_prefix = f"{records_prefix}.item" if records_prefix else 'item'
+
+        token_path = config.next_page_token_jsonpath or config.next_token_jsonpath
+        self._captures: Dict[str, str] = {}
+        if config.total_count_jsonpath:
+            self._captures[ijson_prefix(config.total_count_jsonpath)] = 'total_count'
+        if token_path:
+            self._captures[ijson_prefix(token_path)] = 'next_token'
+
+    def _start(self):
+        self._chunks = self._response.aiter_bytes()
+        self._record_sink = ijson.sendable_list()
+        self._pipelines = [ijson.items_coro(self._record_sink, self._record_prefix, use_float=True)]
+        if self._captures:
+            self._event_sink = ijson.sendable_list()
+            self._pipelines.append(ijson.parse_coro(self._event_sink, use_float=True))
+
+    def _collect(self):
+        if self._event_sink:
+            for prefix, event, value in self._event_sink:
+                attribute = self._captures.get(prefix)
+                if attribute is None or event not in SCALAR_EVENTS:
+                    continue
+                if attribute == 'total_count':
+                    self.total_count = _to_int(value)
+                elif self.next_token is None:
+                    self.next_token = value
+            del self._event_sink[:]
+
+            captured = {
+                'total_count': self.total_count is not None,
+                'next_token': self.next_token is not None,
+            }
+            if all(captured[attribute] for attribute in self._captures.values()):
+                # Everything wanted from the event stream is known; stop paying for it
+                self._pipelines.pop()
+                self._event_sink = None
+
+        self._pending.extend(self._record_sink)
+        del self._record_sink[:]
+
+    async def _fill(self, size: int) -> bool:
+        """
+        Read chunks until ``size`` records are pending or the body ends.
+        Returns False once the body is exhausted.
+        """
+        if self._finished:
+            return False
+        if self._chunks is None:
+            self._start()
+
+        try:
+            while len(self._pending) < size:
+                try:
+                    chunk = await self._chunks.__anext__()
+                except StopAsyncIteration:
+                    for pipeline in self._pipelines:
+                        pipeline.close()
+                    self._collect()
+                    self._finished = True
+                    return False
+                for pipeline in self._pipelines:
+                    pipeline.send(chunk)
+                self._collect()
+        except ijson.JSONError as e:
+            raise ConnectorError(f"API response is not valid JSON: {str(e)}", status_code=self.status_code)
+        return True
+
+    async def batches(self, size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[List[Any]]:
+        while True:
+            more = await self._fill(size)
+            if self._pending:
+                batch, self._pending = self._pending[:size], self._pending[size:]
+                self.record_count += len(batch)
+                yield batch
+            elif not more:
+                return
+
+    async def drain(self):
+        async for _ in self.batches():
+            pass
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,50 @@
+"""
+Request pacing for API connectors: token bucket and jittered exponential backoff.
+"""
+import asyncio
+import random
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Async token bucket allowing ``rate`` acquisitions per second with bursts up to ``capacity``.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock=time.monotonic):
+        self.rate = max(float(rate or 0), 0.0)
+        self.capacity = float(capacity if capacity is not None else max(self.rate, 1.0))
+        self._tokens = self.capacity
+        self._clock = clock
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    async def acquire(self, tokens: float = 1.0):
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, min_ms: int, max_ms: int, rng=random) -> float:
+    """
+    Seconds to wait before retry ``attempt`` (1-based), using "full jitter":
+    a uniform draw between ``min_ms`` and an exponentially growing ceiling capped at ``max_ms``.
+    """
+    min_ms = max(int(min_ms or 0), 0)
+    max_ms = max(int(max_ms or 0), min_ms)
+    ceiling = min(max_ms, min_ms * (2 ** max(attempt - 1, 0))) if min_ms else max_ms
+    return rng.uniform(min_ms, max(ceiling, min_ms)) / 1000.0
@@ -0,0 +1,191 @@
+"""
+Persists connector pages as ``APIRecord`` rows.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from model_definitions.models import APIRecord, APIUploadLog
+
+from .rollups import add_superseded, payload_totals
+
+
+def record_key_for(record: Any, key_fields: List[str]) -> str:
+    values = [record.get(field) if isinstance(record, dict) else None for field in key_fields]
+    encoded = json.dumps(values, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class RecordWriter:
+    """
+    Writes records for one connector run.
+
+    ``append_only`` sources insert every record; ``upsert_on_key`` sources
+    update the existing row for each ``primary_key_fields`` combination and
+    insert the rest. Every page is committed in its own transaction, so an
+    interrupted run keeps the pages it already wrote.
+
+    ``seen_keys`` (record keys already written) makes append-only writes skip
+    records they have seen before; replays use it to avoid duplicates.
+
+    When an upsert overwrites a row last written by another successful run,
+    the rollup totals of its earlier payload are added to the log's
+    ``superseded_totals`` under that run's reporting date and source, in the
+    same transaction, so they can be taken off the rollup that counted them.
+
+    Pages that were landed to a segment pass its ``segment_path`` and the
+    position of their first record; those rows then keep only the segment
+    reference and their ``mapped_fields`` instead of the full payload.
+    """
+
+    def __init__(self, config, upload_log=None, data_upload=None, batch_size: int = 1000,
+                 seen_keys: Optional[Set[str]] = None):
+        self.config = config
+        self.upload_log = upload_log
+        self.data_upload = data_upload
+        self.batch_size = batch_size
+        self.key_fields = list(config.primary_key_fields or [])
+        self.upsert = config.behavior == 'upsert_on_key' and bool(self.key_fields)
+        self.seen_keys = seen_keys if self.key_fields and not self.upsert else None
+        self.skipped = 0
+        rollup_fields = config.rollup_fields or {}
+        self.mapped_names = sorted({
+            *self.key_fields,
+            *([config.watermark_field_name] if config.watermark_field_name else []),
+            *(field for field in rollup_fields.values() if field),
+        })
+
+    def _watermark(self, record: Any) -> Optional[str]:
+        field_name = self.config.watermark_field_name
+        if not field_name or not isinstance(record, dict) or record.get(field_name) is None:
+            return None
+        return str(record[field_name])[:100]
+
+    def _stored(self, record: Any, segment_path: Optional[str], offset: int) -> Dict[str, Any]:
+        """
+        Field values holding ``record`` on its row: the whole payload, or the
+        segment reference and mapped fields when it was landed.
+        """
+        if not segment_path:
+            return {'payload': record, 'mapped_fields': {}, 'segment_path': None, 'segment_offset': None}
+        mapped = {name: record[name] for name in self.mapped_names if name in record} if isinstance(record, dict) else {}
+        return {'payload': {}, 'mapped_fields': mapped, 'segment_path': segment_path, 'segment_offset': offset}
+
+    def _build(self, record: Any, record_key: Optional[str], page_number: Optional[int],
+               segment_path: Optional[str], offset: int) -> APIRecord:
+        return APIRecord(
+            api_config=self.config,
+            upload_log=self.upload_log,
+            data_upload=self.data_upload,
+            record_key=record_key,
+            watermark_value=self._watermark(record),
+            page_number=page_number,
+            **self._stored(record, segment_path, offset)
+        )
+
+    def _unseen(self, entries: List[Tuple[int, Any]]) -> List[Tuple[int, Any]]:
+        fresh = []
+        for offset, record in entries:
+            record_key = record_key_for(record, self.key_fields)
+            if record_key in self.seen_keys:
+                self.skipped += 1
+                continue
+            self.seen_keys.add(record_key)
+            fresh.append((offset, record))
+        return fresh
+
+    def write(self, records: Iterable[Any], page_number: Optional[int] = None,
+              segment_path: Optional[str] = None, segment_offset: int = 0) -> Tuple[int, int]:
+        """
+        Write one page of records and return ``(inserted, updated)``.
+
+        ``segment_path`` / ``segment_offset`` locate the records in the landing
+        segment they were appended to, if any.
+        """
+        entries = list(enumerate(records, start=segment_offset))
+        if self.seen_keys is not None:
+            entries = self._unseen(entries)
+        if not entries:
+            return 0, 0
+
+        if not self.upsert:
+            with transaction.atomic():
+                APIRecord.objects.bulk_create(
+                    [self._build(record, None, page_number, segment_path, offset) for offset, record in entries],
+                    batch_size=self.batch_size
+                )
+            return len(entries), 0
+
+        # Later records in a page win over earlier ones with the same key
+        keyed: Dict[str, Tuple[int, Any]] = {}
+        for offset, record in entries:
+            keyed[record_key_for(record, self.key_fields)] = (offset, record)
+
+        with transaction.atomic():
+            existing = {
+                row.record_key: row
+                for row in APIRecord.objects.select_for_update().filter(
+                    api_config=self.config,
+                    record_key__in=list(keyed)
+                )
+            }
+
+            now = timezone.now()
+            to_update = []
+            to_create = []
+            superseded: Dict[int, List[Any]] = {}
+            for record_key, (offset, record) in keyed.items():
+                row = existing.get(record_key)
+                if row is None:
+                    to_create.append(self._build(record, record_key, page_number, segment_path, offset))
+                    continue
+                if self.upload_log is not None and row.upload_log_id not in (None, self.upload_log.pk):
+                    superseded.setdefault(row.upload_log_id, []).append(row.stored_fields)
+                for name, value in self._stored(record, segment_path, offset).items():
+                    setattr(row, name, value)
+                row.watermark_value = self._watermark(record)
+                row.page_number = page_number
+                row.upload_log = self.upload_log
+                row.data_upload = self.data_upload or row.data_upload
+                row.modified_on = now
+                to_update.append(row)
+
+            if to_update:
+                APIRecord.objects.bulk_update(
+                    to_update,
+                    ['payload', 'mapped_fields', 'segment_path', 'segment_offset', 'watermark_value', 'upload_log', 'data_upload', 'page_number', 'modified_on'],
+                    batch_size=self.batch_size
+                )
+            if to_create:
+                APIRecord.objects.bulk_create(to_create, batch_size=self.batch_size)
+            if superseded:
+                self._supersede(superseded)
+
+        return len(to_create), len(to_update)
+
+    def _supersede(self, superseded: Dict[int, List[Any]]):
+        # Only successful runs were rolled up; records of any other run
+        # never reached a rollup and have nothing to take off
+        rolled_up = APIUploadLog.objects.filter(pk__in=list(superseded), status='success').values_list(
+            'pk', 'reporting_date', 'api_config__api_source_name'
+        )
+        totals = [
+            (reporting_date, source or '', payload_totals(superseded[pk], self.config))
+            for pk, reporting_date, source in rolled_up
+        ]
+        totals = [entry for entry in totals if entry[2]]
+        if not totals:
+            return
+
+        stored = APIUploadLog.objects.select_for_update().filter(
+            pk=self.upload_log.pk
+        ).values_list('superseded_totals', flat=True).get()
+        for reporting_date, source, amounts in totals:
+            stored = add_superseded(stored, reporting_date, source, amounts)
+        APIUploadLog.objects.filter(pk=self.upload_log.pk).update(
+            superseded_totals=stored,
+            modified_on=timezone.now()
+        )
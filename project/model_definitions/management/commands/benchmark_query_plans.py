@@ -0,0 +1,200 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from model_definitions.models import (
+    CalculationConfig, DataUpload, DataUploadBatch, IFRSEngineInput, IFRSEngineResult,
+)
+
+INSERT_BATCH_SIZE = 5000
+REPORT_TYPES = ['LRC_Movement', 'LIC_Movement', 'DR_LRC', 'DR_LIC', 'disclosure_report', 'reinsurance_report']
+DATA_TYPES = [choice for choice, _ in DataUpload.DATA_TYPE_CHOICES]
+
+# Indexes added for these query patterns, and the one they replaced
+ADDED_INDEXES = [
+    (DataUploadBatch, 'data_batch_created_idx'),
+    (DataUpload, 'data_upload_batch_type_idx'),
+    (IFRSEngineResult, 'ifrs_result_run_report_idx'),
+    (IFRSEngineResult, 'ifrs_result_report_status_idx'),
+    (IFRSEngineResult, 'ifrs_result_created_idx'),
+]
+REMOVED_INDEXES = [
+    (IFRSEngineResult, models.Index(fields=['run_id'], name='ifrs_engine_run_id_9c4be4_idx')),
+]
+
+
+def query_patterns(sample):
+    """
+    The filters the API runs against these tables, as (description, queryset).
+    """
+    config = sample['config']
+    return [
+        ("Uploads of a batch by data type",
+         DataUpload.objects.filter(batch_id=sample['batch_pk'], data_type=DATA_TYPES[0])),
+        ("Latest data batches",
+         DataUploadBatch.objects.order_by('-created_on')[:20]),
+        ("Batch id sequence seed",
+         DataUploadBatch.objects.filter(batch_id__startswith=f"{sample['batch_prefix']}-").values_list('batch_id', flat=True)),
+        ("Calculation config lookup",
+         CalculationConfig.objects.filter(
+             batch_type=config['batch_type'], batch_model=config['batch_model'],
+             insurance_type=config['insurance_type'], engine_type=config['engine_type']
+         )),
+        ("Engine results of a run and report type",
+         IFRSEngineResult.objects.filter(run_id=sample['run_id'], report_type=REPORT_TYPES[0]).defer('result_json')),
+        ("Engine results by report type and status",
+         IFRSEngineResult.objects.filter(report_type=REPORT_TYPES[1], status='Error').defer('result_json')),
+        ("Engine results keyset page",
+         IFRSEngineResult.objects.filter(created_at__lt=sample['created_at']).order_by('-created_at', '-id')
+         .defer('result_json')[:12]),
+        ("Engine input of a run",
+         IFRSEngineInput.objects.filter(run_id=sample['run_id'])),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic engine results and uploads, print the query plan of each hot filter with the '
+        'current indexes and, with --compare, without the indexes added for them. Everything is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Engine results to seed (uploads and batches scale from it)')
+        parser.add_argument('--compare', action='store_true', help='Also show the plans with the previous index set')
+        parser.add_argument('--analyze', action='store_true', help='Run EXPLAIN ANALYZE where the database supports it')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            started = time.monotonic()
+            sample = self._seed(max(options['rows'], 1))
+            self._analyze()
+            self.stdout.write(f"Seeded {options['rows']} engine results in {time.monotonic() - started:.1f}s\n")
+
+            after = self._explain(sample, options['analyze'])
+            before = None
+            if options['compare']:
+                self._restore_previous_indexes()
+                self._analyze()
+                before = self._explain(sample, options['analyze'])
+
+            for description, plan in after.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(description))
+                if before is not None:
+                    self.stdout.write("  before:")
+                    self.stdout.write(self._indent(before[description]))
+                    self.stdout.write("  after:")
+                self.stdout.write(self._indent(plan))
+                self.stdout.write("")
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Benchmark data rolled back"))
+
+    def _seed(self, rows):
+        now = timezone.now()
+        run_count = max(rows // len(REPORT_TYPES), 1)
+        batch_count = max(rows // 10, 1)
+        batch_prefix = f"BENCH-{now.year}-{now.month:02d}"
+
+        DataUploadBatch.objects.bulk_create(
+            (
+                DataUploadBatch(batch_id=f"{batch_prefix}-{number:07d}", batch_type='custom', batch_model='PAA')
+                for number in range(batch_count)
+            ),
+            batch_size=INSERT_BATCH_SIZE
+        )
+        batch_pks = list(DataUploadBatch.objects.filter(
+            batch_id__startswith=f"{batch_prefix}-"
+        ).order_by('pk').values_list('pk', flat=True))
+
+        DataUpload.objects.bulk_create(
+            (
+                DataUpload(
+                    upload_id=f"BENCH-UPLOAD-{number:08d}",
+                    batch_id=batch_pks[number % len(batch_pks)],
+                    source='custom',
+                    insurance_type='direct_insurance',
+                    data_type=DATA_TYPES[number % len(DATA_TYPES)],
+                    quarter='Q1',
+                    year=now.year,
+                )
+                for number in range(rows)
+            ),
+            batch_size=INSERT_BATCH_SIZE
+        )
+
+        IFRSEngineInput.objects.bulk_create(
+            (
+                IFRSEngineInput(
+                    run_id=f"BENCH-RUN-{number:08d}", model_definition={}, batch_data=[],
+                    field_parameters={}, created_by='benchmark'
+                )
+                for number in range(run_count)
+            ),
+            batch_size=INSERT_BATCH_SIZE
+        )
+        IFRSEngineResult.objects.bulk_create(
+            (
+                IFRSEngineResult(
+                    run_id=f"BENCH-RUN-{number // len(REPORT_TYPES):08d}",
+                    model_guid=uuid.uuid4(),
+                    model_type='GMM' if number % 2 else 'PAA',
+                    report_type=REPORT_TYPES[number % len(REPORT_TYPES)],
+                    year=now.year - (number % 5),
+                    quarter=f"Q{number % 4 + 1}",
+                    status='Error' if number % 50 == 0 else 'Success',
+                    result_json={},
+                    created_by='benchmark',
+                )
+                for number in range(rows)
+            ),
+            batch_size=INSERT_BATCH_SIZE
+        )
+        # auto_now_add stamps every row with the insert time; spread the results one day per chunk
+        first_pk = IFRSEngineResult.objects.filter(created_by='benchmark').order_by('pk').values_list('pk', flat=True).first()
+        chunk_starts = range(0, rows, INSERT_BATCH_SIZE)
+        for chunk, offset in enumerate(chunk_starts):
+            IFRSEngineResult.objects.filter(
+                created_by='benchmark', pk__gte=first_pk + offset, pk__lt=first_pk + offset + INSERT_BATCH_SIZE
+            ).update(created_at=now - timedelta(days=len(chunk_starts) - chunk))
+
+        config = CalculationConfig.objects.values('batch_type', 'batch_model', 'insurance_type', 'engine_type').first() or {
+            'batch_type': 'custom', 'batch_model': 'PAA', 'insurance_type': 'direct', 'engine_type': REPORT_TYPES[0],
+        }
+        return {
+            'batch_pk': batch_pks[len(batch_pks) // 2],
+            'batch_prefix': batch_prefix,
+            'config': config,
+            'run_id': f"BENCH-RUN-{run_count // 2:08d}",
+            'created_at': now - timedelta(days=len(chunk_starts) // 2),
+        }
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                for model in (DataUploadBatch, DataUpload, CalculationConfig, IFRSEngineInput, IFRSEngineResult):
+                    cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+            elif connection.vendor == 'sqlite':
+                cursor.execute("ANALYZE")
+
+    def _explain(self, sample, analyze):
+        explain_options = {'analyze': True} if analyze and connection.vendor == 'postgresql' else {}
+        return {
+            description: queryset.explain(**explain_options)
+            for description, queryset in query_patterns(sample)
+        }
+
+    def _restore_previous_indexes(self):
+        schema_editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model, name in ADDED_INDEXES:
+                index = next(index for index in model._meta.indexes if index.name == name)
+                cursor.execute(str(index.remove_sql(model, schema_editor)))
+            for model, index in REMOVED_INDEXES:
+                cursor.execute(str(index.create_sql(model, schema_editor)))
+
+    def _indent(self, plan):
+        return '\n'.join(f"    {line}" for line in plan.splitlines())
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from model_definitions.api.v1.urls import router
+from utils.views import RelationLoadingMixin
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every model definitions list endpoint against the current database and fail if one exceeds '
+        'its query budget. Only as telling as the rows already there; ListQueryBudgetTests is the enforced check.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='User to authenticate as (defaults to the first superuser)')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('pk').first() or User.objects.order_by('pk').first()
+        if user is None:
+            raise CommandError("No user to authenticate as")
+
+        factory = APIRequestFactory()
+        over_budget = []
+        for prefix, viewset, basename in router.registry:
+            if not issubclass(viewset, RelationLoadingMixin) or not hasattr(viewset, 'list'):
+                continue
+
+            request = factory.get(f"/{prefix}/")
+            force_authenticate(request, user=user)
+            view = viewset.as_view({'get': 'list'})
+            with CaptureQueriesContext(connection) as queries:
+                response = view(request)
+                response.render()
+
+            budget = viewset.list_query_budget
+            line = f"{basename}: {len(queries)} queries (budget {budget}, status {response.status_code})"
+            if budget is not None and len(queries) > budget:
+                over_budget.append(basename)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if over_budget:
+            raise CommandError(f"Over query budget: {', '.join(over_budget)}")
+        self.stdout.write(self.style.SUCCESS("All list endpoints are within their query budgets"))
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from model_definitions.connectors.landing import write_segment
+from model_definitions.models import APIUploadLog, DataUpload
+
+
+class Command(BaseCommand):
+    help = 'Move stored api_payload JSON out of the database into raw landing segments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of rows offloaded per transaction'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many payloads would be offloaded'
+        )
+
+    def handle(self, *args, **options):
+        data_uploads = DataUpload.objects.filter(api_payload__isnull=False)
+        upload_logs = APIUploadLog.objects.filter(api_payload__isnull=False).select_related('api_config')
+
+        if options['dry_run']:
+            self.stdout.write(f"{data_uploads.count()} data upload payloads and {upload_logs.count()} API log payloads would be offloaded")
+            return
+
+        offloaded = self.offload(
+            data_uploads,
+            lambda upload: {'source': 'data-uploads', 'data_upload': upload},
+            options['batch_size']
+        )
+        self.stdout.write(f"Offloaded {offloaded} data upload payloads")
+
+        offloaded = self.offload(
+            upload_logs,
+            lambda log: {
+                'source': log.api_config.api_source_name if log.api_config else 'api-upload-logs',
+                'api_config': log.api_config,
+                'upload_log': log,
+                'partition_date': log.reporting_date,
+            },
+            options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f"Offloaded {offloaded} API log payloads"))
+
+    def offload(self, queryset, segment_kwargs, batch_size):
+        offloaded = 0
+        last_pk = 0
+        while True:
+            rows = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+            if not rows:
+                return offloaded
+            last_pk = rows[-1].pk
+
+            with transaction.atomic():
+                for row in rows:
+                    write_segment([row.api_payload], kind='payload_offload', **segment_kwargs(row))
+                queryset.model.objects.filter(pk__in=[row.pk for row in rows]).update(api_payload=None)
+            offloaded += len(rows)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from model_definitions.connectors.rollups import apply_superseded, stored_totals
+from model_definitions.models import APIUploadLog, APIUploadRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the API upload rollups from the totals recorded on successful upload logs'
+
+    def handle(self, *args, **options):
+        logs = APIUploadLog.objects.filter(status='success').select_related('api_config').order_by('pk')
+
+        with transaction.atomic():
+            APIUploadRollup.objects.all().delete()
+            applied = 0
+            for upload_log in logs.iterator(chunk_size=500):
+                apply_superseded(upload_log)
+                totals = stored_totals(upload_log)
+                if not totals:
+                    continue
+                source = upload_log.api_config.api_source_name if upload_log.api_config else ''
+                APIUploadRollup.add_totals(upload_log.reporting_date, source, totals)
+                applied += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {APIUploadRollup.objects.count()} rollups from {applied} upload logs"
+        ))
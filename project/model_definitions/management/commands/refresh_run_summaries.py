@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from model_definitions.utils.run_summaries import refresh_run_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute the summary columns of runs from their IFRS engine results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('run_ids', nargs='*', help='Only refresh these runs (default: every run with results)')
+
+    def handle(self, *args, **options):
+        written = refresh_run_summaries(options['run_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {written} runs"))
@@ -0,0 +1,81 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from model_definitions.connectors.scheduler import due_configs, run_due
+
+
+class Command(BaseCommand):
+    help = 'Run the API sources whose schedule is due, fetching them concurrently'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-concurrency',
+            type=int,
+            default=getattr(settings, 'API_SCHEDULER_MAX_CONCURRENCY', 8),
+            help='Maximum number of API sources fetched at the same time'
+        )
+        parser.add_argument(
+            '--config',
+            type=int,
+            action='append',
+            dest='config_ids',
+            help='Only consider the given IFRSApiConfig id (repeatable)'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, checking for due sources every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=300,
+            help='Seconds between checks when running with --loop'
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List due sources without running them'
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            configs = due_configs(config_ids=options['config_ids'])
+            for config in configs:
+                self.stdout.write(f"{config.pk}: {config} ({config.schedule}, last run {config.last_run_date})")
+            self.stdout.write(f"{len(configs)} API sources due")
+            return
+
+        while True:
+            self.run_once(options)
+            if not options['loop']:
+                break
+            time.sleep(max(options['interval'], 1))
+
+    def run_once(self, options):
+        started = time.monotonic()
+        results = async_to_sync(run_due)(
+            max_concurrency=options['max_concurrency'],
+            config_ids=options['config_ids']
+        )
+        if not results:
+            self.stdout.write('No API sources due')
+            return
+
+        succeeded = 0
+        for config_id, upload_log in results.items():
+            if upload_log is not None and upload_log.status == 'success':
+                succeeded += 1
+                self.stdout.write(f"  [{config_id}] {upload_log.records_fetched} records")
+            else:
+                error = upload_log.error_message if upload_log is not None else 'crashed'
+                self.stdout.write(self.style.ERROR(f"  [{config_id}] failed: {error}"))
+
+        message = f"{succeeded}/{len(results)} API sources succeeded in {time.monotonic() - started:.1f}s"
+        if succeeded == len(results):
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(self.style.WARNING(message))
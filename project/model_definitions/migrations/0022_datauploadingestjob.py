@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('model_definitions', '0021_idsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataUploadIngestJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_on', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('modified_on', models.DateTimeField(auto_now=True, verbose_name='last updated')),
+                ('job_id', models.CharField(blank=True, max_length=50, unique=True)),
+                ('status', models.CharField(choices=[('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='processing', max_length=20)),
+                ('total_items', models.IntegerField(default=0, help_text='Number of upload descriptors in the manifest')),
+                ('created_count', models.IntegerField(default=0, help_text='Number of uploads created by this job')),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ingest_jobs', to='model_definitions.datauploadbatch')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='data_upload_ingest_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Data Upload Ingest Job',
+                'verbose_name_plural': 'Data Upload Ingest Jobs',
+                'db_table': 'data_upload_ingest_jobs',
+                'ordering': ['-created_on'],
+            },
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='ingest_job',
+            field=models.ForeignKey(blank=True, help_text='Bulk ingest job that created this upload, if any', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='uploads', to='model_definitions.datauploadingestjob'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0022_datauploadingestjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ifrsapiconfig',
+            name='last_watermark',
+            field=models.CharField(blank=True, help_text='Highest watermark value ingested by the last successful run', max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='apiuploadlog',
+            name='status',
+            field=models.CharField(choices=[('running', 'Running'), ('success', 'Success'), ('failed', 'Failed')], max_length=20),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='api_config',
+            field=models.ForeignKey(blank=True, help_text='API source this log was produced by', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_logs', to='model_definitions.ifrsapiconfig'),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='pages_fetched',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='records_fetched',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='records_inserted',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='records_updated',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='watermark_start',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='watermark_end',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='APIRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_on', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('modified_on', models.DateTimeField(auto_now=True, verbose_name='last updated')),
+                ('record_key', models.CharField(blank=True, help_text='SHA-256 of the primary key field values', max_length=64, null=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('watermark_value', models.CharField(blank=True, max_length=100, null=True)),
+                ('api_config', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='records', to='model_definitions.ifrsapiconfig')),
+                ('data_upload', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='api_records', to='model_definitions.dataupload')),
+                ('upload_log', models.ForeignKey(blank=True, help_text='Run that last wrote this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='records', to='model_definitions.apiuploadlog')),
+            ],
+            options={
+                'verbose_name': 'API Record',
+                'verbose_name_plural': 'API Records',
+                'db_table': 'api_records',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='apirecord',
+            constraint=models.UniqueConstraint(fields=('api_config', 'record_key'), name='api_record_config_key_uniq'),
+        ),
+    ]
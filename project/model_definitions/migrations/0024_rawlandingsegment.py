@@ -0,0 +1,38 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0023_apirecord_connector_runtime'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RawLandingSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(db_index=True, help_text='Source partition (slugified API source name)', max_length=255)),
+                ('partition_date', models.DateField(db_index=True, help_text='Date partition the segment was landed under')),
+                ('path', models.CharField(help_text='Path relative to RAW_LANDING_ROOT', max_length=500, unique=True)),
+                ('kind', models.CharField(choices=[('api_page', 'API Page'), ('payload_offload', 'Offloaded Payload')], default='api_page', max_length=20)),
+                ('compression', models.CharField(choices=[('gzip', 'gzip'), ('zstd', 'zstd')], default='gzip', max_length=10)),
+                ('page_number', models.IntegerField(blank=True, null=True)),
+                ('record_count', models.IntegerField(default=0)),
+                ('byte_size', models.BigIntegerField(default=0, help_text='Compressed size on disk')),
+                ('uncompressed_size', models.BigIntegerField(default=0)),
+                ('sha256', models.CharField(help_text='Checksum of the compressed file', max_length=64)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('api_config', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='raw_segments', to='model_definitions.ifrsapiconfig')),
+                ('data_upload', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='raw_segments', to='model_definitions.dataupload')),
+                ('upload_log', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='raw_segments', to='model_definitions.apiuploadlog')),
+            ],
+            options={
+                'verbose_name': 'Raw Landing Segment',
+                'verbose_name_plural': 'Raw Landing Segments',
+                'db_table': 'raw_landing_segments',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0024_rawlandingsegment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apirecord',
+            name='page_number',
+            field=models.IntegerField(blank=True, help_text='Page of the run the record was fetched on', null=True),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='resume_token',
+            field=models.TextField(blank=True, help_text='Cursor or next-page URL following the last committed page', null=True),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='replay_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0025_apiuploadlog_resume'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ifrsapiconfig',
+            name='rollup_fields',
+            field=models.JSONField(blank=True, default=dict, help_text='Record fields feeding the upload totals: premiums, paid_claims, commissions, line_of_business'),
+        ),
+        migrations.AddField(
+            model_name='apiuploadlog',
+            name='rollup_totals',
+            field=models.JSONField(blank=True, help_text='Totals per line of business added to the upload rollups', null=True),
+        ),
+        migrations.CreateModel(
+            name='APIUploadRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reporting_date', models.DateField()),
+                ('source', models.CharField(help_text='API source name', max_length=255)),
+                ('line_of_business', models.CharField(blank=True, default='', max_length=100)),
+                ('sum_of_premiums', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('sum_of_paid_claims', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('sum_of_commissions', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('upload_count', models.IntegerField(default=0)),
+                ('record_count', models.IntegerField(default=0)),
+                ('modified_on', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'API Upload Rollup',
+                'verbose_name_plural': 'API Upload Rollups',
+                'db_table': 'api_upload_rollups',
+                'ordering': ['-reporting_date', 'source', 'line_of_business'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='apiuploadrollup',
+            constraint=models.UniqueConstraint(fields=('reporting_date', 'source', 'line_of_business'), name='api_upload_rollup_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='apiuploadrollup',
+            index=models.Index(fields=['source', 'reporting_date'], name='api_rollup_source_date_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0026_apiuploadrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='modeldefinitionhistory',
+            name='config',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='modeldefinitionhistory',
+            name='config_diff',
+            field=models.JSONField(blank=True, help_text='JSON patch from the previous version', null=True),
+        ),
+        migrations.AddField(
+            model_name='modeldefinitionhistory',
+            name='config_hash',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 of the full configuration', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='modeldefinitionhistory',
+            name='is_snapshot',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='modeldefinitionhistory',
+            name='sequence',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.db import migrations, models
+
+from model_definitions.utils.json_patch import apply_patch, config_hash, make_patch
+
+
+def _entries(ModelDefinitionHistory, model_id, ordering, chunk_size=100):
+    """
+    A model's history in order, read in chunks so rows can be rewritten while walking it.
+    """
+    ids = list(
+        ModelDefinitionHistory.objects.filter(model_id=model_id).order_by(*ordering).values_list('id', flat=True)
+    )
+    for start in range(0, len(ids), chunk_size):
+        chunk_ids = ids[start:start + chunk_size]
+        rows = ModelDefinitionHistory.objects.in_bulk(chunk_ids)
+        for pk in chunk_ids:
+            yield rows[pk]
+
+
+def compact_history(apps, schema_editor):
+    """
+    Turn the existing full-copy history into snapshot/delta chains.
+
+    Every row is kept: a version identical to the one before it becomes a
+    delta with an empty patch, so its author and timestamp stay in the
+    audit trail and ``expand_history`` can restore it.
+    """
+    ModelDefinitionHistory = apps.get_model('model_definitions', 'ModelDefinitionHistory')
+    interval = max(getattr(settings, 'MODEL_HISTORY_SNAPSHOT_INTERVAL', 20), 1)
+
+    model_ids = list(ModelDefinitionHistory.objects.order_by('model_id').values_list('model_id', flat=True).distinct())
+    for model_id in model_ids:
+        previous = None
+        sequence = 0
+        last_snapshot = None
+        for entry in _entries(ModelDefinitionHistory, model_id, ('saved_at', 'id')):
+            config = entry.config if entry.config is not None else {}
+            entry_hash = config_hash(config)
+
+            sequence += 1
+            entry.sequence = sequence
+            entry.config_hash = entry_hash
+            if last_snapshot is None or sequence - last_snapshot >= interval:
+                entry.is_snapshot = True
+                last_snapshot = sequence
+            else:
+                entry.is_snapshot = False
+                entry.config_diff = make_patch(previous.full_config, config)
+                entry.config = None
+            entry.save(update_fields=['sequence', 'config_hash', 'is_snapshot', 'config_diff', 'config'])
+
+            entry.full_config = config
+            previous = entry
+
+
+def expand_history(apps, schema_editor):
+    """
+    Store the full config on every version again.
+    """
+    ModelDefinitionHistory = apps.get_model('model_definitions', 'ModelDefinitionHistory')
+
+    model_ids = list(ModelDefinitionHistory.objects.order_by('model_id').values_list('model_id', flat=True).distinct())
+    for model_id in model_ids:
+        config = {}
+        for entry in _entries(ModelDefinitionHistory, model_id, ('sequence',)):
+            if entry.is_snapshot:
+                config = entry.config if entry.config is not None else {}
+                continue
+            config = apply_patch(config, entry.config_diff or [])
+            entry.config = config
+            entry.save(update_fields=['config'])
+
+
+class Migration(migrations.Migration):
+    # The data pass commits before the constraint is added
+    atomic = False
+
+    dependencies = [
+        ('model_definitions', '0027_modeldefinitionhistory_deltas'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_history, expand_history, atomic=True),
+        migrations.AddConstraint(
+            model_name='modeldefinitionhistory',
+            constraint=models.UniqueConstraint(fields=('model', 'sequence'), name='model_history_sequence_uniq'),
+        ),
+    ]
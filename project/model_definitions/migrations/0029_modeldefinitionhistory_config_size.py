@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+from model_definitions.utils.json_patch import apply_patch, config_size
+
+
+def fill_config_size(apps, schema_editor):
+    ModelDefinitionHistory = apps.get_model('model_definitions', 'ModelDefinitionHistory')
+
+    model_ids = list(ModelDefinitionHistory.objects.order_by('model_id').values_list('model_id', flat=True).distinct())
+    for model_id in model_ids:
+        config = {}
+        chain = ModelDefinitionHistory.objects.filter(model_id=model_id).order_by('sequence')
+        sizes = {}
+        for pk, is_snapshot, snapshot, diff in chain.values_list('id', 'is_snapshot', 'config', 'config_diff').iterator():
+            if is_snapshot:
+                config = snapshot if snapshot is not None else {}
+            else:
+                config = apply_patch(config, diff or [], in_place=True)
+            sizes[pk] = config_size(config)
+
+        for pk, size in sizes.items():
+            ModelDefinitionHistory.objects.filter(pk=pk).update(config_size=size)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0028_compact_model_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modeldefinitionhistory',
+            name='config_size',
+            field=models.IntegerField(default=0, help_text='Size in bytes of the full configuration as JSON'),
+        ),
+        migrations.RunPython(fill_config_size, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+
+def fill_general_info(apps, schema_editor):
+    ModelDefinition = apps.get_model('model_definitions', 'ModelDefinition')
+
+    definitions = []
+    for definition in ModelDefinition.objects.only('id', 'config').iterator(chunk_size=500):
+        config = definition.config if isinstance(definition.config, dict) else {}
+        frontend_info = config.get('generalInfo') or {}
+        backend_info = config.get('general_info') or {}
+        definition.measurement_model = str(frontend_info.get('measurementModel') or backend_info.get('measurement_model') or '')[:20]
+        definition.product_type = str(frontend_info.get('productType') or backend_info.get('product_type') or '')[:100]
+        definition.status = str(frontend_info.get('status') or backend_info.get('status') or 'draft')[:20]
+        definitions.append(definition)
+
+    ModelDefinition.objects.bulk_update(
+        definitions, ['measurement_model', 'product_type', 'status'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0029_modeldefinitionhistory_config_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modeldefinition',
+            name='measurement_model',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='modeldefinition',
+            name='product_type',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='modeldefinition',
+            name='status',
+            field=models.CharField(blank=True, db_index=True, default='draft', max_length=20),
+        ),
+        migrations.RunPython(fill_general_info, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0030_modeldefinition_general_info_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(max_length=50, unique=True)),
+                ('year', models.IntegerField()),
+                ('quarter', models.CharField(max_length=2)),
+                ('model_type', models.CharField(max_length=10)),
+                ('currency', models.CharField(blank=True, max_length=10, null=True)),
+                ('status', models.CharField(help_text="Status of the run's latest result", max_length=20)),
+                ('execution_date', models.DateTimeField(help_text="Creation time of the run's latest result")),
+                ('result_count', models.IntegerField(default=0)),
+                ('report_types', models.JSONField(blank=True, default=list)),
+                ('modified_on', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Run Summary',
+                'verbose_name_plural': 'Run Summaries',
+                'db_table': 'run_summaries',
+                'ordering': ['-execution_date', 'run_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='runsummary',
+            index=models.Index(fields=['-execution_date'], name='run_summary_exec_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='runsummary',
+            index=models.Index(fields=['year', 'quarter'], name='run_summary_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='runsummary',
+            index=models.Index(fields=['model_type'], name='run_summary_model_type_idx'),
+        ),
+    ]
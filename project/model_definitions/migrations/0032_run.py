@@ -0,0 +1,99 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0031_runsummary'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='RunSummary',
+            new_name='Run',
+        ),
+        migrations.AlterModelTable(
+            name='run',
+            table='runs',
+        ),
+        migrations.AlterModelOptions(
+            name='run',
+            options={'ordering': ['-execution_date', 'run_id'], 'verbose_name': 'Run', 'verbose_name_plural': 'Runs'},
+        ),
+        migrations.AlterField(
+            model_name='run',
+            name='run_id',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='run',
+            name='year',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='run',
+            name='quarter',
+            field=models.CharField(blank=True, max_length=2, null=True),
+        ),
+        migrations.AlterField(
+            model_name='run',
+            name='model_type',
+            field=models.CharField(blank=True, max_length=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='run',
+            name='status',
+            field=models.CharField(blank=True, default='', help_text="Status of the run's latest result", max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='run',
+            name='execution_date',
+            field=models.DateTimeField(blank=True, help_text="Creation time of the run's latest result", null=True),
+        ),
+        migrations.AddField(
+            model_name='run',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='run',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='run',
+            name='error_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aivarianceanalysis',
+            name='current_run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='current_variance_analyses', to='model_definitions.run'),
+        ),
+        migrations.AddField(
+            model_name='aivarianceanalysis',
+            name='prior_run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='prior_variance_analyses', to='model_definitions.run'),
+        ),
+        migrations.AddField(
+            model_name='calculationvalue',
+            name='engine_run',
+            field=models.ForeignKey(blank=True, help_text='Run this row belongs to, resolved from run_id on save', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='calculation_values', to='model_definitions.run'),
+        ),
+        migrations.AddField(
+            model_name='ifrsengineinput',
+            name='engine_run',
+            field=models.ForeignKey(blank=True, help_text='Run this row belongs to, resolved from run_id on save', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inputs', to='model_definitions.run'),
+        ),
+        migrations.AddField(
+            model_name='ifrsengineresult',
+            name='engine_run',
+            field=models.ForeignKey(blank=True, help_text='Run this row belongs to, resolved from run_id on save', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='results', to='model_definitions.run'),
+        ),
+        migrations.AddField(
+            model_name='submittedreport',
+            name='engine_run',
+            field=models.ForeignKey(blank=True, help_text='Run this row belongs to, resolved from run_id on save', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submitted_reports', to='model_definitions.run'),
+        ),
+    ]
@@ -0,0 +1,104 @@
+from django.db import migrations
+from django.db.models import Count, Max, Min, OuterRef, Q, Subquery
+
+CHUNK_SIZE = 500
+
+RUN_COLUMNS = [
+    ('IFRSEngineInput', 'run_id', 'engine_run'),
+    ('IFRSEngineResult', 'run_id', 'engine_run'),
+    ('CalculationValue', 'run_id', 'engine_run'),
+    ('SubmittedReport', 'run_id', 'engine_run'),
+    ('AIVarianceAnalysis', 'run_id_current', 'current_run'),
+    ('AIVarianceAnalysis', 'run_id_prior', 'prior_run'),
+]
+
+
+def _summarize(Run, IFRSEngineResult, run_ids):
+    results = IFRSEngineResult.objects.filter(run_id__in=run_ids)
+    grouped = results.order_by().values('run_id').annotate(
+        execution_date=Max('created_at'),
+        first_result_at=Min('created_at'),
+        result_count=Count('id'),
+        error_count=Count('id', filter=Q(status='Error')),
+    )
+    totals = {row['run_id']: row for row in grouped}
+
+    latest = {}
+    report_types = {}
+    rows = results.order_by('run_id', '-created_at', '-id').values_list(
+        'run_id', 'year', 'quarter', 'model_type', 'currency', 'status', 'report_type'
+    )
+    for run_id, year, quarter, model_type, currency, status, report_type in rows.iterator():
+        latest.setdefault(run_id, (year, quarter, model_type, currency, status))
+        report_types.setdefault(run_id, set()).add(report_type)
+
+    runs = Run.objects.in_bulk(run_ids, field_name='run_id')
+    for run_id, total in totals.items():
+        run = runs[run_id]
+        run.year, run.quarter, run.model_type, run.currency, run.status = latest[run_id]
+        run.execution_date = total['execution_date']
+        run.started_at = total['first_result_at']
+        run.completed_at = total['execution_date']
+        run.result_count = total['result_count']
+        run.error_count = total['error_count']
+        run.report_types = sorted(report_types[run_id])
+    Run.objects.bulk_update(
+        [runs[run_id] for run_id in totals],
+        ['year', 'quarter', 'model_type', 'currency', 'status', 'execution_date', 'started_at',
+         'completed_at', 'result_count', 'error_count', 'report_types'],
+    )
+
+
+def backfill_runs(apps, schema_editor):
+    """
+    Create a Run for every run_id referenced by the engine tables, derive its
+    summary columns from its results and point the referencing rows at it.
+    """
+    Run = apps.get_model('model_definitions', 'Run')
+    IFRSEngineResult = apps.get_model('model_definitions', 'IFRSEngineResult')
+
+    run_ids = set()
+    for model_name, column, _ in RUN_COLUMNS:
+        model = apps.get_model('model_definitions', model_name)
+        run_ids.update(model.objects.order_by(column).values_list(column, flat=True).distinct())
+    run_ids.discard(None)
+    run_ids.discard('')
+
+    existing = set(Run.objects.values_list('run_id', flat=True))
+    Run.objects.bulk_create(
+        [Run(run_id=run_id) for run_id in sorted(run_ids - existing)],
+        batch_size=CHUNK_SIZE
+    )
+
+    result_run_ids = sorted(IFRSEngineResult.objects.order_by('run_id').values_list('run_id', flat=True).distinct())
+    for start in range(0, len(result_run_ids), CHUNK_SIZE):
+        _summarize(Run, IFRSEngineResult, result_run_ids[start:start + CHUNK_SIZE])
+
+    for model_name, column, fk in RUN_COLUMNS:
+        model = apps.get_model('model_definitions', model_name)
+        run_pk = Run.objects.filter(run_id=OuterRef(column)).order_by().values('pk')[:1]
+        model.objects.filter(**{f'{fk}__isnull': True}).exclude(**{column: ''}).update(**{fk: Subquery(run_pk)})
+
+
+def drop_result_less_runs(apps, schema_editor):
+    """
+    Before the Run columns become required again, drop runs that have no
+    results to fill them from.
+    """
+    Run = apps.get_model('model_definitions', 'Run')
+    Run.objects.filter(
+        Q(year__isnull=True) | Q(quarter__isnull=True) | Q(model_type__isnull=True) | Q(execution_date__isnull=True)
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('model_definitions', '0032_run'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_runs, drop_result_less_runs),
+    ]
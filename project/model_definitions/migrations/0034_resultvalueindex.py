@@ -0,0 +1,36 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0033_backfill_runs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultValueIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(max_length=100)),
+                ('report_type', models.CharField(max_length=50)),
+                ('value_id', models.CharField(max_length=200)),
+                ('json_key', models.CharField(help_text="Key of the value under result_json['calculations']", max_length=300)),
+                ('engine_result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='value_index', to='model_definitions.ifrsengineresult')),
+            ],
+            options={
+                'verbose_name': 'Result Value Index Entry',
+                'verbose_name_plural': 'Result Value Index',
+                'db_table': 'result_value_index',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='resultvalueindex',
+            constraint=models.UniqueConstraint(fields=('engine_result', 'value_id'), name='result_value_index_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='resultvalueindex',
+            index=models.Index(fields=['run_id', 'value_id', 'report_type'], name='result_value_lookup_idx'),
+        ),
+    ]
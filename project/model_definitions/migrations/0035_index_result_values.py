@@ -0,0 +1,44 @@
+from django.db import migrations
+
+CHUNK_SIZE = 200
+
+
+def index_result_values(apps, schema_editor):
+    """
+    Index the calculations of every stored engine result.
+    """
+    IFRSEngineResult = apps.get_model('model_definitions', 'IFRSEngineResult')
+    ResultValueIndex = apps.get_model('model_definitions', 'ResultValueIndex')
+
+    ids = list(IFRSEngineResult.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        results = IFRSEngineResult.objects.in_bulk(ids[start:start + CHUNK_SIZE])
+        entries = []
+        for result in results.values():
+            calculations = result.result_json.get('calculations') if isinstance(result.result_json, dict) else None
+            if not isinstance(calculations, dict):
+                continue
+            keys = {}
+            for key, calc_data in calculations.items():
+                value_id = calc_data.get('value_id') if isinstance(calc_data, dict) else None
+                if value_id and str(key) and len(str(key)) <= 300:
+                    keys.setdefault(str(value_id)[:200], str(key))
+            entries.extend(
+                ResultValueIndex(engine_result_id=result.pk, run_id=result.run_id, report_type=result.report_type,
+                                 value_id=value_id, json_key=key)
+                for value_id, key in keys.items()
+            )
+        ResultValueIndex.objects.bulk_create(entries, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('model_definitions', '0034_resultvalueindex'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_result_values, migrations.RunPython.noop),
+    ]
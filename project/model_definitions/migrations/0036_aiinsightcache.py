@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0035_index_result_values'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIInsightCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_hash', models.CharField(max_length=64, unique=True)),
+                ('insight', models.TextField()),
+                ('model_name', models.CharField(blank=True, default='', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'AI Insight Cache Entry',
+                'verbose_name_plural': 'AI Insight Cache',
+                'db_table': 'ai_insight_cache',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0036_aiinsightcache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(help_text='SHA-256 of the canonical JSON', max_length=64, unique=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('size_bytes', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Result Snapshot',
+                'verbose_name_plural': 'Result Snapshots',
+                'db_table': 'result_snapshots',
+            },
+        ),
+        migrations.AddField(
+            model_name='aivarianceanalysis',
+            name='current_snapshot',
+            field=models.ForeignKey(blank=True, help_text='Exact JSON used for the current run in this comparison', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='model_definitions.resultsnapshot'),
+        ),
+        migrations.AddField(
+            model_name='aivarianceanalysis',
+            name='prior_snapshot',
+            field=models.ForeignKey(blank=True, help_text='Exact JSON used for the prior run in this comparison', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='model_definitions.resultsnapshot'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+from model_definitions.utils.json_patch import config_hash, config_size
+
+CHUNK_SIZE = 500
+
+
+def move_snapshots(apps, schema_editor):
+    """
+    Replace the inline JSON snapshots of every analysis with references to
+    shared ResultSnapshot rows, one per distinct content.
+    """
+    AIVarianceAnalysis = apps.get_model('model_definitions', 'AIVarianceAnalysis')
+    ResultSnapshot = apps.get_model('model_definitions', 'ResultSnapshot')
+
+    snapshot_ids = {}
+
+    def snapshot_id(payload):
+        payload = payload if isinstance(payload, dict) else {}
+        content_hash = config_hash(payload)
+        if content_hash not in snapshot_ids:
+            snapshot, _ = ResultSnapshot.objects.get_or_create(
+                content_hash=content_hash,
+                defaults={'payload': payload, 'size_bytes': config_size(payload)}
+            )
+            snapshot_ids[content_hash] = snapshot.pk
+        return snapshot_ids[content_hash]
+
+    ids = list(AIVarianceAnalysis.objects.filter(current_snapshot__isnull=True).order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        analyses = AIVarianceAnalysis.objects.in_bulk(ids[start:start + CHUNK_SIZE])
+        for analysis in analyses.values():
+            analysis.current_snapshot_id = snapshot_id(analysis.current_json_snapshot)
+            analysis.prior_snapshot_id = snapshot_id(analysis.prior_json_snapshot)
+        AIVarianceAnalysis.objects.bulk_update(list(analyses.values()), ['current_snapshot', 'prior_snapshot'])
+
+
+def restore_snapshots(apps, schema_editor):
+    AIVarianceAnalysis = apps.get_model('model_definitions', 'AIVarianceAnalysis')
+    ResultSnapshot = apps.get_model('model_definitions', 'ResultSnapshot')
+
+    ids = list(AIVarianceAnalysis.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        analyses = AIVarianceAnalysis.objects.in_bulk(ids[start:start + CHUNK_SIZE])
+        snapshot_ids = {
+            snapshot_id
+            for analysis in analyses.values()
+            for snapshot_id in (analysis.current_snapshot_id, analysis.prior_snapshot_id)
+            if snapshot_id
+        }
+        payloads = {pk: snapshot.payload for pk, snapshot in ResultSnapshot.objects.in_bulk(snapshot_ids).items()}
+        for analysis in analyses.values():
+            analysis.current_json_snapshot = payloads.get(analysis.current_snapshot_id, {})
+            analysis.prior_json_snapshot = payloads.get(analysis.prior_snapshot_id, {})
+        AIVarianceAnalysis.objects.bulk_update(list(analyses.values()), ['current_json_snapshot', 'prior_json_snapshot'])
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('model_definitions', '0037_resultsnapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_snapshots, restore_snapshots),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0038_move_variance_snapshots'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='aivarianceanalysis',
+            name='current_json_snapshot',
+        ),
+        migrations.RemoveField(
+            model_name='aivarianceanalysis',
+            name='prior_json_snapshot',
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0039_remove_inline_variance_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ifrsengineresult',
+            name='value_count',
+            field=models.IntegerField(default=0, help_text='Number of audit trail values written for this result'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.models import Count
+
+CHUNK_SIZE = 500
+
+
+def backfill_value_counts(apps, schema_editor):
+    """
+    Count the audit trail values of every engine result in one grouped
+    query per chunk of results.
+    """
+    IFRSEngineResult = apps.get_model('model_definitions', 'IFRSEngineResult')
+    CalculationValue = apps.get_model('model_definitions', 'CalculationValue')
+
+    result_ids = sorted(
+        CalculationValue.objects.order_by('engine_result_id').values_list('engine_result_id', flat=True).distinct()
+    )
+    for start in range(0, len(result_ids), CHUNK_SIZE):
+        chunk = result_ids[start:start + CHUNK_SIZE]
+        counts = dict(
+            CalculationValue.objects.filter(engine_result_id__in=chunk).order_by()
+            .values('engine_result_id').annotate(count=Count('id')).values_list('engine_result_id', 'count')
+        )
+        results = IFRSEngineResult.objects.in_bulk(chunk)
+        for result_id, result in results.items():
+            result.value_count = counts[result_id]
+        IFRSEngineResult.objects.bulk_update(list(results.values()), ['value_count'])
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('model_definitions', '0040_ifrsengineresult_value_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_value_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0041_backfill_value_counts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submittedreport',
+            name='ifrs_engine_result_id',
+            field=models.IntegerField(help_text='Foreign key reference to IFRSEngineResult', null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def clear_missing_engine_results(apps, schema_editor):
+    """
+    Submitted reports whose engine result is gone lose the reference, so the
+    column can take a foreign key constraint.
+    """
+    SubmittedReport = apps.get_model('model_definitions', 'SubmittedReport')
+    IFRSEngineResult = apps.get_model('model_definitions', 'IFRSEngineResult')
+
+    SubmittedReport.objects.filter(ifrs_engine_result_id__isnull=False).exclude(
+        ifrs_engine_result_id__in=IFRSEngineResult.objects.values('id')
+    ).update(ifrs_engine_result_id=None)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('model_definitions', '0042_submittedreport_nullable_engine_result'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_missing_engine_results, migrations.RunPython.noop),
+    ]
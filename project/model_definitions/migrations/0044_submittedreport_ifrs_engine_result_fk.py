@@ -0,0 +1,32 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0043_clear_missing_engine_results'),
+    ]
+
+    operations = [
+        # Rename in state only; the column keeps its name through db_column
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='submittedreport',
+                    old_name='ifrs_engine_result_id',
+                    new_name='ifrs_engine_result',
+                ),
+                migrations.AlterField(
+                    model_name='submittedreport',
+                    name='ifrs_engine_result',
+                    field=models.IntegerField(db_column='ifrs_engine_result_id', help_text='Foreign key reference to IFRSEngineResult', null=True),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='submittedreport',
+            name='ifrs_engine_result',
+            field=models.ForeignKey(blank=True, db_column='ifrs_engine_result_id', help_text='Engine result this report was submitted from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submissions', to='model_definitions.ifrsengineresult'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0044_submittedreport_ifrs_engine_result_fk'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='datauploadbatch',
+            index=models.Index(fields=['-created_on'], name='data_batch_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataupload',
+            index=models.Index(fields=['batch', 'data_type'], name='data_upload_batch_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ifrsengineresult',
+            index=models.Index(fields=['run_id', 'report_type'], name='ifrs_result_run_report_idx'),
+        ),
+        # Covered by the leading column of ifrs_result_run_report_idx
+        migrations.RemoveIndex(
+            model_name='ifrsengineresult',
+            name='ifrs_engine_run_id_9c4be4_idx',
+        ),
+        migrations.AddIndex(
+            model_name='ifrsengineresult',
+            index=models.Index(fields=['report_type', 'status', '-created_at'], name='ifrs_result_report_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ifrsengineresult',
+            index=models.Index(fields=['-created_at', '-id'], name='ifrs_result_created_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0046_apiuploadlog_superseded_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apirecord',
+            name='mapped_fields',
+            field=models.JSONField(blank=True, default=dict, help_text='Key, watermark and rollup fields of a record whose payload is in its landing segment'),
+        ),
+        migrations.AddField(
+            model_name='apirecord',
+            name='segment_path',
+            field=models.CharField(blank=True, help_text='Landing segment holding the full record, relative to RAW_LANDING_ROOT', max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='apirecord',
+            name='segment_offset',
+            field=models.IntegerField(blank=True, help_text='Position of the record in its segment', null=True),
+        ),
+    ]
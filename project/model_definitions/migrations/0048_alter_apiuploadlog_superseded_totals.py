@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model_definitions', '0047_apirecord_landing_reference'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='apiuploadlog',
+            name='superseded_totals',
+            field=models.JSONField(blank=True, default=dict, help_text='Totals per line of business of earlier records this run overwrote, by the reporting date and source they were rolled up under'),
+        ),
+    ]
@@ -1,9 +1,11 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import DatabaseError, connection, models, transaction
+from django.db.models.fields.json import KeyTransform
 from django.utils import timezone
 import os
 
+from model_definitions.utils.json_patch import apply_patch, config_hash, config_size, make_patch
 from utils.models import TimeStampedMixin
 
 User = get_user_model()
@@ -25,6 +27,11 @@ class ModelDefinition(TimeStampedMixin):
     )
     config = models.JSONField(default=dict)  # All configuration including generalInfo (description, status, productType, measurementModel), assumptions, formulas, parameters
     
+    # Copied from config's general info on save so listings can filter on indexed columns
+    measurement_model = models.CharField(max_length=20, blank=True, default='', db_index=True)
+    product_type = models.CharField(max_length=100, blank=True, default='', db_index=True)
+    status = models.CharField(max_length=20, blank=True, default='draft', db_index=True)
+    
     created_by = models.ForeignKey(
         User, 
         on_delete=models.SET_NULL, 
@@ -60,25 +67,54 @@ class ModelDefinition(TimeStampedMixin):
         verbose_name = 'Model Definition'
         verbose_name_plural = 'Model Definitions'
 
+    GENERAL_INFO_FIELDS = ['measurement_model', 'product_type', 'status']
+
     def __str__(self):
         return f"{self.name} (v{self.version})"
 
+    def save(self, *args, **kwargs):
+        self.sync_general_info()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'config' in update_fields:
+            kwargs['update_fields'] = {*update_fields, *self.GENERAL_INFO_FIELDS}
+        super().save(*args, **kwargs)
+
+    def sync_general_info(self):
+        """
+        Refresh the denormalised general info columns from ``config``. The
+        frontend's ``generalInfo`` wins over the ``general_info`` copy made on
+        create. Queryset ``update(config=...)`` calls bypass this.
+        """
+        config = self.config if isinstance(self.config, dict) else {}
+        frontend_info = config.get('generalInfo') or {}
+        backend_info = config.get('general_info') or {}
+        self.measurement_model = str(frontend_info.get('measurementModel') or backend_info.get('measurement_model') or '')[:20]
+        self.product_type = str(frontend_info.get('productType') or backend_info.get('product_type') or '')[:100]
+        self.status = str(frontend_info.get('status') or backend_info.get('status') or 'draft')[:20]
+
     def is_locked(self):
-        return self.locked_by is not None
+        return self.locked_by_id is not None
 
     def can_edit(self, user):
-        if self.locked_by and self.locked_by != user:
+        if self.locked_by_id and self.locked_by_id != user.pk:
             return False
         
-        general_info = self.config.get('generalInfo', {})
-        status = general_info.get('status', 'draft')
-        if status == 'locked':
+        if self.status == 'locked':
             return False
             
         return True
 
 
 class ModelDefinitionHistory(models.Model):
+    """
+    One saved version of a model definition.
+
+    Versions of a model form a chain ordered by ``sequence``. Every
+    ``MODEL_HISTORY_SNAPSHOT_INTERVAL``-th entry stores the full ``config``
+    (a snapshot); the entries in between only store ``config_diff``, a JSON
+    patch against the previous version. Use ``resolved_config`` (or
+    ``resolve_configs`` for many entries) to read the config of any version.
+    """
     model = models.ForeignKey(
         ModelDefinition, 
         on_delete=models.CASCADE, 
@@ -86,7 +122,12 @@ class ModelDefinitionHistory(models.Model):
     )
     name = models.CharField(max_length=100)
     version = models.CharField(max_length=20)
-    config = models.JSONField(default=dict)  # All configuration data at time of save
+    config = models.JSONField(null=True, blank=True)  # Full configuration, only stored on snapshots
+    config_diff = models.JSONField(null=True, blank=True, help_text="JSON patch from the previous version")
+    config_hash = models.CharField(max_length=64, blank=True, default='', help_text="SHA-256 of the full configuration")
+    config_size = models.IntegerField(default=0, help_text="Size in bytes of the full configuration as JSON")
+    is_snapshot = models.BooleanField(default=True)
+    sequence = models.IntegerField(default=0)
     saved_at = models.DateTimeField(auto_now_add=True)
     modified_by = models.ForeignKey(
         User, 
@@ -98,10 +139,179 @@ class ModelDefinitionHistory(models.Model):
         ordering = ['-saved_at']
         verbose_name = 'Model Definition History'
         verbose_name_plural = 'Model Definition History'
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'sequence'], name='model_history_sequence_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.name} v{self.version} - {self.saved_at}"
 
+    @classmethod
+    def snapshot_interval(cls):
+        return max(getattr(settings, 'MODEL_HISTORY_SNAPSHOT_INTERVAL', 20), 1)
+
+    @classmethod
+    def record(cls, model_definition, user=None):
+        """
+        Save the current state of ``model_definition`` as a new version.
+
+        Returns None without writing anything when the name, version and
+        config are identical to the latest version.
+        """
+        new_hash = config_hash(model_definition.config)
+        new_size = config_size(model_definition.config)
+
+        with transaction.atomic():
+            # Serialise concurrent saves of the same model
+            ModelDefinition.objects.select_for_update().filter(pk=model_definition.pk).first()
+            latest = cls.objects.filter(model=model_definition).order_by('-sequence').first()
+
+            if latest is not None and latest.config_hash == new_hash \
+                    and latest.name == model_definition.name and latest.version == model_definition.version:
+                return None
+
+            entry = cls(
+                model=model_definition,
+                name=model_definition.name,
+                version=model_definition.version,
+                config_hash=new_hash,
+                config_size=new_size,
+                modified_by=user,
+                sequence=latest.sequence + 1 if latest is not None else 1,
+            )
+
+            last_snapshot = cls.objects.filter(
+                model=model_definition, is_snapshot=True
+            ).order_by('-sequence').values_list('sequence', flat=True).first()
+
+            if latest is None or last_snapshot is None or entry.sequence - last_snapshot >= cls.snapshot_interval():
+                entry.is_snapshot = True
+                entry.config = model_definition.config
+            else:
+                entry.is_snapshot = False
+                entry.config_diff = make_patch(latest.resolved_config, model_definition.config)
+            entry.save()
+
+        return entry
+
+    @property
+    def resolved_config(self):
+        if not hasattr(self, '_resolved_config'):
+            ModelDefinitionHistory.resolve_configs([self])
+        return self._resolved_config
+
+    @classmethod
+    def resolve_configs(cls, entries):
+        """
+        Reconstruct the full config of each entry in ``entries``, reading each
+        model's chain once from the nearest snapshot onwards.
+        """
+        pending = {}
+        for entry in entries:
+            if hasattr(entry, '_resolved_config'):
+                continue
+            if entry.is_snapshot:
+                entry._resolved_config = entry.config if entry.config is not None else {}
+                continue
+            pending.setdefault(entry.model_id, []).append(entry)
+
+        for model_id, model_entries in pending.items():
+            low = min(entry.sequence for entry in model_entries)
+            high = max(entry.sequence for entry in model_entries)
+            start = cls.objects.filter(
+                model_id=model_id, is_snapshot=True, sequence__lte=low
+            ).order_by('-sequence').values_list('sequence', flat=True).first() or 0
+
+            wanted = {}
+            for entry in model_entries:
+                wanted.setdefault(entry.sequence, []).append(entry)
+
+            config, shared = {}, False
+            chain = cls.objects.filter(
+                model_id=model_id, sequence__gte=start, sequence__lte=high
+            ).order_by('sequence').values_list('sequence', 'is_snapshot', 'config', 'config_diff')
+            for sequence, is_snapshot, snapshot, diff in chain.iterator():
+                if is_snapshot:
+                    config, shared = (snapshot if snapshot is not None else {}), False
+                else:
+                    # Patch in place unless an earlier entry already holds this config
+                    config = apply_patch(config, diff or [], in_place=not shared)
+                    shared = False
+                for entry in wanted.get(sequence, []):
+                    entry._resolved_config = config
+                    shared = True
+
+        return entries
+
+
+class IDSequence(models.Model):
+    """
+    Counter row backing the human readable batch/upload IDs.
+
+    One row exists per ID prefix (e.g. ``BATCH-2025-07``). Allocation locks the
+    row with ``select_for_update`` so concurrent uploads never hand out the
+    same number twice.
+    """
+    prefix = models.CharField(max_length=50, unique=True)
+    last_value = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'ID Sequence'
+        verbose_name_plural = 'ID Sequences'
+        db_table = 'id_sequences'
+
+    def __str__(self):
+        return f"{self.prefix} ({self.last_value})"
+
+    @classmethod
+    def allocate(cls, prefix, count=1, seed=None):
+        """
+        Reserve ``count`` consecutive numbers for ``prefix`` and return them as a range.
+
+        ``seed`` is an optional callable returning the highest number already in
+        use; it is only evaluated when the counter row is first created.
+        """
+        if count < 1:
+            return range(0)
+
+        with transaction.atomic():
+            sequence, _ = cls.objects.select_for_update().get_or_create(
+                prefix=prefix,
+                defaults={'last_value': seed if seed is not None else 0}
+            )
+            start = sequence.last_value + 1
+            sequence.last_value += count
+            sequence.save(update_fields=['last_value'])
+
+        return range(start, start + count)
+
+
+def _max_id_suffix(queryset, field_name, prefix):
+    highest = 0
+    existing_ids = queryset.filter(
+        **{f'{field_name}__startswith': f'{prefix}-'}
+    ).values_list(field_name, flat=True)
+    for existing_id in existing_ids:
+        try:
+            highest = max(highest, int(existing_id.split('-')[-1]))
+        except (ValueError, IndexError):
+            continue
+    return highest
+
+
+def allocate_ids(model, field_name, label, count=1):
+    """
+    Allocate ``count`` IDs of the form ``<label>-YYYY-MM-NNNN`` for ``model.field_name``.
+    """
+    current_date = timezone.now()
+    prefix = f"{label}-{current_date.year}-{current_date.month:02d}"
+    numbers = IDSequence.allocate(
+        prefix,
+        count=count,
+        seed=lambda: _max_id_suffix(model.objects.all(), field_name, prefix)
+    )
+    return [f"{prefix}-{number:04d}" for number in numbers]
+
 
 class DataUploadBatch(TimeStampedMixin):
     BATCH_STATUS_CHOICES = [
@@ -186,31 +396,20 @@ class DataUploadBatch(TimeStampedMixin):
         ordering = ['-created_on']
         verbose_name = 'Data Upload Batch'
         verbose_name_plural = 'Data Upload Batches'
+        indexes = [
+            models.Index(fields=['-created_on'], name='data_batch_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.batch_id} - {self.batch_status}"
     
+    @classmethod
+    def allocate_batch_ids(cls, count=1):
+        return allocate_ids(cls, 'batch_id', 'BATCH', count)
+    
     def save(self, *args, **kwargs):
         if not self.batch_id:
-            current_date = timezone.now()
-            year = current_date.year
-            month = current_date.month
-            
-            last_batch = DataUploadBatch.objects.filter(
-                created_on__year=year,
-                created_on__month=month
-            ).order_by('-created_on').first()
-            
-            if last_batch and last_batch.batch_id:
-                try:
-                    last_number = int(last_batch.batch_id.split('-')[-1])
-                    next_number = last_number + 1
-                except (ValueError, IndexError):
-                    next_number = 1
-            else:
-                next_number = 1
-            
-            self.batch_id = f"BATCH-{year}-{month:02d}-{next_number:04d}"
+            self.batch_id = self.allocate_batch_ids()[0]
         
         is_new = self.pk is None
         super().save(*args, **kwargs)
@@ -219,14 +418,53 @@ class DataUploadBatch(TimeStampedMixin):
             self.create_default_document_status_records()
 
     def create_default_document_status_records(self):
-        default_document_types = self.get_default_document_types()
-        
-        for doc_type in default_document_types:
-            DataBatchStatus.objects.get_or_create(
-                batch_id=self.batch_id,
-                document_type=doc_type,
-                defaults={'upload_status': False}
+        DataBatchStatus.objects.bulk_create(
+            [
+                DataBatchStatus(
+                    batch_id=self.batch_id,
+                    document_type=doc_type,
+                    upload_status=False
+                )
+                for doc_type in self.get_default_document_types()
+            ],
+            ignore_conflicts=True
+        )
+
+    def register_uploads(self, added=0, uploaded_document_types=()):
+        """
+        Batch bookkeeping for new uploads: bump ``upload_count`` atomically and
+        flag the uploaded document types, in a fixed number of queries however
+        many uploads were added.
+        """
+        if added:
+            DataUploadBatch.objects.filter(pk=self.pk).update(
+                upload_count=models.F('upload_count') + added,
+                modified_on=timezone.now()
             )
+            self.upload_count += added
+        
+        document_types = set(uploaded_document_types)
+        if document_types:
+            DataBatchStatus.mark_uploaded(self.batch_id, document_types)
+
+    @classmethod
+    def remove_uploads(cls, batch_pk, removed=1):
+        """
+        Batch bookkeeping for uploads deleted from or moved out of a batch:
+        lower ``upload_count`` atomically.
+        """
+        cls.objects.filter(pk=batch_pk).update(
+            upload_count=models.F('upload_count') - removed,
+            modified_on=timezone.now()
+        )
+
+    def refresh_upload_count(self):
+        self.upload_count = self.uploads.count()
+        DataUploadBatch.objects.filter(pk=self.pk).update(
+            upload_count=self.upload_count,
+            modified_on=timezone.now()
+        )
+        return self.upload_count
 
     def get_default_document_types(self):
         base_types = [
@@ -286,10 +524,38 @@ class DataBatchStatus(models.Model):
     
     @property
     def batch(self):
-        try:
-            return DataUploadBatch.objects.get(batch_id=self.batch_id)
-        except DataUploadBatch.DoesNotExist:
-            return None
+        if '_batch' not in self.__dict__:
+            self._batch = DataUploadBatch.objects.filter(batch_id=self.batch_id).first()
+        return self._batch
+
+    @classmethod
+    def attach_batches(cls, statuses):
+        """
+        Load the batches of ``statuses`` in one query so ``batch`` does not
+        query per row.
+        """
+        statuses = [status for status in statuses if '_batch' not in status.__dict__]
+        batches = DataUploadBatch.objects.in_bulk(
+            {status.batch_id for status in statuses}, field_name='batch_id'
+        )
+        for status in statuses:
+            status._batch = batches.get(status.batch_id)
+
+    @classmethod
+    def mark_uploaded(cls, batch_id, document_types):
+        document_types = list(document_types)
+        cls.objects.bulk_create(
+            [
+                cls(batch_id=batch_id, document_type=document_type, upload_status=True)
+                for document_type in document_types
+            ],
+            ignore_conflicts=True
+        )
+        cls.objects.filter(
+            batch_id=batch_id,
+            document_type__in=document_types,
+            upload_status=False
+        ).update(upload_status=True)
 
 
 class DataUploadTemplate(TimeStampedMixin):
@@ -389,64 +655,122 @@ class DataUpload(TimeStampedMixin):
     # For API uploads
     api_payload = models.JSONField(null=True, blank=True)
     
+    ingest_job = models.ForeignKey(
+        'DataUploadIngestJob',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='uploads',
+        help_text="Bulk ingest job that created this upload, if any"
+    )
+    
     class Meta:
         ordering = ['-created_on']
         verbose_name = 'Data Upload'
         verbose_name_plural = 'Data Uploads'
+        indexes = [
+            models.Index(fields=['batch', 'data_type'], name='data_upload_batch_type_idx'),
+        ]
     
     def __str__(self):
         return f"{self.upload_id} - {self.data_type} ({self.source})"
     
-    def save(self, *args, **kwargs):
+    @classmethod
+    def allocate_upload_ids(cls, count=1):
+        return allocate_ids(cls, 'upload_id', 'UPLOAD', count)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored batch so a move can be counted on save
+        if 'batch_id' in instance.__dict__:
+            instance._loaded_batch_id = instance.batch_id
+        return instance
+    
+    def save(self, *args, sync_batch=True, **kwargs):
+        """
+        Pass ``sync_batch=False`` when saving many uploads at once and call
+        ``DataUploadBatch.register_uploads`` once afterwards instead.
+        """
         if not self.upload_id:
-            current_date = timezone.now()
-            year = current_date.year
-            month = current_date.month
-            
-            last_upload = DataUpload.objects.filter(
-                created_on__year=year,
-                created_on__month=month
-            ).order_by('-created_on').first()
-            
-            if last_upload and last_upload.upload_id:
-                try:
-                    last_number = int(last_upload.upload_id.split('-')[-1])
-                    next_number = last_number + 1
-                except (ValueError, IndexError):
-                    next_number = 1
-            else:
-                next_number = 1
-            
-            self.upload_id = f"UPLOAD-{year}-{month:02d}-{next_number:04d}"
+            self.upload_id = self.allocate_upload_ids()[0]
         
         if self.file_upload:
             self.original_filename = self.file_upload.name
             self.file_size = self.file_upload.size
         
-        super().save(*args, **kwargs)
-        
-        if self.batch:
-            self.batch.upload_count = self.batch.uploads.count()
-            self.batch.save()
+        is_new = self._state.adding
+        previous_batch_id = None if is_new else getattr(self, '_loaded_batch_id', self.batch_id)
+        moved = previous_batch_id is not None and previous_batch_id != self.batch_id
         
-        if self.file_upload and self.batch:
-            try:
-                status_record = DataBatchStatus.objects.get(
-                    batch_id=self.batch.batch_id,
-                    document_type=self.data_type
-                )
-                status_record.upload_status = True
-                status_record.save()
-            except DataBatchStatus.DoesNotExist:
-                DataBatchStatus.objects.create(
-                    batch_id=self.batch.batch_id,
-                    document_type=self.data_type,
-                    upload_status=True
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            if sync_batch and moved:
+                DataUploadBatch.remove_uploads(previous_batch_id)
+            if sync_batch and self.batch_id:
+                self.batch.register_uploads(
+                    added=1 if is_new or moved else 0,
+                    uploaded_document_types=[self.data_type] if self.file_upload else []
                 )
+        self._loaded_batch_id = self.batch_id
+    
+    def delete(self, *args, **kwargs):
+        batch_pk = self.batch_id
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            if batch_pk:
+                DataUploadBatch.remove_uploads(batch_pk)
+        return deleted
+
+
+class DataUploadIngestJob(TimeStampedMixin):
+    STATUS_CHOICES = [
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    job_id = models.CharField(max_length=50, unique=True, blank=True)
+    batch = models.ForeignKey(
+        DataUploadBatch,
+        on_delete=models.CASCADE,
+        related_name='ingest_jobs'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='processing'
+    )
+    total_items = models.IntegerField(default=0, help_text="Number of upload descriptors in the manifest")
+    created_count = models.IntegerField(default=0, help_text="Number of uploads created by this job")
+    errors = models.JSONField(default=list, blank=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='data_upload_ingest_jobs'
+    )
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_on']
+        verbose_name = 'Data Upload Ingest Job'
+        verbose_name_plural = 'Data Upload Ingest Jobs'
+        db_table = 'data_upload_ingest_jobs'
+    
+    def __str__(self):
+        return f"{self.job_id} - {self.status}"
+    
+    def save(self, *args, **kwargs):
+        if not self.job_id:
+            self.job_id = allocate_ids(DataUploadIngestJob, 'job_id', 'INGEST')[0]
+        super().save(*args, **kwargs)
 
 
 class APIUploadLog(TimeStampedMixin):
     STATUS_CHOICES = [
+        ('running', 'Running'),
         ('success', 'Success'),
         ('failed', 'Failed'),
     ]
@@ -469,6 +793,38 @@ class APIUploadLog(TimeStampedMixin):
     api_payload = models.JSONField(null=True, blank=True)
     error_message = models.TextField(blank=True)
     
+    api_config = models.ForeignKey(
+        'IFRSApiConfig',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_logs',
+        help_text="API source this log was produced by"
+    )
+    pages_fetched = models.IntegerField(default=0)
+    records_fetched = models.IntegerField(default=0)
+    records_inserted = models.IntegerField(default=0)
+    records_updated = models.IntegerField(default=0)
+    watermark_start = models.CharField(max_length=100, blank=True, null=True)
+    watermark_end = models.CharField(max_length=100, blank=True, null=True)
+    resume_token = models.TextField(
+        blank=True,
+        null=True,
+        help_text="Cursor or next-page URL following the last committed page"
+    )
+    replay_count = models.IntegerField(default=0)
+    rollup_totals = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Totals per line of business added to the upload rollups"
+    )
+    superseded_totals = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Totals per line of business of earlier records this run overwrote, by the reporting date and source they were rolled up under"
+    )
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
     class Meta:
         ordering = ['-upload_date']
         verbose_name = 'API Upload Log'
@@ -821,6 +1177,14 @@ class SubmittedReport(TimeStampedMixin):
         max_length=100,
         help_text="Calculation Run ID (e.g., RUN-ABC12345678)"
     )
+    engine_run = models.ForeignKey(
+        'Run',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='submitted_reports',
+        help_text="Run this row belongs to, resolved from run_id on save"
+    )
     report_type = models.CharField(
         max_length=100,
         help_text="Type of report (e.g., lrc_movement_report)"
@@ -848,8 +1212,14 @@ class SubmittedReport(TimeStampedMixin):
         default='active',
         help_text="Status of the submitted report"
     )
-    ifrs_engine_result_id = models.IntegerField(
-        help_text="Foreign key reference to IFRSEngineResult"
+    ifrs_engine_result = models.ForeignKey(
+        'IFRSEngineResult',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_column='ifrs_engine_result_id',
+        related_name='submissions',
+        help_text="Engine result this report was submitted from"
     )
     model_used = models.CharField(
         max_length=255,
@@ -904,8 +1274,59 @@ class SubmittedReport(TimeStampedMixin):
                 status='active'
             ).exclude(pk=self.pk).update(status='superseded')
         
+        if self.engine_run_id is None and self.run_id:
+            self.engine_run = Run.for_run_id(self.run_id)
         super().save(*args, **kwargs)
 
+    @classmethod
+    def bulk_submit(cls, reports):
+        """
+        Insert ``reports`` together, superseding what each active report
+        replaces as ``save`` does. Within the batch the last report of a
+        report type and period stays active.
+
+        One UPDATE supersedes the replaced reports and one ``bulk_create``
+        inserts the new ones on every backend. Where the backend cannot
+        return ids from a bulk insert (SQLite), they are read back in one
+        query as the newest rows, which holds because the transaction keeps
+        the write lock from the insert until commit.
+        """
+        runs = Run.for_run_ids(report.run_id for report in reports if report.engine_run_id is None)
+        active = {}
+        for report in reports:
+            if report.engine_run_id is None and report.run_id:
+                report.engine_run = runs[report.run_id]
+            if report.status != 'active':
+                continue
+            key = (report.report_type, report.assign_year, report.assign_quarter)
+            if key in active:
+                active[key].status = 'superseded'
+            active[key] = report
+
+        replaced = models.Q()
+        for report_type, assign_year, assign_quarter in active:
+            replaced |= models.Q(report_type=report_type, assign_year=assign_year, assign_quarter=assign_quarter)
+
+        with transaction.atomic():
+            if active:
+                cls.objects.filter(replaced, status='active').update(status='superseded')
+            cls.objects.bulk_create(reports)
+            if reports and not connection.features.can_return_rows_from_bulk_insert:
+                cls._assign_inserted_ids(reports)
+        return reports
+
+    @classmethod
+    def _assign_inserted_ids(cls, reports):
+        inserted = list(
+            cls.objects.order_by('-pk').values_list('pk', 'run_id', 'report_type')[:len(reports)]
+        )[::-1]
+        if [(run_id, report_type) for _, run_id, report_type in inserted] != [
+            (report.run_id, report.report_type) for report in reports
+        ]:
+            raise DatabaseError("Inserted submitted reports could not be matched to their ids")
+        for report, (pk, _, _) in zip(reports, inserted):
+            report.pk = pk
+
 
 class IFRSEngineInput(models.Model):
     run_id = models.CharField(
@@ -913,6 +1334,14 @@ class IFRSEngineInput(models.Model):
         unique=True,
         help_text="Unique Run ID for this engine execution"
     )
+    engine_run = models.ForeignKey(
+        'Run',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='inputs',
+        help_text="Run this row belongs to, resolved from run_id on save"
+    )
     model_definition = models.JSONField(
         help_text="JSON model definition data"
     )
@@ -940,6 +1369,11 @@ class IFRSEngineInput(models.Model):
     def __str__(self):
         return f"Run {self.run_id} - {self.created_at}"
 
+    def save(self, *args, **kwargs):
+        if self.engine_run_id is None and self.run_id:
+            self.engine_run = Run.for_run_id(self.run_id)
+        super().save(*args, **kwargs)
+
 
 class IFRSApiConfig(TimeStampedMixin):
     METHOD_CHOICES = [
@@ -1183,6 +1617,11 @@ class IFRSApiConfig(TimeStampedMixin):
         null=True,
         help_text="Mapping profile reference"
     )
+    rollup_fields = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Record fields feeding the upload totals: premiums, paid_claims, commissions, line_of_business"
+    )
     validation_profile = models.CharField(
         max_length=200,
         blank=True,
@@ -1229,6 +1668,12 @@ class IFRSApiConfig(TimeStampedMixin):
         default=0,
         help_text="Count of consecutive failures"
     )
+    last_watermark = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        help_text="Highest watermark value ingested by the last successful run"
+    )
     
     class Meta:
         ordering = ['api_source_name', 'client_id']
@@ -1248,6 +1693,203 @@ class IFRSApiConfig(TimeStampedMixin):
         return self.api_endpoint
 
 
+class APIRecord(TimeStampedMixin):
+    """
+    One record landed from an API source.
+
+    ``record_key`` is a hash of the config's ``primary_key_fields`` and is only
+    set for ``upsert_on_key`` sources, where it identifies the row to update;
+    append-only sources leave it empty.
+
+    When the config lands raw pages, the full record lives in its landing
+    segment (``segment_path`` / ``segment_offset``) and only the fields the
+    connector keys, watermarks and rolls up on are kept in ``mapped_fields``;
+    ``payload`` stays empty.
+    """
+    api_config = models.ForeignKey(
+        IFRSApiConfig,
+        on_delete=models.CASCADE,
+        related_name='records'
+    )
+    upload_log = models.ForeignKey(
+        APIUploadLog,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='records',
+        help_text="Run that last wrote this record"
+    )
+    data_upload = models.ForeignKey(
+        DataUpload,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='api_records'
+    )
+    record_key = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        help_text="SHA-256 of the primary key field values"
+    )
+    payload = models.JSONField(default=dict)
+    mapped_fields = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Key, watermark and rollup fields of a record whose payload is in its landing segment"
+    )
+    segment_path = models.CharField(
+        max_length=500,
+        blank=True,
+        null=True,
+        help_text="Landing segment holding the full record, relative to RAW_LANDING_ROOT"
+    )
+    segment_offset = models.IntegerField(null=True, blank=True, help_text="Position of the record in its segment")
+    watermark_value = models.CharField(max_length=100, blank=True, null=True)
+    page_number = models.IntegerField(null=True, blank=True, help_text="Page of the run the record was fetched on")
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'API Record'
+        verbose_name_plural = 'API Records'
+        db_table = 'api_records'
+        constraints = [
+            models.UniqueConstraint(fields=['api_config', 'record_key'], name='api_record_config_key_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.api_config_id} - {self.record_key or self.pk}"
+
+    @property
+    def stored_fields(self):
+        """
+        The record fields held in the database: the payload, or only the
+        mapped fields when the payload is in a landing segment.
+        """
+        return self.mapped_fields if self.segment_path else self.payload
+
+
+class APIUploadRollup(models.Model):
+    """
+    Running totals of successful API uploads per reporting date, source and
+    line of business, maintained as each upload completes.
+    """
+    reporting_date = models.DateField()
+    source = models.CharField(max_length=255, help_text="API source name")
+    line_of_business = models.CharField(max_length=100, blank=True, default='')
+    
+    sum_of_premiums = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    sum_of_paid_claims = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    sum_of_commissions = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    upload_count = models.IntegerField(default=0)
+    record_count = models.IntegerField(default=0)
+    modified_on = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-reporting_date', 'source', 'line_of_business']
+        verbose_name = 'API Upload Rollup'
+        verbose_name_plural = 'API Upload Rollups'
+        db_table = 'api_upload_rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['reporting_date', 'source', 'line_of_business'],
+                name='api_upload_rollup_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['source', 'reporting_date'], name='api_rollup_source_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.reporting_date} - {self.source} - {self.line_of_business or 'All'}"
+    
+    @classmethod
+    def add_totals(cls, reporting_date, source, totals, uploads=1):
+        """
+        Add ``totals`` ({line_of_business: {sum_of_premiums, sum_of_paid_claims,
+        sum_of_commissions, record_count}}) for one upload to the rollups.
+        """
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                [cls(reporting_date=reporting_date, source=source, line_of_business=lob) for lob in totals],
+                ignore_conflicts=True
+            )
+            for lob, amounts in totals.items():
+                cls.objects.filter(
+                    reporting_date=reporting_date,
+                    source=source,
+                    line_of_business=lob
+                ).update(
+                    sum_of_premiums=models.F('sum_of_premiums') + amounts['sum_of_premiums'],
+                    sum_of_paid_claims=models.F('sum_of_paid_claims') + amounts['sum_of_paid_claims'],
+                    sum_of_commissions=models.F('sum_of_commissions') + amounts['sum_of_commissions'],
+                    record_count=models.F('record_count') + amounts['record_count'],
+                    upload_count=models.F('upload_count') + uploads,
+                    modified_on=timezone.now()
+                )
+
+
+class RawLandingSegment(models.Model):
+    """
+    Index entry for one compressed NDJSON file in the raw landing store.
+
+    The payloads themselves live on disk under ``RAW_LANDING_ROOT``,
+    partitioned by source and date; segments are written once and never modified.
+    """
+    KIND_CHOICES = [
+        ('api_page', 'API Page'),
+        ('payload_offload', 'Offloaded Payload'),
+    ]
+    
+    COMPRESSION_CHOICES = [
+        ('gzip', 'gzip'),
+        ('zstd', 'zstd'),
+    ]
+    
+    source = models.CharField(max_length=255, db_index=True, help_text="Source partition (slugified API source name)")
+    partition_date = models.DateField(db_index=True, help_text="Date partition the segment was landed under")
+    path = models.CharField(max_length=500, unique=True, help_text="Path relative to RAW_LANDING_ROOT")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='api_page')
+    compression = models.CharField(max_length=10, choices=COMPRESSION_CHOICES, default='gzip')
+    
+    api_config = models.ForeignKey(
+        IFRSApiConfig,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='raw_segments'
+    )
+    upload_log = models.ForeignKey(
+        APIUploadLog,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='raw_segments'
+    )
+    data_upload = models.ForeignKey(
+        DataUpload,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='raw_segments'
+    )
+    page_number = models.IntegerField(null=True, blank=True)
+    record_count = models.IntegerField(default=0)
+    byte_size = models.BigIntegerField(default=0, help_text="Compressed size on disk")
+    uncompressed_size = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, help_text="Checksum of the compressed file")
+    created_on = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Raw Landing Segment'
+        verbose_name_plural = 'Raw Landing Segments'
+        db_table = 'raw_landing_segments'
+    
+    def __str__(self):
+        return self.path
+
+
 class IFRSEngineResult(models.Model):
     STATUS_CHOICES = [
         ('Success', 'Success'),
@@ -1272,6 +1914,14 @@ class IFRSEngineResult(models.Model):
         help_text="Reference to engine run ID",
         default="LEGACY-RUN"
     )
+    engine_run = models.ForeignKey(
+        'Run',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='results',
+        help_text="Run this row belongs to, resolved from run_id on save"
+    )
     model_guid = models.UUIDField(
         help_text="Reference to model run"
     )
@@ -1307,6 +1957,10 @@ class IFRSEngineResult(models.Model):
     result_json = models.JSONField(
         help_text="Output or error message"
     )
+    value_count = models.IntegerField(
+        default=0,
+        help_text="Number of audit trail values written for this result"
+    )
     created_by = models.CharField(
         max_length=100,
         help_text="Username or system"
@@ -1321,10 +1975,12 @@ class IFRSEngineResult(models.Model):
         verbose_name = 'IFRS Engine Result'
         verbose_name_plural = 'IFRS Engine Results'
         indexes = [
-            models.Index(fields=['run_id']),
+            models.Index(fields=['run_id', 'report_type'], name='ifrs_result_run_report_idx'),
             models.Index(fields=['model_type', 'report_type']),
+            models.Index(fields=['report_type', 'status', '-created_at'], name='ifrs_result_report_status_idx'),
             models.Index(fields=['year', 'quarter']),
             models.Index(fields=['created_by']),
+            models.Index(fields=['-created_at', '-id'], name='ifrs_result_created_idx'),
         ]
         db_table = 'ifrs_engine_results'
         constraints = [
@@ -1337,6 +1993,174 @@ class IFRSEngineResult(models.Model):
     def __str__(self):
         return f"{self.model_type} - {self.report_type} - {self.year} {self.quarter} - {self.lob}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the value index was built from so saves that leave it alone skip the rebuild
+        instance._loaded_index_state = instance._index_state()
+        return instance
+
+    def _index_state(self):
+        """
+        ``(run_id, report_type, result_json hash)``, or None when any of them is deferred.
+        """
+        if not {'run_id', 'report_type', 'result_json'} <= self.__dict__.keys():
+            return None
+        return self.run_id, self.report_type, config_hash(self.result_json)
+
+    def save(self, *args, **kwargs):
+        if self.engine_run_id is None and self.run_id:
+            self.engine_run = Run.for_run_id(self.run_id)
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'run_id', 'report_type', 'result_json'} & set(update_fields):
+            return
+        state = self._index_state()
+        if is_new or state is None or state != getattr(self, '_loaded_index_state', None):
+            ResultValueIndex.index_result(self)
+        self._loaded_index_state = state
+
+
+class Run(models.Model):
+    """
+    One engine execution. Rows of the input, result, calculation value,
+    submission and variance tables point here through FKs resolved from their
+    ``run_id`` strings on save.
+
+    The summary columns (period, model, status, counts, report types) are
+    derived from the run's ``IFRSEngineResult`` rows by
+    ``model_definitions.utils.run_summaries.refresh_run_summaries``.
+    """
+    run_id = models.CharField(max_length=100, unique=True)
+    year = models.IntegerField(null=True, blank=True)
+    quarter = models.CharField(max_length=2, blank=True, null=True)
+    model_type = models.CharField(max_length=10, blank=True, null=True)
+    currency = models.CharField(max_length=10, blank=True, null=True)
+    status = models.CharField(max_length=20, blank=True, default='', help_text="Status of the run's latest result")
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    execution_date = models.DateTimeField(null=True, blank=True, help_text="Creation time of the run's latest result")
+    result_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    report_types = models.JSONField(default=list, blank=True)
+    modified_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-execution_date', 'run_id']
+        verbose_name = 'Run'
+        verbose_name_plural = 'Runs'
+        db_table = 'runs'
+        indexes = [
+            models.Index(fields=['-execution_date'], name='run_summary_exec_date_idx'),
+            models.Index(fields=['year', 'quarter'], name='run_summary_period_idx'),
+            models.Index(fields=['model_type'], name='run_summary_model_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.run_id} - {self.year} {self.quarter}"
+
+    @classmethod
+    def for_run_id(cls, run_id):
+        if not run_id:
+            return None
+        run, _ = cls.objects.get_or_create(run_id=run_id)
+        return run
+
+    @classmethod
+    def for_run_ids(cls, run_ids):
+        """
+        ``for_run_id`` for many run ids at once: {run_id: Run}, creating the
+        missing runs in one insert.
+        """
+        run_ids = {run_id for run_id in run_ids if run_id}
+        if not run_ids:
+            return {}
+        cls.objects.bulk_create([cls(run_id=run_id) for run_id in run_ids], ignore_conflicts=True)
+        return cls.objects.in_bulk(run_ids, field_name='run_id')
+
+
+class ResultValueIndex(models.Model):
+    """
+    Where each ``value_id`` under an engine result's ``result_json['calculations']``
+    lives, so a single value can be read without loading the whole document.
+    Rebuilt when a result is created and when a save changes its ``result_json``,
+    ``run_id`` or ``report_type``.
+    """
+    engine_result = models.ForeignKey(
+        IFRSEngineResult,
+        on_delete=models.CASCADE,
+        related_name='value_index'
+    )
+    run_id = models.CharField(max_length=100)
+    report_type = models.CharField(max_length=50)
+    value_id = models.CharField(max_length=200)
+    json_key = models.CharField(max_length=300, help_text="Key of the value under result_json['calculations']")
+
+    class Meta:
+        verbose_name = 'Result Value Index Entry'
+        verbose_name_plural = 'Result Value Index'
+        db_table = 'result_value_index'
+        constraints = [
+            models.UniqueConstraint(fields=['engine_result', 'value_id'], name='result_value_index_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['run_id', 'value_id', 'report_type'], name='result_value_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.value_id} ({self.run_id}) -> {self.json_key}"
+
+    @classmethod
+    def entries_for(cls, result):
+        """
+        Unsaved index rows for ``result``; the first key wins for a repeated value_id.
+        """
+        calculations = result.result_json.get('calculations') if isinstance(result.result_json, dict) else None
+        if not isinstance(calculations, dict):
+            return []
+
+        keys = {}
+        for key, calc_data in calculations.items():
+            value_id = calc_data.get('value_id') if isinstance(calc_data, dict) else None
+            if value_id and str(key) and len(str(key)) <= 300:
+                keys.setdefault(str(value_id)[:200], str(key))
+        return [
+            cls(engine_result_id=result.pk, run_id=result.run_id, report_type=result.report_type,
+                value_id=value_id, json_key=key)
+            for value_id, key in keys.items()
+        ]
+
+    @classmethod
+    def index_result(cls, result):
+        with transaction.atomic():
+            cls.objects.filter(engine_result_id=result.pk).delete()
+            cls.objects.bulk_create(cls.entries_for(result), batch_size=1000)
+
+    @classmethod
+    def lookup(cls, run_id, value_id, report_type=None):
+        """
+        The calculation entry of ``value_id`` in the newest matching result of
+        ``run_id``, with that result's ``metadata`` and ``calculation_date``,
+        extracted in the database. Returns None when the value is not indexed.
+        """
+        entries = cls.objects.filter(run_id=run_id, value_id=value_id)
+        if report_type:
+            entries = entries.filter(report_type=report_type)
+        entry = entries.order_by('-engine_result_id').first()
+        if entry is None:
+            return None
+
+        document = IFRSEngineResult.objects.filter(pk=entry.engine_result_id).annotate(
+            calculation=KeyTransform(entry.json_key, KeyTransform('calculations', 'result_json')),
+            metadata=KeyTransform('metadata', 'result_json'),
+            calculation_date=KeyTransform('calculation_date', 'result_json'),
+        ).values('calculation', 'metadata', 'calculation_date').first()
+        if document is None:
+            return None
+        document.update(result_id=entry.engine_result_id, report_type=entry.report_type, json_key=entry.json_key)
+        return document
 
 class CalculationValue(models.Model):
     value_id = models.CharField(
@@ -1349,6 +2173,14 @@ class CalculationValue(models.Model):
         db_index=True,
         help_text="Reference to engine run ID"
     )
+    engine_run = models.ForeignKey(
+        'Run',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='calculation_values',
+        help_text="Run this row belongs to, resolved from run_id on save"
+    )
     report_type = models.CharField(
         max_length=50,
         help_text="Type of report this value belongs to"
@@ -1468,6 +2300,11 @@ class CalculationValue(models.Model):
     def __str__(self):
         return f"{self.value_id} ({self.run_id})"
 
+    def save(self, *args, **kwargs):
+        if self.engine_run_id is None and self.run_id:
+            self.engine_run = Run.for_run_id(self.run_id)
+        super().save(*args, **kwargs)
+
 
 class AssumptionReference(models.Model):
     calculation_value = models.ForeignKey(
@@ -1550,6 +2387,47 @@ class InputDataReference(models.Model):
         return f"{self.dataset_name} ({self.record_count} records)"
 
 
+class ResultSnapshot(models.Model):
+    """
+    ``result_json`` of an engine result captured by variance analyses,
+    stored once per distinct content and shared by every analysis of that result.
+    """
+    content_hash = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="SHA-256 of the canonical JSON"
+    )
+    payload = models.JSONField(default=dict)
+    size_bytes = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Result Snapshot'
+        verbose_name_plural = 'Result Snapshots'
+        db_table = 'result_snapshots'
+
+    def __str__(self):
+        return self.content_hash
+
+    @classmethod
+    def store(cls, payload):
+        payload = payload if isinstance(payload, dict) else {}
+        snapshot, _ = cls.objects.get_or_create(
+            content_hash=config_hash(payload),
+            defaults={'payload': payload, 'size_bytes': config_size(payload)}
+        )
+        return snapshot
+
+    @classmethod
+    def for_result(cls, result_id):
+        """
+        Snapshot of the whole ``result_json`` of the engine result ``result_id``.
+        """
+        return cls.store(
+            IFRSEngineResult.objects.filter(pk=result_id).values_list('result_json', flat=True).first()
+        )
+
+
 class AIVarianceAnalysis(models.Model):
     run_id_current = models.CharField(
         max_length=100,
@@ -1561,17 +2439,39 @@ class AIVarianceAnalysis(models.Model):
         db_index=True,
         help_text="Run ID of the prior/baseline report selected for comparison"
     )
+    current_run = models.ForeignKey(
+        'Run',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='current_variance_analyses'
+    )
+    prior_run = models.ForeignKey(
+        'Run',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='prior_variance_analyses'
+    )
     value_id = models.CharField(
         max_length=200,
         db_index=True,
         help_text="Selected ValueID being compared"
     )
-    current_json_snapshot = models.JSONField(
-        default=dict,
+    current_snapshot = models.ForeignKey(
+        ResultSnapshot,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+',
         help_text="Exact JSON used for the current run in this comparison"
     )
-    prior_json_snapshot = models.JSONField(
-        default=dict,
+    prior_snapshot = models.ForeignKey(
+        ResultSnapshot,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+',
         help_text="Exact JSON used for the prior run in this comparison"
     )
     ai_response_json = models.JSONField(
@@ -1596,3 +2496,38 @@ class AIVarianceAnalysis(models.Model):
     def __str__(self):
         return f"{self.value_id} ({self.run_id_current} vs {self.run_id_prior})"
 
+    @property
+    def current_json_snapshot(self):
+        return self.current_snapshot.payload if self.current_snapshot_id else {}
+
+    @property
+    def prior_json_snapshot(self):
+        return self.prior_snapshot.payload if self.prior_snapshot_id else {}
+
+    def save(self, *args, **kwargs):
+        if self.current_run_id is None and self.run_id_current:
+            self.current_run = Run.for_run_id(self.run_id_current)
+        if self.prior_run_id is None and self.run_id_prior:
+            self.prior_run = Run.for_run_id(self.run_id_prior)
+        super().save(*args, **kwargs)
+
+
+class AIInsightCache(models.Model):
+    """
+    Generated variance insights keyed by a hash of the comparison inputs
+    (value, amounts and detected changes, not the run ids), the model and the
+    prompt version, so an identical variance in another pair of runs reuses
+    the answer until the model or prompt changes.
+    """
+    input_hash = models.CharField(max_length=64, unique=True)
+    insight = models.TextField()
+    model_name = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'AI Insight Cache Entry'
+        verbose_name_plural = 'AI Insight Cache'
+        db_table = 'ai_insight_cache'
+
+    def __str__(self):
+        return self.input_hash
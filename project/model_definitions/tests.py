@@ -1,3 +1,1440 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import io
+import json
+import re
+import shutil
+import tempfile
+import uuid
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
+import httpx
+from asgiref.sync import async_to_sync
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
 
+from model_definitions import connectors
+from model_definitions.connectors import runtime, scheduler, streaming
+from model_definitions.connectors.landing import record_payload
+from model_definitions.management.commands import benchmark_query_plans
+from model_definitions.models import (
+    AIInsightCache, AIVarianceAnalysis, APIRecord, APIUploadLog, APIUploadRollup, AssumptionReference,
+    CalculationValue, Currency, DataUpload, DataUploadBatch, IDSequence, IFRSApiConfig, IFRSEngineResult,
+    InputDataReference, LineOfBusiness, ModelDefinition, ModelDefinitionHistory, ResultSnapshot, ResultValueIndex,
+    Run, SubmittedReport,
+)
+from model_definitions.utils import ai_insights, audit_helper, ingest, run_summaries
+
+API_ROOT = '/backend/api/v1/model-definitions/'
+
+
+def api_config(**overrides):
+    fields = {
+        'api_source_name': 'mock-source',
+        'client_id': 'client',
+        'api_endpoint': 'https://mock.local/v1/items',
+        'data_type': 'premiums',
+        'owner': 'tests',
+        'auth_type': 'none',
+        'records_jsonpath': '$.items',
+        'backoff_min_ms': 1,
+        'backoff_max_ms': 5,
+    }
+    fields.update(overrides)
+    return IFRSApiConfig.objects.create(**fields)
+
+
+def temp_landing_root(test_case):
+    root = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, root)
+    landing = override_settings(RAW_LANDING_ROOT=root)
+    landing.enable()
+    test_case.addCleanup(landing.disable)
+    return root
+
+
+def data_upload(batch, **overrides):
+    fields = {
+        'batch': batch,
+        'source': 'custom',
+        'insurance_type': 'direct_insurance',
+        'data_type': 'premiums',
+        'quarter': 'Q1',
+        'year': 2026,
+    }
+    fields.update(overrides)
+    upload = DataUpload(**fields)
+    upload.save()
+    return upload
+
+
+class ModelHistoryCompactionTests(TestCase):
+    migration = importlib.import_module('model_definitions.migrations.0028_compact_model_history')
+
+    def test_compaction_keeps_repeated_versions_and_expands_back(self):
+        user = get_user_model().objects.create_user(username='history', password='history')
+        definition = ModelDefinition.objects.create(name='Model', created_by=user, last_modified_by=user)
+        configs = [{'rate': 1}, {'rate': 1}, {'rate': 2}]
+        for sequence, config in enumerate(configs, 1):
+            ModelDefinitionHistory.objects.create(
+                model=definition, name='Model', version='1', config=config, sequence=sequence, modified_by=user
+            )
+
+        self.migration.compact_history(django_apps, None)
+
+        entries = list(ModelDefinitionHistory.objects.filter(model=definition).order_by('sequence'))
+        self.assertEqual([entry.sequence for entry in entries], [1, 2, 3])
+        self.assertEqual([entry.is_snapshot for entry in entries], [True, False, False])
+        self.assertEqual(entries[1].config_diff, [])
+        self.assertEqual([entry.config for entry in entries], [{'rate': 1}, None, None])
+
+        self.migration.expand_history(django_apps, None)
+
+        self.assertEqual(
+            [entry.config for entry in ModelDefinitionHistory.objects.filter(model=definition).order_by('sequence')],
+            configs
+        )
+
+
+class ModelDefinitionEndpointTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='models', password='models')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path, **params):
+        response = self.client.get(f'{API_ROOT}{path}', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def definition_with_versions(self, rates):
+        definition = ModelDefinition.objects.create(name='Versioned', created_by=self.user, last_modified_by=self.user)
+        for rate in rates:
+            definition.config = {'rate': rate}
+            definition.save()
+            ModelDefinitionHistory.record(definition, self.user)
+        return definition
+
+    def definition(self, name, **general_info):
+        return ModelDefinition.objects.create(
+            name=name, created_by=self.user, last_modified_by=self.user, config={'generalInfo': general_info}
+        )
+
+    def test_general_info_is_copied_to_columns_on_save(self):
+        definition = self.definition('Motor', measurementModel='PAA', productType='motor', status='active')
+        self.assertEqual((definition.measurement_model, definition.product_type, definition.status),
+                         ('PAA', 'motor', 'active'))
+
+        definition.config = {'general_info': {'measurement_model': 'GMM'}}
+        definition.save(update_fields=['config'])
+        definition.refresh_from_db()
+
+        self.assertEqual((definition.measurement_model, definition.product_type, definition.status), ('GMM', '', 'draft'))
+
+    def test_list_filters_on_the_general_info_columns(self):
+        self.definition('Motor', measurementModel='PAA', productType='motor', status='active')
+        self.definition('Life', measurementModel='GMM', productType='life', status='active')
+        self.definition('Draft motor', measurementModel='PAA', productType='motor')
+
+        for params, expected in [
+            ({'measurement_model': 'PAA'}, ['Draft motor', 'Motor']),
+            ({'product_type': 'motor', 'status': 'active'}, ['Motor']),
+            ({'status': 'draft'}, ['Draft motor']),
+        ]:
+            results = self.get('', ordering='name', **params)['results']
+            self.assertEqual([definition['name'] for definition in results], expected)
+
+    def test_general_info_backfill_fills_existing_rows(self):
+        backfill = importlib.import_module('model_definitions.migrations.0030_modeldefinition_general_info_columns')
+        definition = self.definition('Motor', measurementModel='PAA', productType='motor', status='active')
+        ModelDefinition.objects.filter(pk=definition.pk).update(measurement_model='', product_type='', status='draft')
+
+        backfill.fill_general_info(django_apps, None)
+
+        definition.refresh_from_db()
+        self.assertEqual((definition.measurement_model, definition.product_type, definition.status),
+                         ('PAA', 'motor', 'active'))
+
+    def test_summary_list_leaves_out_the_config(self):
+        self.definition('Motor', measurementModel='PAA', productType='motor')
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = self.get('', view='summary')['results']
+
+        self.assertEqual([definition['name'] for definition in summary], ['Motor'])
+        self.assertEqual(summary[0]['measurementModel'], 'PAA')
+        self.assertNotIn('config', summary[0])
+        self.assertFalse(any('"config"' in query['sql'] for query in queries.captured_queries))
+        self.assertIn('config', self.get('')['results'][0])
+
+    def test_history_pages_version_metadata_without_configs(self):
+        definition = self.definition_with_versions([1, 2, 3])
+
+        first = self.get(f'{definition.pk}/history/', page_size=2)
+        second = self.get(f'{definition.pk}/history/{first["next"]}')
+
+        self.assertEqual(first['count'], 3)
+        self.assertEqual([entry['sequence'] for entry in first['history'] + second['history']], [3, 2, 1])
+        self.assertTrue(all('config' not in entry for entry in first['history']))
+        self.assertIsNone(second['next'])
+
+    def test_history_serves_one_version_and_diffs(self):
+        definition = self.definition_with_versions([1, 2, 3])
+        entries = list(ModelDefinitionHistory.objects.filter(model=definition).order_by('sequence'))
+
+        version = self.get(f'{definition.pk}/history/{entries[1].pk}/')
+        self.assertEqual(version['version']['config'], {'rate': 2})
+
+        diff = self.get(f'{definition.pk}/history/diff/', **{'from': entries[0].pk, 'to': entries[1].pk})
+        self.assertEqual(diff['operations'], [{'op': 'replace', 'path': '/rate', 'value': 2}])
+        to_current = self.get(f'{definition.pk}/history/diff/', **{'from': entries[0].pk})
+        self.assertEqual(to_current['operations'], [{'op': 'replace', 'path': '/rate', 'value': 3}])
+
+    def test_history_of_another_model_is_not_found(self):
+        definition = self.definition_with_versions([1])
+        other = ModelDefinition.objects.create(name='Other', created_by=self.user, last_modified_by=self.user)
+        entry = ModelDefinitionHistory.objects.get(model=definition)
+
+        self.assertEqual(self.client.get(f'{API_ROOT}{other.pk}/history/{entry.pk}/').status_code, 404)
+        self.assertEqual(
+            self.client.get(f'{API_ROOT}{other.pk}/history/diff/', {'from': entry.pk}).status_code, 404
+        )
+
+
+class IDAllocationTests(TestCase):
+    def prefix(self, label):
+        now = timezone.now()
+        return f'{label}-{now.year}-{now.month:02d}'
+
+    def test_ids_are_allocated_in_consecutive_blocks(self):
+        prefix = self.prefix('BATCH')
+
+        first = DataUploadBatch.allocate_batch_ids(3)
+        batch = DataUploadBatch.objects.create(batch_type='custom', batch_model='PAA')
+
+        self.assertEqual(first, [f'{prefix}-0001', f'{prefix}-0002', f'{prefix}-0003'])
+        self.assertEqual(batch.batch_id, f'{prefix}-0004')
+        self.assertEqual(IDSequence.objects.get(prefix=prefix).last_value, 4)
+
+    def test_a_new_counter_continues_from_existing_ids(self):
+        prefix = self.prefix('UPLOAD')
+        batch = DataUploadBatch.objects.create(batch_type='custom', batch_model='PAA')
+        data_upload(batch, upload_id=f'{prefix}-0041')
+        IDSequence.objects.filter(prefix=prefix).delete()
+
+        self.assertEqual(DataUpload.allocate_upload_ids(2), [f'{prefix}-0042', f'{prefix}-0043'])
+
+
+class DataUploadBatchCountTests(TestCase):
+    def setUp(self):
+        self.batch = DataUploadBatch.objects.create(batch_type='custom', batch_model='PAA')
+        self.other_batch = DataUploadBatch.objects.create(batch_type='custom', batch_model='PAA')
+
+    def upload_counts(self):
+        self.batch.refresh_from_db()
+        self.other_batch.refresh_from_db()
+        return self.batch.upload_count, self.other_batch.upload_count
+
+    def test_delete_lowers_the_count(self):
+        uploads = [data_upload(self.batch) for _ in range(2)]
+        self.assertEqual(self.upload_counts(), (2, 0))
+
+        uploads[0].delete()
+        self.assertEqual(self.upload_counts(), (1, 0))
+
+        DataUpload.objects.get(pk=uploads[1].pk).delete()
+        self.assertEqual(self.upload_counts(), (0, 0))
+
+    def test_moving_an_upload_moves_the_count(self):
+        upload = data_upload(self.batch)
+
+        upload = DataUpload.objects.get(pk=upload.pk)
+        upload.batch = self.other_batch
+        upload.save()
+        self.assertEqual(self.upload_counts(), (0, 1))
+
+        upload.save()
+        self.assertEqual(self.upload_counts(), (0, 1))
+
+    def test_moving_an_upload_out_of_its_batch_lowers_the_count(self):
+        upload = data_upload(self.batch)
+
+        upload.batch = None
+        # The batch column is NOT NULL, so skip the row write and check only the bookkeeping
+        with mock.patch.object(DataUpload, 'save_base'):
+            upload.save()
+        self.assertEqual(self.upload_counts(), (0, 0))
+
+    def test_refresh_upload_count_recounts_after_queryset_delete(self):
+        data_upload(self.batch)
+        DataUpload.objects.filter(batch=self.batch).delete()
+
+        self.assertEqual(self.batch.refresh_upload_count(), 0)
+        self.assertEqual(self.upload_counts(), (0, 0))
+
+
+def zip_archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for name, content in members.items():
+            zip_file.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+class BulkIngestArchiveTests(TestCase):
+    def setUp(self):
+        self.archive = zip_archive({
+            'reports/premiums.xlsx': b'p' * 1000,
+            'claims.xlsx': b'c' * 1000,
+            'unreferenced.xlsx': b'u' * 5000,
+            '__MACOSX/._premiums.xlsx': b'meta',
+        })
+
+    def test_only_referenced_members_are_extracted(self):
+        with mock.patch.object(ingest, '_extract_member', wraps=ingest._extract_member) as extract:
+            files = ingest.read_archive_files(self.archive, {'premiums.xlsx', 'claims.xlsx', 'missing.xlsx'})
+
+        self.assertEqual(set(files), {'premiums.xlsx', 'claims.xlsx'})
+        self.assertEqual(extract.call_count, 2)
+        self.assertIsInstance(files['premiums.xlsx'], TemporaryUploadedFile)
+        self.assertEqual(files['premiums.xlsx'].read(), b'p' * 1000)
+        for file in files.values():
+            file.close()
+
+    @override_settings(BULK_INGEST_MAX_ARCHIVE_SIZE=1500)
+    def test_total_uncompressed_size_is_limited(self):
+        with self.assertRaises(ingest.ArchiveTooLarge):
+            ingest.read_archive_files(self.archive, {'premiums.xlsx', 'claims.xlsx'})
+
+        files = ingest.read_archive_files(self.archive, {'premiums.xlsx'})
+        self.assertEqual(set(files), {'premiums.xlsx'})
+        files['premiums.xlsx'].close()
+
+    @mock.patch.object(ingest, 'MAX_UPLOAD_FILE_SIZE', 2000)
+    def test_oversized_members_are_not_decompressed(self):
+        with mock.patch.object(ingest, '_extract_member') as extract:
+            files = ingest.read_archive_files(self.archive, {'unreferenced.xlsx'})
+
+        extract.assert_not_called()
+        self.assertEqual(files['unreferenced.xlsx'].size, 5000)
+        self.assertEqual(ingest.validate_upload_file(files['unreferenced.xlsx']), "File size cannot exceed 50MB")
+
+    def test_bulk_ingest_endpoint_creates_uploads_from_the_archive(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        user = get_user_model().objects.create_user(username='ingest', password='ingest')
+        batch = DataUploadBatch.objects.create(batch_type='custom', batch_model='PAA')
+        manifest = [
+            {'source': 'custom', 'insurance_type': 'direct_insurance', 'data_type': data_type,
+             'quarter': 'Q1', 'year': 2026, 'file': file_name}
+            for data_type, file_name in [('premiums', 'premiums.xlsx'), ('claims_paid', 'claims.xlsx')]
+        ]
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with override_settings(MEDIA_ROOT=media_root):
+            response = client.post(f'{API_ROOT}data-uploads/bulk_ingest/', {
+                'batch_id': batch.batch_id,
+                'manifest': json.dumps(manifest),
+                'archive': SimpleUploadedFile('uploads.zip', self.archive.getvalue(), 'application/zip'),
+            }, format='multipart')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        uploads = DataUpload.objects.filter(batch=batch).order_by('data_type')
+        self.assertEqual([upload.data_type for upload in uploads], ['claims_paid', 'premiums'])
+        self.assertEqual([upload.file_size for upload in uploads], [1000, 1000])
+        with override_settings(MEDIA_ROOT=media_root):
+            self.assertEqual(uploads[1].file_upload.read(), b'p' * 1000)
+        batch.refresh_from_db()
+        self.assertEqual(batch.upload_count, 2)
+
+    def test_bulk_ingest_endpoint_rejects_a_file_referenced_twice(self):
+        user = get_user_model().objects.create_user(username='ingest', password='ingest')
+        batch = DataUploadBatch.objects.create(batch_type='custom', batch_model='PAA')
+        manifest = [
+            {'source': 'custom', 'insurance_type': 'direct_insurance', 'data_type': data_type,
+             'quarter': 'Q1', 'year': 2026, 'file': 'premiums.xlsx'}
+            for data_type in ['premiums', 'claims_paid']
+        ]
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.post(f'{API_ROOT}data-uploads/bulk_ingest/', {
+            'batch_id': batch.batch_id,
+            'manifest': json.dumps(manifest),
+            'archive': SimpleUploadedFile('uploads.zip', self.archive.getvalue(), 'application/zip'),
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('already used by item 0', json.dumps(response.json()))
+        self.assertFalse(DataUpload.objects.filter(batch=batch).exists())
+
+    @override_settings(BULK_INGEST_MAX_ARCHIVE_SIZE=1500)
+    def test_bulk_ingest_endpoint_rejects_archives_over_the_limit(self):
+        user = get_user_model().objects.create_user(username='ingest', password='ingest')
+        batch = DataUploadBatch.objects.create(batch_type='custom', batch_model='PAA')
+        manifest = [
+            {'source': 'custom', 'insurance_type': 'direct_insurance', 'data_type': 'premiums',
+             'quarter': 'Q1', 'year': 2026, 'file': file_name}
+            for file_name in ['premiums.xlsx', 'claims.xlsx']
+        ]
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.post(f'{API_ROOT}data-uploads/bulk_ingest/', {
+            'batch_id': batch.batch_id,
+            'manifest': json.dumps(manifest),
+            'archive': SimpleUploadedFile('uploads.zip', self.archive.getvalue(), 'application/zip'),
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(DataUpload.objects.filter(batch=batch).exists())
+
+
+class PagedSource:
+    """
+    Stub API over ``records``: page/limit pagination, an ``updated_at``
+    watermark query parameter, and optional failing responses first.
+    """
+
+    def __init__(self, records, failures=()):
+        self.records = records
+        self.failures = list(failures)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.failures:
+            return httpx.Response(self.failures.pop(0))
+        watermark = request.url.params.get('updated_at')
+        rows = [record for record in self.records if not watermark or record['updated_at'] > watermark]
+        page = int(request.url.params.get('page', 1))
+        limit = int(request.url.params.get('limit', 10))
+        return httpx.Response(200, json={
+            'data': {'items': rows[(page - 1) * limit:page * limit]},
+            'meta': {'total': len(rows)},
+        })
+
+
+class ConnectorRunTests(TestCase):
+    def setUp(self):
+        temp_landing_root(self)
+        self.source = PagedSource([
+            {'id': number, 'updated_at': f'2026-01-{number + 1:02d}T00:00:00Z', 'amount': number}
+            for number in range(25)
+        ])
+        self.transport = httpx.MockTransport(self.source)
+        self.config = api_config(
+            pagination_strategy='page_limit',
+            page_param_name='page',
+            limit_param_name='limit',
+            limit_value=10,
+            records_jsonpath='$.data.items[*]',
+            total_count_jsonpath='$.meta.total',
+            watermark_field_name='updated_at',
+            primary_key_fields=['id'],
+            behavior='upsert_on_key',
+        )
+
+    def test_page_limit_pagination_fetches_every_page(self):
+        upload_log = connectors.run_config(self.config, transport=self.transport)
+
+        self.assertEqual(upload_log.status, 'success')
+        self.assertEqual(upload_log.pages_fetched, 3)
+        self.assertEqual(upload_log.records_fetched, 25)
+        self.assertEqual([request.url.params['page'] for request in self.source.requests], ['1', '2', '3'])
+        self.assertEqual(APIRecord.objects.filter(api_config=self.config).count(), 25)
+
+    def test_watermark_moves_forward_and_limits_the_next_run(self):
+        connectors.run_config(self.config, transport=self.transport)
+        self.config.refresh_from_db()
+        self.assertEqual(self.config.last_watermark, '2026-01-25T00:00:00Z')
+
+        self.source.requests.clear()
+        self.source.records[3].update(updated_at='2026-02-01T00:00:00Z', amount=99)
+        upload_log = connectors.run_config(self.config, transport=self.transport)
+
+        self.assertEqual(self.source.requests[0].url.params['updated_at'], '2026-01-25T00:00:00Z')
+        self.assertEqual(upload_log.records_fetched, 1)
+        self.config.refresh_from_db()
+        self.assertEqual(self.config.last_watermark, '2026-02-01T00:00:00Z')
+
+    def test_upsert_updates_existing_records_in_place(self):
+        connectors.run_config(self.config, transport=self.transport)
+        self.source.records[3].update(updated_at='2026-02-01T00:00:00Z', amount=99)
+
+        upload_log = connectors.run_config(self.config, transport=self.transport, full_refresh=True)
+
+        self.assertEqual((upload_log.records_inserted, upload_log.records_updated), (0, 25))
+        records = APIRecord.objects.filter(api_config=self.config)
+        self.assertEqual(records.count(), 25)
+        self.assertEqual(record_payload(records.get(mapped_fields__id=3))['amount'], 99)
+
+    def test_landed_records_keep_only_the_segment_reference(self):
+        self.config.rollup_fields = {'premiums': 'amount'}
+        self.config.save()
+
+        upload_log = connectors.run_config(self.config, transport=self.transport)
+
+        record = APIRecord.objects.get(api_config=self.config, mapped_fields__id=12)
+        self.assertEqual(record.payload, {})
+        self.assertEqual(record.mapped_fields, {'id': 12, 'updated_at': '2026-01-13T00:00:00Z', 'amount': 12})
+        self.assertEqual(record.segment_offset, 2)
+        self.assertTrue(upload_log.raw_segments.filter(path=record.segment_path, page_number=2).exists())
+        self.assertEqual(record_payload(record), self.source.records[12])
+
+    def test_records_keep_their_payload_without_landing(self):
+        self.config.raw_landing_mode = False
+        self.config.save()
+
+        connectors.run_config(self.config, transport=self.transport)
+
+        record = APIRecord.objects.get(api_config=self.config, payload__id=12)
+        self.assertIsNone(record.segment_path)
+        self.assertEqual(record.mapped_fields, {})
+        self.assertEqual(record_payload(record), self.source.records[12])
+
+    def test_retries_retryable_status(self):
+        self.source.failures = [503]
+
+        upload_log = connectors.run_config(self.config, transport=self.transport)
+
+        self.assertEqual(upload_log.status, 'success')
+        self.assertEqual(upload_log.records_fetched, 25)
+
+    def test_dry_run_writes_nothing(self):
+        stats = connectors.dry_run(self.config, transport=self.transport, max_records=15)
+
+        self.assertEqual(stats.records_fetched, 15)
+        self.assertFalse(APIRecord.objects.exists())
+        self.config.refresh_from_db()
+        self.assertIsNone(self.config.last_watermark)
+
+    def test_cursor_pagination_follows_next_token(self):
+        def handler(request):
+            position = int(request.url.params.get('cursor') or 0)
+            return httpx.Response(200, json={
+                'items': [{'position': position}],
+                'next': str(position + 1) if position < 3 else None,
+            })
+
+        config = api_config(
+            api_source_name='cursor-source',
+            pagination_strategy='cursor_next_token',
+            page_param_name='cursor',
+            next_page_token_jsonpath='$.next',
+        )
+        upload_log = connectors.run_config(config, transport=httpx.MockTransport(handler))
+
+        self.assertEqual(upload_log.records_fetched, 4)
+        self.assertEqual(upload_log.pages_fetched, 4)
+
+
+class ReplayTests(TestCase):
+    def setUp(self):
+        temp_landing_root(self)
+        self.source = PagedSource([
+            {'id': number, 'updated_at': f'2026-01-{number + 1:02d}T00:00:00Z'} for number in range(25)
+        ])
+        self.broken_page = '3'
+        self.config = api_config(
+            pagination_strategy='page_limit',
+            page_param_name='page',
+            limit_param_name='limit',
+            limit_value=10,
+            records_jsonpath='$.data.items[*]',
+            total_count_jsonpath='$.meta.total',
+            watermark_field_name='updated_at',
+            primary_key_fields=['id'],
+        )
+
+    def handler(self, request):
+        if request.url.params.get('page') == self.broken_page:
+            self.source.requests.append(request)
+            return httpx.Response(400)
+        return self.source(request)
+
+    def test_replay_resumes_after_the_committed_pages(self):
+        upload_log = connectors.run_config(self.config, transport=httpx.MockTransport(self.handler))
+        self.assertEqual((upload_log.status, upload_log.pages_fetched), ('failed', 2))
+
+        self.broken_page = None
+        self.source.requests.clear()
+        upload_log = connectors.replay_upload(upload_log, transport=httpx.MockTransport(self.handler))
+
+        self.assertEqual(upload_log.status, 'success')
+        self.assertEqual(upload_log.replay_count, 1)
+        self.assertEqual([request.url.params['page'] for request in self.source.requests], ['3'])
+        records = APIRecord.objects.filter(upload_log=upload_log)
+        self.assertEqual(sorted(record.stored_fields['id'] for record in records), list(range(25)))
+        self.assertEqual(upload_log.records_fetched, 25)
+
+    def test_stored_payload_is_replayed_without_fetching(self):
+        upload_log = APIUploadLog.objects.create(
+            api_config=self.config, reporting_date=date(2026, 3, 31), status='failed',
+            api_payload={'data': {'items': self.source.records[:4]}}
+        )
+
+        upload_log = connectors.replay_upload(upload_log, transport=httpx.MockTransport(self.handler))
+
+        self.assertEqual(upload_log.status, 'success')
+        self.assertEqual(self.source.requests, [])
+        self.assertEqual(APIRecord.objects.filter(upload_log=upload_log).count(), 4)
+
+    def test_only_failed_uploads_can_be_retried(self):
+        upload_log = APIUploadLog.objects.create(
+            api_config=self.config, reporting_date=date(2026, 3, 31), status='success'
+        )
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username='retry', password='retry'))
+
+        response = client.post(f'{API_ROOT}api-upload-logs/{upload_log.pk}/retry_upload/')
+
+        self.assertEqual(response.status_code, 400)
+        with self.assertRaises(connectors.ConnectorError):
+            connectors.replay_upload(upload_log)
+
+
+class StreamingExtractionTests(TestCase):
+    def setUp(self):
+        self.records = [{'id': number, 'amount': number * 1.5} for number in range(7)]
+        body = json.dumps({'data': {'items': self.records}, 'meta': {'total': 7}}).encode('utf-8')
+        self.chunks = [body[start:start + 16] for start in range(0, len(body), 16)]
+        self.sent = []
+        self.config = api_config(records_jsonpath='$.data.items[*]', total_count_jsonpath='$.meta.total')
+
+    def chunked(self, request):
+        async def body():
+            for chunk in self.chunks:
+                self.sent.append(chunk)
+                yield chunk
+        # No content-length: the body is streamed
+        return httpx.Response(200, content=body())
+
+    def test_jsonpaths_translate_to_ijson_prefixes(self):
+        self.assertEqual(streaming.ijson_prefix('$.data.items[*]'), 'data.items.item')
+        self.assertEqual(streaming.ijson_prefix('$.meta.total'), 'meta.total')
+        self.assertIsNone(streaming.ijson_prefix('$.items[0]'))
+
+    def test_chunked_responses_are_written_while_they_arrive(self):
+        batches = []
+
+        def write(page_number, records):
+            batches.append((len(self.sent), records))
+            return len(records), 0
+
+        stats = async_to_sync(runtime.collect)(
+            self.config, transport=httpx.MockTransport(self.chunked), write=write, batch_size=3
+        )
+
+        self.assertEqual([len(records) for _, records in batches], [3, 3, 1])
+        self.assertEqual([record for _, records in batches for record in records], self.records)
+        self.assertLess(batches[0][0], len(self.chunks))
+        self.assertEqual((stats.records_fetched, stats.total_count), (7, 7))
+
+    def test_small_responses_are_parsed_in_full(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b''.join(self.chunks)))
+
+        stats = async_to_sync(runtime.collect)(self.config, transport=transport, sample_size=10)
+
+        self.assertEqual(stats.sample_records, self.records)
+        self.assertEqual(stats.total_count, 7)
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        temp_landing_root(self)
+        self.now = timezone.now()
+
+    def test_next_run_follows_the_schedule(self):
+        last_run = datetime(2026, 1, 31, 6, 0)
+
+        self.assertEqual(scheduler.next_run_after('daily', last_run), datetime(2026, 2, 1, 6, 0))
+        self.assertEqual(scheduler.next_run_after('monthly', last_run), datetime(2026, 2, 28, 6, 0))
+        self.assertEqual(scheduler.next_run_after('quarterly', last_run), datetime(2026, 4, 30, 6, 0))
+        self.assertEqual(scheduler.next_run_after('yearly', last_run), datetime(2027, 1, 31, 6, 0))
+        self.assertIsNone(scheduler.next_run_after('manual', last_run))
+
+    def test_only_active_scheduled_sources_that_are_due_run(self):
+        due = [
+            api_config(api_source_name='never-run', schedule='daily'),
+            api_config(api_source_name='daily', schedule='daily', last_run_date=self.now - timedelta(days=2)),
+        ]
+        api_config(api_source_name='weekly', schedule='weekly', last_run_date=self.now - timedelta(days=2))
+        api_config(api_source_name='manual')
+        api_config(api_source_name='disabled', schedule='daily', status='disabled')
+
+        self.assertEqual({config.pk for config in scheduler.due_configs(self.now)}, {config.pk for config in due})
+
+    def test_a_source_is_claimed_once(self):
+        config = api_config(schedule='daily')
+        stale = IFRSApiConfig.objects.get(pk=config.pk)
+
+        self.assertEqual(scheduler.claim_configs([config], self.now), [config])
+        self.assertEqual(scheduler.claim_configs([stale], self.now), [])
+
+    def test_due_sources_run_concurrently_and_only_once(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={'items': [{'id': 1}, {'id': 2}]}))
+        configs = [api_config(api_source_name=f'source-{number}', schedule='daily') for number in range(3)]
+
+        results = async_to_sync(scheduler.run_due)(max_concurrency=2, transport=transport)
+
+        self.assertEqual(set(results), {config.pk for config in configs})
+        self.assertEqual([upload_log.status for upload_log in results.values()], ['success'] * 3)
+        self.assertEqual(APIRecord.objects.count(), 6)
+        self.assertEqual(async_to_sync(scheduler.run_due)(transport=transport), {})
+
+
+class APIUploadRollupTests(TestCase):
+    def setUp(self):
+        temp_landing_root(self)
+        self.records = [{'id': number, 'premium': '10', 'lob': 'motor'} for number in range(3)]
+        self.transport = httpx.MockTransport(lambda request: httpx.Response(200, json={'items': self.records}))
+
+    def rollup(self, reporting_date='2026-03-31'):
+        return APIUploadRollup.objects.get(reporting_date=reporting_date, source='mock-source', line_of_business='motor')
+
+    def test_upsert_rerun_does_not_count_records_twice(self):
+        config = api_config(
+            behavior='upsert_on_key',
+            primary_key_fields=['id'],
+            rollup_fields={'premiums': 'premium', 'line_of_business': 'lob'},
+        )
+
+        for _ in range(2):
+            upload_log = connectors.run_config(config, reporting_date='2026-03-31', transport=self.transport)
+            self.assertEqual(upload_log.status, 'success')
+
+        rollup = self.rollup()
+        self.assertEqual(rollup.sum_of_premiums, Decimal('30'))
+        self.assertEqual(rollup.record_count, 3)
+        self.assertEqual(rollup.upload_count, 2)
+
+    def test_upsert_rerun_adds_only_the_change(self):
+        config = api_config(
+            behavior='upsert_on_key',
+            primary_key_fields=['id'],
+            rollup_fields={'premiums': 'premium', 'line_of_business': 'lob'},
+        )
+
+        connectors.run_config(config, reporting_date='2026-03-31', transport=self.transport)
+        self.records[0]['premium'] = '25'
+        self.records.append({'id': 3, 'premium': '5', 'lob': 'motor'})
+        upload_log = connectors.run_config(config, reporting_date='2026-03-31', transport=self.transport)
+
+        self.assertEqual(upload_log.sum_of_premiums, Decimal('50'))
+        rollup = self.rollup()
+        self.assertEqual(rollup.sum_of_premiums, Decimal('50'))
+        self.assertEqual(rollup.record_count, 4)
+
+    def test_upsert_takes_overwritten_records_off_their_own_reporting_date(self):
+        config = api_config(
+            behavior='upsert_on_key',
+            primary_key_fields=['id'],
+            rollup_fields={'premiums': 'premium', 'line_of_business': 'lob'},
+        )
+        connectors.run_config(config, reporting_date='2026-03-31', transport=self.transport)
+
+        self.records = [{'id': 0, 'premium': '25', 'lob': 'motor'}]
+        upload_log = connectors.run_config(config, reporting_date='2026-06-30', transport=self.transport)
+
+        self.assertEqual(upload_log.sum_of_premiums, Decimal('25'))
+        self.assertEqual(list(upload_log.superseded_totals), ['2026-03-31'])
+        expected = {'2026-03-31': (Decimal('20'), 2, 1), '2026-06-30': (Decimal('25'), 1, 1)}
+        for reporting_date, totals in expected.items():
+            rollup = self.rollup(reporting_date)
+            self.assertEqual((rollup.sum_of_premiums, rollup.record_count, rollup.upload_count), totals)
+
+        call_command('rebuild_api_rollups', stdout=io.StringIO())
+        for reporting_date, totals in expected.items():
+            rollup = self.rollup(reporting_date)
+            self.assertEqual((rollup.sum_of_premiums, rollup.record_count, rollup.upload_count), totals)
+
+    def test_append_only_rerun_counts_every_record(self):
+        config = api_config(rollup_fields={'premiums': 'premium', 'line_of_business': 'lob'})
+
+        for _ in range(2):
+            connectors.run_config(config, reporting_date='2026-03-31', transport=self.transport)
+
+        rollup = self.rollup()
+        self.assertEqual(rollup.sum_of_premiums, Decimal('60'))
+        self.assertEqual(rollup.record_count, 6)
+
+
+class SubmittedReportBulkSubmitTests(TestCase):
+    def report(self, number, **overrides):
+        fields = {
+            'run_id': f'RUN-{number}',
+            'report_type': 'LRC_Movement',
+            'model_type': 'PAA',
+            'assign_year': 2026,
+            'assign_quarter': 'Q1',
+            'status': 'active',
+        }
+        fields.update(overrides)
+        return SubmittedReport(**fields)
+
+    def test_reports_are_inserted_in_bulk_with_their_ids(self):
+        earlier = self.report(0)
+        earlier.save()
+        reports = [self.report(number, report_type=report_type)
+                   for number, report_type in enumerate(['LRC_Movement', 'LIC_Movement', 'DR_LRC', 'DR_LIC'] * 5, 1)]
+
+        with self.assertNumQueries(7):
+            SubmittedReport.bulk_submit(reports)
+
+        stored = SubmittedReport.objects.in_bulk([report.pk for report in reports])
+        self.assertEqual([stored[report.pk].run_id for report in reports], [report.run_id for report in reports])
+        earlier.refresh_from_db()
+        self.assertEqual(earlier.status, 'superseded')
+        active = SubmittedReport.objects.filter(status='active').order_by('report_type')
+        self.assertEqual(list(active.values_list('run_id', flat=True)), ['RUN-20', 'RUN-19', 'RUN-18', 'RUN-17'])
+
+
+class ListQueryBudgetTests(TestCase):
+    """
+    Every list endpoint runs a fixed number of queries however many related
+    rows are on the page. Each test seeds several rows with distinct related
+    objects, so a relation missing from the viewset's declaration adds a
+    query per row and breaks the count.
+    """
+    ROWS = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username='budget', password='budget', is_superuser=True)
+        users = [User.objects.create_user(username=f'user-{number}', password='x') for number in range(cls.ROWS)]
+
+        previous = None
+        for number, user in enumerate(users):
+            definition = ModelDefinition.objects.create(
+                name=f'Model {number}', created_by=user, last_modified_by=user, locked_by=user, cloned_from=previous
+            )
+            ModelDefinitionHistory.objects.create(model=definition, name=definition.name, version='1', modified_by=user)
+            previous = definition
+
+            batch = DataUploadBatch.objects.create(
+                batch_type='custom', batch_model='PAA', created_by=user, last_modified_by=user
+            )
+            upload = data_upload(batch, uploaded_by=user)
+            APIUploadLog.objects.create(reporting_date=date(2026, 3, 31), status='success', data_upload=upload)
+
+            currency = Currency.objects.create(code=f'C{number}', name=f'Currency {number}')
+            LineOfBusiness.objects.create(
+                batch_model='PAA', insurance_type='direct', line_of_business=f'LOB {number}', currency=currency
+            )
+
+            result = IFRSEngineResult.objects.create(
+                run_id=f'RUN-{number}', model_guid=uuid.uuid4(), model_type='PAA', report_type='LRC_Movement',
+                year=2026, quarter='Q1', status='Success', result_json={}, created_by=user.username
+            )
+            SubmittedReport.objects.create(
+                run_id=result.run_id, report_type='LRC_Movement', model_type='PAA', assign_year=2026,
+                assign_quarter='Q1', submitted_by=user, ifrs_engine_result=result
+            )
+
+            value = CalculationValue.objects.create(
+                value_id=f'V{number}', run_id=result.run_id, report_type='LRC_Movement', period='2026Q1',
+                legal_entity='LE', currency='USD', label=f'Value {number}', value=Decimal('1.00'),
+                calculation_method='sum', calc_engine_version='1', engine_result=result
+            )
+            for item in range(2):
+                AssumptionReference.objects.create(
+                    calculation_value=value, assumption_type='discount_rate', assumption_id=f'A{item}',
+                    assumption_version='1', effective_date=date(2026, 1, 1)
+                )
+                InputDataReference.objects.create(
+                    calculation_value=value, dataset_name=f'dataset-{item}', source_snapshot_id=f'S{item}'
+                )
+
+            api_config(api_source_name=f'source-{number}')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertListQueries(self, prefix, expected):
+        with self.assertNumQueries(expected):
+            response = self.client.get(f'{API_ROOT}{prefix}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_model_definitions(self):
+        self.assertListQueries('', 1)
+
+    def test_model_definition_history(self):
+        self.assertListQueries('history/', 1)
+
+    def test_data_upload_batches(self):
+        self.assertListQueries('data-upload-batches/', 1)
+
+    def test_data_uploads(self):
+        self.assertListQueries('data-uploads/', 1)
+
+    def test_api_upload_logs(self):
+        self.assertListQueries('api-upload-logs/', 1)
+
+    def test_line_of_business(self):
+        self.assertListQueries('line-of-business/', 1)
+
+    def test_ifrs_engine_results(self):
+        self.assertListQueries('ifrs-engine-results/', 2)
+
+    def test_submitted_reports(self):
+        self.assertListQueries('submitted-reports/', 2)
+
+    def test_api_configs(self):
+        self.assertListQueries('api-configs/', 1)
+
+    def test_audit(self):
+        self.assertListQueries('audit/', 3)
+
+
+def variance(number, **overrides):
+    comparison_data = {
+        'value_id': f'V{number}',
+        'current_value': 100 + number,
+        'prior_value': 100,
+        'absolute_change': number,
+        'percentage_change': number,
+        'has_audit_data': False,
+    }
+    comparison_data.update(overrides)
+    return comparison_data
+
+
+class StubCompletions:
+    """
+    Stub chat completions endpoint answering every item of a batch prompt,
+    or with ``content`` when given.
+    """
+
+    def __init__(self, content=None, status_code=200):
+        self.content = content
+        self.status_code = status_code
+        self.batches = []
+
+    def __call__(self, request):
+        prompt = json.loads(request.content)['messages'][1]['content']
+        item_count = len(re.findall(r'### Item \d+', prompt))
+        self.batches.append(item_count)
+        if self.status_code != 200:
+            return httpx.Response(self.status_code)
+        content = self.content
+        if content is None:
+            content = json.dumps({'insights': [
+                {'item': number, 'analysis': f'AI insight {number}'} for number in range(1, item_count + 1)
+            ]})
+        return httpx.Response(200, json={'choices': [{'message': {'content': content}}]})
+
+
+@override_settings(
+    OPENAI_API_KEY='test-key',
+    AI_INSIGHT_BATCH_SIZE=10,
+    AI_INSIGHT_MAX_BATCHES=20,
+    AI_INSIGHT_MAX_RETRIES=1,
+    AI_INSIGHT_DEADLINE_SECONDS=5,
+)
+class AIInsightTests(TestCase):
+    def setUp(self):
+        self.stub = StubCompletions()
+        self.transport = httpx.MockTransport(self.stub)
+
+    def generate(self, items, transport=None):
+        return ai_insights.generate_insights(items, transport=transport or self.transport)
+
+    def test_items_are_sent_in_batches(self):
+        insights = self.generate([variance(number) for number in range(25)])
+
+        self.assertEqual(sorted(self.stub.batches), [5, 10, 10])
+        self.assertTrue(all(insight.startswith('AI insight') for insight in insights))
+        self.assertEqual(AIInsightCache.objects.count(), 25)
+
+    def test_duplicate_variances_are_asked_once(self):
+        self.generate([variance(1), variance(1, current_run_id='other'), variance(2)])
+
+        self.assertEqual(self.stub.batches, [2])
+
+    def test_cached_insights_are_not_requested_again(self):
+        self.generate([variance(number) for number in range(3)])
+        self.stub.batches.clear()
+
+        insights = self.generate([variance(number) for number in range(4)])
+
+        self.assertEqual(self.stub.batches, [1])
+        self.assertTrue(all(insight.startswith('AI insight') for insight in insights))
+
+    def test_changing_the_model_bypasses_the_cache(self):
+        self.generate([variance(1)])
+        self.stub.batches.clear()
+
+        with override_settings(AI_INSIGHT_MODEL='another-model'):
+            self.generate([variance(1)])
+
+        self.assertEqual(self.stub.batches, [1])
+        self.assertEqual(AIInsightCache.objects.count(), 2)
+
+    @override_settings(AI_INSIGHT_MAX_BATCHES=1)
+    def test_items_over_budget_fall_back(self):
+        items = [variance(number) for number in range(15)]
+
+        insights = self.generate(items)
+
+        self.assertEqual(self.stub.batches, [10])
+        self.assertTrue(all(insight.startswith('AI insight') for insight in insights[:10]))
+        self.assertEqual(insights[10:], [ai_insights.fallback_insight(item) for item in items[10:]])
+        self.assertEqual(AIInsightCache.objects.count(), 10)
+
+    @override_settings(AI_INSIGHT_DEADLINE_SECONDS=1)
+    def test_batches_past_the_deadline_fall_back(self):
+        async def slow(request):
+            await asyncio.sleep(3)
+            return httpx.Response(200)
+
+        item = variance(1)
+        insights = self.generate([item], transport=httpx.MockTransport(slow))
+
+        self.assertEqual(insights, [ai_insights.fallback_insight(item)])
+        self.assertFalse(AIInsightCache.objects.exists())
+
+    @mock.patch.object(ai_insights, 'BACKOFF_MAX_MS', 2)
+    @mock.patch.object(ai_insights, 'BACKOFF_MIN_MS', 1)
+    def test_failed_requests_fall_back(self):
+        stub = StubCompletions(status_code=503)
+
+        insights = self.generate([variance(1)], transport=httpx.MockTransport(stub))
+
+        self.assertEqual(stub.batches, [1, 1])
+        self.assertEqual(insights, [ai_insights.fallback_insight(variance(1))])
+
+    def test_malformed_answers_fall_back(self):
+        for content in ['not json', json.dumps({'answers': []}), json.dumps({'insights': [{'item': 'x'}, 'text']})]:
+            AIInsightCache.objects.all().delete()
+            insights = self.generate([variance(1)], transport=httpx.MockTransport(StubCompletions(content=content)))
+
+            self.assertEqual(insights, [ai_insights.fallback_insight(variance(1))])
+            self.assertFalse(AIInsightCache.objects.exists())
+
+    def test_partial_answers_fall_back_for_missing_items(self):
+        content = json.dumps({'insights': [{'item': 2, 'analysis': 'Only the second'}, {'item': 9, 'analysis': 'Unknown'}]})
+
+        insights = self.generate([variance(1), variance(2)], transport=httpx.MockTransport(StubCompletions(content=content)))
+
+        self.assertEqual(insights, [ai_insights.fallback_insight(variance(1)), 'Only the second'])
+        self.assertEqual(AIInsightCache.objects.count(), 1)
+
+    @override_settings(OPENAI_API_KEY='')
+    def test_without_api_key_nothing_is_requested(self):
+        insights = self.generate([variance(1)])
+
+        self.assertEqual(self.stub.batches, [])
+        self.assertEqual(insights, [ai_insights.fallback_insight(variance(1))])
+
+
+def engine_result(run_id, amounts, report_type='LRC_Movement', metadata=None, **overrides):
+    fields = {
+        'run_id': run_id,
+        'model_guid': uuid.uuid4(),
+        'model_type': 'PAA',
+        'report_type': report_type,
+        'year': 2026,
+        'quarter': 'Q1',
+        'status': 'Success',
+        'result_json': {
+            'metadata': {'run_id': run_id, **(metadata or {})},
+            'calculations': {
+                f'calc_{value_id}': {'value_id': value_id, 'amount': amount}
+                for value_id, amount in amounts.items()
+            },
+        },
+    }
+    fields.update(overrides)
+    return IFRSEngineResult.objects.create(**fields)
+
+
+def calculation_value(result, value_id, amount, **overrides):
+    fields = {
+        'value_id': value_id,
+        'run_id': result.run_id,
+        'report_type': result.report_type,
+        'period': '2026 Q1',
+        'legal_entity': 'Entity',
+        'currency': 'USD',
+        'label': value_id,
+        'value': Decimal(amount),
+        'calculation_method': 'PAA',
+        'calc_engine_version': '1.0.0',
+        'engine_result': result,
+    }
+    fields.update(overrides)
+    return CalculationValue.objects.create(**fields)
+
+
+@override_settings(OPENAI_API_KEY='')
+class AuditEndpointTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username='audit', password='audit'))
+        self.current = engine_result('RUN-2', {'V1': 150, 'V2': 80})
+        self.prior = engine_result('RUN-1', {'V1': 100, 'V2': 100})
+
+    def get(self, action, **params):
+        response = self.client.get(f'{API_ROOT}audit/{action}/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_comparisons_of_the_same_results_share_their_snapshots(self):
+        for value_id in ['V1', 'V2']:
+            self.get('compare_runs', current_run_id='RUN-2', prior_run_id='RUN-1', value_id=value_id)
+
+        analyses = AIVarianceAnalysis.objects.order_by('value_id')
+        self.assertEqual(len(analyses), 2)
+        self.assertEqual({analysis.current_snapshot_id for analysis in analyses}, {analyses[0].current_snapshot_id})
+        self.assertEqual({analysis.prior_snapshot_id for analysis in analyses}, {analyses[0].prior_snapshot_id})
+        self.assertEqual(ResultSnapshot.objects.count(), 2)
+        self.assertEqual(analyses[0].current_json_snapshot, self.current.result_json)
+        self.assertEqual(analyses[0].prior_json_snapshot, self.prior.result_json)
+
+    def compare_values(self, **params):
+        return self.get('compare_run_values', current_run_id='RUN-2', prior_run_id='RUN-1', **params)
+
+    def seed_value_changes(self):
+        for result, amounts in [(self.current, {'V1': 150, 'V2': 80, 'V4': 10, 'V5': 5}),
+                                (self.prior, {'V1': 100, 'V2': 100, 'V3': 30, 'V5': 5})]:
+            for value_id, amount in amounts.items():
+                calculation_value(result, value_id, amount)
+
+    def test_compare_run_values_totals_and_ranks_the_changes(self):
+        self.seed_value_changes()
+
+        comparison = self.compare_values()
+
+        self.assertEqual(comparison['totals'], {'added': 1, 'removed': 1, 'changed': 2, 'unchanged': 0})
+        self.assertEqual(comparison['count'], 4)
+        self.assertEqual(
+            [(line['valueId'], line['changeType'], line['absoluteChange']) for line in comparison['results']],
+            [('V1', 'changed', '50.00'), ('V3', 'removed', '-30.00'), ('V2', 'changed', '-20.00'), ('V4', 'added', '10.00')]
+        )
+        self.assertEqual(comparison['results'][2]['percentageChange'], -20.0)
+
+    def test_compare_run_values_orderings_thresholds_and_pages(self):
+        self.seed_value_changes()
+
+        by_percentage = self.compare_values(ordering='percentage')
+        self.assertEqual([line['valueId'] for line in by_percentage['results']], ['V4', 'V3', 'V1', 'V2'])
+
+        large = self.compare_values(min_abs_change='25')
+        self.assertEqual([line['valueId'] for line in large['results']], ['V1', 'V3'])
+        self.assertEqual(large['totals'], {'added': 0, 'removed': 1, 'changed': 1, 'unchanged': 0})
+
+        everything = self.compare_values(include_unchanged='true', ordering='value_id', page_size=3, page=2)
+        self.assertEqual([line['valueId'] for line in everything['results']], ['V4', 'V5'])
+        self.assertEqual(everything['totals']['unchanged'], 1)
+        self.assertIsNone(everything['next'])
+
+    def test_reports_by_run_reads_stored_value_counts(self):
+        disclosure = engine_result('RUN-2', {'DR.1': 1, 'DR.2': 2}, report_type='disclosure_report')
+        audit_helper.populate_disclosure_report_audit_trail(
+            disclosure, disclosure.result_json['calculations'], {}, 'RUN-2'
+        )
+
+        with self.assertNumQueries(1):
+            reports = self.get('reports_by_run', run_id='RUN-2')
+
+        self.assertEqual(
+            sorted((report['reportType'], report['valueCount']) for report in reports['results']),
+            [('LRC_Movement', 0), ('disclosure_report', 2)]
+        )
+
+    def test_value_count_backfill_counts_each_results_values(self):
+        backfill = importlib.import_module('model_definitions.migrations.0041_backfill_value_counts')
+        for value_id in ['V1', 'V2']:
+            calculation_value(self.current, value_id, 1)
+        calculation_value(self.prior, 'V1', 1)
+
+        backfill.backfill_value_counts(django_apps, None)
+
+        self.assertEqual(
+            dict(IFRSEngineResult.objects.values_list('run_id', 'value_count')),
+            {'RUN-2': 2, 'RUN-1': 1}
+        )
+
+    def submit(self, result, assign_year, assign_quarter, **overrides):
+        fields = {
+            'run_id': result.run_id if result else 'RUN-X',
+            'report_type': 'LRC_Movement',
+            'model_type': 'PAA',
+            'assign_year': assign_year,
+            'assign_quarter': assign_quarter,
+            'ifrs_engine_result': result,
+        }
+        fields.update(overrides)
+        return SubmittedReport.objects.create(**fields)
+
+    def test_submitted_reports_by_type_pages_the_active_reports_with_results(self):
+        latest = self.submit(self.current, 2026, 'Q2')
+        earlier = self.submit(self.prior, 2026, 'Q1')
+        oldest = self.submit(self.prior, 2025, 'Q4')
+        self.submit(None, 2027, 'Q1')
+        self.submit(self.current, 2027, 'Q2', status='superseded')
+        self.submit(self.current, 2027, 'Q3', report_type='disclosure_report')
+
+        everything = self.get('submitted_reports_by_type', report_type='LRC_Movement')
+        self.assertEqual(everything['count'], 3)
+        self.assertEqual([report['id'] for report in everything['results']], [latest.id, earlier.id, oldest.id])
+        self.assertEqual(everything['results'][0]['displayName'], 'Lrc Movement - RUN-2 - 2026 Q2')
+        self.assertIsNone(everything['next'])
+
+        # The count, then the page
+        with self.assertNumQueries(2):
+            middle = self.get('submitted_reports_by_type', report_type='LRC_Movement', page_size=1, page=2)
+        self.assertEqual([report['id'] for report in middle['results']], [earlier.id])
+        self.assertEqual(middle['next'], '?report_type=LRC_Movement&page_size=1&page=3')
+        self.assertEqual(middle['previous'], '?report_type=LRC_Movement&page_size=1&page=1')
+
+        capped = self.get('submitted_reports_by_type', report_type='LRC_Movement', page_size=1000)
+        self.assertEqual(len(capped['results']), 3)
+
+    def test_submitted_reports_by_type_requires_a_report_type_and_integer_pages(self):
+        for params in [{}, {'report_type': 'LRC_Movement', 'page': 'two'}]:
+            response = self.client.get(f'{API_ROOT}audit/submitted_reports_by_type/', params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_deleting_an_engine_result_clears_its_submissions(self):
+        report = self.submit(self.prior, 2026, 'Q1')
+
+        self.prior.delete()
+
+        report.refresh_from_db()
+        self.assertIsNone(report.ifrs_engine_result_id)
+        self.assertEqual(self.get('submitted_reports_by_type', report_type='LRC_Movement')['count'], 0)
+
+    def test_clearing_missing_engine_results_keeps_existing_references(self):
+        migration = importlib.import_module('model_definitions.migrations.0043_clear_missing_engine_results')
+        kept = self.submit(self.current, 2026, 'Q2')
+        dangling = self.submit(self.prior, 2026, 'Q1')
+        SubmittedReport.objects.filter(pk=dangling.pk).update(ifrs_engine_result_id=self.prior.pk + 1000)
+
+        migration.clear_missing_engine_results(django_apps, None)
+
+        self.assertEqual(
+            dict(SubmittedReport.objects.values_list('pk', 'ifrs_engine_result_id')),
+            {kept.pk: self.current.pk, dangling.pk: None}
+        )
+
+    def test_value_detail_reads_the_audit_trail(self):
+        result = engine_result('RUN-D', {'DR.1': 42}, report_type='disclosure_report')
+        audit_helper.populate_disclosure_report_audit_trail(
+            result, result.result_json['calculations'], {'year': 2026, 'quarter': 'Q1'}, 'RUN-D'
+        )
+
+        detail = self.get('value_detail', run_id='RUN-D', value_id='DR.1')
+
+        self.assertEqual(detail['detail'], 'Success')
+        self.assertEqual((detail['result']['value'], detail['result']['isFallback']), ('42.00', False))
+
+    def test_value_detail_falls_back_to_the_indexed_disclosure_value(self):
+        engine_result('RUN-D', {'DR.1': 42, 'DR.2': 7}, report_type='disclosure_report', metadata={
+            'year': 2026, 'quarter': 'Q1', 'legal_entity_name': 'Entity', 'currency_name': 'EUR',
+        })
+
+        # The audit trail lookup, then the index entry and the extracted value
+        with self.assertNumQueries(3):
+            detail = self.get('value_detail', run_id='RUN-D', value_id='DR.2')
+
+        self.assertEqual(detail['detail'], 'Success (Fallback Mode)')
+        result = detail['result']
+        self.assertEqual(
+            (result['value'], result['period'], result['legalEntity'], result['currency'], result['isFallback']),
+            (7.0, '2026 Q1', 'Entity', 'EUR', True)
+        )
+
+    def test_value_detail_of_an_unknown_value_is_not_found(self):
+        engine_result('RUN-D', {'DR.1': 42}, report_type='disclosure_report')
+
+        for run_id, value_id in [('RUN-D', 'DR.9'), ('RUN-2', 'V1')]:
+            response = self.client.get(f'{API_ROOT}audit/value_detail/', {'run_id': run_id, 'value_id': value_id})
+            self.assertEqual(response.status_code, 404)
+
+
+class ResultValueIndexTests(TestCase):
+    def test_saves_that_leave_the_result_json_alone_keep_the_index(self):
+        result = engine_result('RUN-1', {'V1': 100})
+        result = IFRSEngineResult.objects.get(pk=result.pk)
+
+        with mock.patch.object(ResultValueIndex, 'index_result') as index_result:
+            result.status = 'Error'
+            result.save()
+            result.value_count = 3
+            result.save(update_fields=['value_count'])
+
+        index_result.assert_not_called()
+
+    def test_changing_the_result_json_rebuilds_the_index(self):
+        result = IFRSEngineResult.objects.get(pk=engine_result('RUN-1', {'V1': 100}).pk)
+
+        result.result_json['calculations']['calc_V2'] = {'value_id': 'V2', 'amount': 5}
+        result.save()
+
+        self.assertEqual(ResultValueIndex.lookup('RUN-1', 'V2')['calculation'], {'value_id': 'V2', 'amount': 5})
+        self.assertEqual(ResultValueIndex.objects.filter(engine_result=result).count(), 2)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username='pages', password='pages'))
+        results = [engine_result(f'RUN-{number}', {}) for number in range(7)]
+        # Ties on created_at are broken by id
+        IFRSEngineResult.objects.filter(pk__in=[result.pk for result in results[2:5]]).update(
+            created_at=results[2].created_at
+        )
+        self.expected = list(IFRSEngineResult.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def page(self, query):
+        response = self.client.get(f'{API_ROOT}ifrs-engine-results/{query}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_cursor_pages_walk_forwards_and_back(self):
+        pages = [self.page('?cursor=&page_size=3')]
+        while pages[-1]['next']:
+            pages.append(self.page(pages[-1]['next']))
+
+        self.assertEqual([[row['id'] for row in page['results']] for page in pages],
+                         [self.expected[0:3], self.expected[3:6], self.expected[6:]])
+        self.assertIsNone(pages[0]['previous'])
+        self.assertIsNone(pages[0]['count'])
+
+        backwards = [pages[-1]]
+        while backwards[-1]['previous']:
+            backwards.append(self.page(backwards[-1]['previous']))
+
+        self.assertEqual([[row['id'] for row in page['results']] for page in backwards],
+                         [self.expected[6:], self.expected[3:6], self.expected[0:3]])
+
+    def test_submitted_reports_walk_their_keyset(self):
+        user = get_user_model().objects.get(username='pages')
+        for number, (year, quarter) in enumerate([(2025, 'Q4'), (2026, 'Q1'), (2026, 'Q1'), (2026, 'Q2')]):
+            SubmittedReport.objects.create(
+                run_id=f'RUN-{number}', report_type='LRC_Movement', model_type='PAA', assign_year=year,
+                assign_quarter=quarter, submitted_by=user
+            )
+        expected = list(SubmittedReport.objects.order_by(
+            '-assign_year', '-assign_quarter', '-created_on', '-id'
+        ).values_list('pk', flat=True))
+
+        seen = []
+        query = '?cursor=&page_size=3'
+        while query:
+            response = self.client.get(f'{API_ROOT}submitted-reports/{query}')
+            self.assertEqual(response.status_code, 200, response.content)
+            seen.extend(row['id'] for row in response.json()['results'])
+            query = response.json()['next']
+
+        self.assertEqual(seen, expected)
+
+    def test_count_is_only_given_on_request(self):
+        self.assertEqual(self.page('?cursor=&count=exact')['count'], 7)
+        self.assertEqual(self.page('?cursor=&count=estimate')['count'], 7)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(f'{API_ROOT}ifrs-engine-results/', {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class RunSummaryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username='runs', password='runs'))
+        started = timezone.now() - timedelta(days=1)
+        for offset, (run_id, report_type, result_status, year, quarter) in enumerate([
+            ('RUN-A', 'LRC_Movement', 'Success', 2025, 'Q4'),
+            ('RUN-A', 'LIC_Movement', 'Error', 2025, 'Q4'),
+            ('RUN-B', 'LRC_Movement', 'Success', 2026, 'Q1'),
+            ('RUN-C', 'LRC_Movement', 'Success', 2026, 'Q1'),
+        ]):
+            result = engine_result(run_id, {}, report_type=report_type, status=result_status, year=year, quarter=quarter)
+            IFRSEngineResult.objects.filter(pk=result.pk).update(created_at=started + timedelta(minutes=offset))
+
+    def runs(self, **params):
+        response = self.client.get(f'{API_ROOT}audit/runs_by_period/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def summaries(self, **params):
+        return [
+            (run['runId'], run['period'], run['status'], run['availableReports'])
+            for run in self.runs(**params)['results']
+        ]
+
+    def test_runs_are_grouped_newest_first(self):
+        self.assertEqual(self.summaries(), [
+            ('RUN-C', '2026 Q1', 'Final', ['LRC_Movement']),
+            ('RUN-B', '2026 Q1', 'Final', ['LRC_Movement']),
+            ('RUN-A', '2025 Q4', 'Draft', ['LIC_Movement', 'LRC_Movement']),
+        ])
+        self.assertEqual([run[0] for run in self.summaries(year=2025)], ['RUN-A'])
+
+    def test_runs_are_paged_in_a_fixed_number_of_queries(self):
+        # The count, the grouped page and its latest results, plus the report types outside PostgreSQL
+        with self.assertNumQueries(3 if connection.vendor == 'postgresql' else 4):
+            first = self.runs(page_size=2)
+
+        self.assertEqual((first['count'], len(first['results'])), (3, 2))
+        self.assertEqual([run['runId'] for run in self.runs(page=2, page_size=2)['results']], ['RUN-A'])
+        self.assertIsNotNone(first['next'])
+
+    def test_results_are_linked_to_their_run(self):
+        runs = Run.objects.in_bulk(field_name='run_id')
+
+        self.assertEqual(set(runs), {'RUN-A', 'RUN-B', 'RUN-C'})
+        self.assertEqual(IFRSEngineResult.objects.filter(engine_run=runs['RUN-A']).count(), 2)
+
+    def test_stored_run_summaries_match_the_aggregated_runs(self):
+        aggregated = self.summaries()
+
+        self.assertEqual(run_summaries.refresh_run_summaries(), 3)
+        run = Run.objects.get(run_id='RUN-A')
+        self.assertEqual((run.result_count, run.error_count, run.status), (2, 1, 'Error'))
+        with override_settings(AUDIT_RUN_SUMMARIES=True):
+            self.assertEqual(self.summaries(), aggregated)
+
+
+class QueryPlanBenchmarkTests(TestCase):
+    def assertQueryPatternIndexes(self):
+        with connection.cursor() as cursor:
+            for model, name in benchmark_query_plans.ADDED_INDEXES:
+                constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+                self.assertTrue(constraints[name]['index'], name)
+
+    def test_the_query_pattern_indexes_exist(self):
+        self.assertQueryPatternIndexes()
+
+    def test_benchmark_explains_each_pattern_and_rolls_back(self):
+        results = IFRSEngineResult.objects.count()
+        output = io.StringIO()
+
+        call_command('benchmark_query_plans', rows=60, compare=True, stdout=output)
+
+        plans = output.getvalue()
+        for description in ['Uploads of a batch by data type', 'Engine results keyset page', 'Engine input of a run']:
+            self.assertIn(description, plans)
+        self.assertEqual(plans.count('before:'), 8)
+        self.assertIn('Seeded 60 engine results', plans)
+        self.assertEqual(IFRSEngineResult.objects.count(), results)
+        self.assertFalse(DataUploadBatch.objects.filter(batch_id__startswith='BENCH-').exists())
+        # The --compare index swap is rolled back with the data
+        self.assertQueryPatternIndexes()
@@ -0,0 +1,425 @@
+"""
+AI insights for run-to-run variances.
+
+Variances are described in batches of AI_INSIGHT_BATCH_SIZE per prompt and
+the batches are sent concurrently (at most AI_INSIGHT_MAX_CONCURRENCY at a
+time) to an OpenAI-compatible ``/chat/completions`` endpoint at
+AI_INSIGHT_API_BASE, with a per-request timeout and retries. Answers are
+cached in ``AIInsightCache`` by a hash of the comparison inputs, the model and
+the prompt text, so the same variance seen in another pair of runs is not
+sent again, while a new model or prompt gets fresh answers.
+
+Items that cannot be answered (no API key, more batches than
+AI_INSIGHT_MAX_BATCHES, past AI_INSIGHT_DEADLINE_SECONDS, or an unusable
+response) get the rule-based ``fallback_insight``, which is never cached.
+
+A ``transport`` (e.g. ``httpx.MockTransport``) can be passed to
+``generate_insights`` to run against a local stub server.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+from model_definitions.connectors.client import RETRYABLE_STATUS_CODES
+from model_definitions.connectors.throttling import backoff_delay
+from model_definitions.models import AIInsightCache
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = (
+    "You are an expert IFRS 17 audit analyst with deep knowledge of insurance contract accounting, "
+    "actuarial assumptions, and regulatory compliance. Provide clear, professional insights."
+)
+
+SECTIONS_PROMPT = (
+    "Provide your analysis structured into exactly these 4 numbered sections with bold headers. "
+    "Each section should be 1-3 sentences, specific and actionable:"
+    "\n\n1. Magnitude Assessment: Describe the size of the change (negligible/minor/moderate/significant) with context."
+    "\n\n2. Primary Drivers of the Change: Explain what specifically caused this movement based on the data provided."
+    "\n\n3. Potential Implications for IFRS 17 Compliance: Describe what this means from a regulatory and reporting perspective."
+    "\n\n4. Red Flags or Items Requiring Auditor Attention: List any concerns, risks, or items needing follow-up."
+    "\n\nReturn only the 4 numbered sections. No introduction, no conclusion. Focus on what an auditor needs to know."
+)
+
+BATCH_INTRO = "You are an IFRS 17 audit analyst reviewing changes in insurance contract valuations."
+
+RESPONSE_FORMAT_PROMPT = (
+    '\n\nRespond with a JSON object of the form {"insights": [{"item": <item number>, '
+    '"analysis": "<the 4 sections>"}]} containing every item exactly once.'
+)
+
+# Changes whenever any of the prompt text above does, which retires cached answers
+PROMPT_VERSION = hashlib.sha256(
+    '\0'.join([SYSTEM_PROMPT, SECTIONS_PROMPT, BATCH_INTRO, RESPONSE_FORMAT_PROMPT]).encode('utf-8')
+).hexdigest()[:12]
+
+MAX_TOKENS_PER_ITEM = 500
+BACKOFF_MIN_MS = 500
+BACKOFF_MAX_MS = 8000
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def insights_enabled() -> bool:
+    return bool(_setting('OPENAI_API_KEY', ''))
+
+
+def _amount(value) -> Optional[float]:
+    return None if value is None else round(float(value), 2)
+
+
+def insight_inputs(comparison_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The parts of a comparison an insight depends on. Run ids are left out so
+    that the same movement in another pair of runs hashes the same.
+    """
+    percentage_change = comparison_data.get('percentage_change')
+    return {
+        'value_id': comparison_data['value_id'],
+        'current_value': _amount(comparison_data.get('current_value')),
+        'prior_value': _amount(comparison_data.get('prior_value')),
+        'absolute_change': _amount(comparison_data.get('absolute_change')),
+        'percentage_change': None if percentage_change is None else round(float(percentage_change), 2),
+        'has_audit_data': bool(comparison_data.get('has_audit_data')),
+        'formula_changed': bool(comparison_data.get('formula_changed')),
+        'assumption_changes': comparison_data.get('assumption_changes') or [],
+        'input_changes': comparison_data.get('input_changes') or [],
+    }
+
+
+def insight_model() -> str:
+    return _setting('AI_INSIGHT_MODEL', 'gpt-4o-mini')
+
+
+def insight_hash(comparison_data: Dict[str, Any]) -> str:
+    keyed = {
+        'inputs': insight_inputs(comparison_data),
+        'model': insight_model(),
+        'prompt_version': PROMPT_VERSION,
+    }
+    canonical = json.dumps(keyed, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _money(value) -> str:
+    return 'n/a' if value is None else f"${value:,.2f}"
+
+
+def describe_variance(comparison_data: Dict[str, Any]) -> str:
+    """
+    Prompt text for one variance: amounts, change and, with audit data, the
+    assumption / input / formula changes behind it.
+    """
+    percentage_change = comparison_data.get('percentage_change')
+    parts = [
+        f"Value ID: {comparison_data['value_id']}",
+        f"\nCurrent Value: {_money(comparison_data.get('current_value'))}",
+        f"\nPrior Value: {_money(comparison_data.get('prior_value'))}",
+        f"\nAbsolute Change: {_money(comparison_data.get('absolute_change'))}",
+        f"\nPercentage Change: {'n/a' if percentage_change is None else f'{percentage_change:.2f}%'}",
+    ]
+
+    if comparison_data.get('has_audit_data'):
+        parts.append("\n\nDetailed Change Information:")
+
+        if comparison_data.get('formula_changed'):
+            parts.append("\n- The calculation formula was modified between runs")
+
+        assumption_changes = comparison_data.get('assumption_changes', [])
+        if assumption_changes:
+            parts.append(f"\n\nAssumption Changes ({len(assumption_changes)} total):")
+            for change in assumption_changes[:10]:
+                change_type = change['type'].replace('_', ' ')
+                assumption_type = change['assumption_type'].replace('_', ' ')
+                if change['type'] == 'version_changed':
+                    parts.append(
+                        f"\n- {change_type.upper()}: {assumption_type} (ID: {change['assumption_id']}) "
+                        f"version changed from {change.get('prior_version', 'N/A')} to {change.get('current_version', 'N/A')}"
+                    )
+                else:
+                    parts.append(
+                        f"\n- {change_type.upper()}: {assumption_type} (ID: {change['assumption_id']})"
+                    )
+            if len(assumption_changes) > 10:
+                parts.append(f"\n- ... and {len(assumption_changes) - 10} more assumption changes")
+
+        input_changes = comparison_data.get('input_changes', [])
+        if input_changes:
+            parts.append(f"\n\nInput Data Changes ({len(input_changes)} total):")
+            for change in input_changes[:10]:
+                change_type = change['type'].replace('_', ' ')
+                if change['type'] == 'snapshot_changed':
+                    record_change = (change.get('current_record_count') or 0) - (change.get('prior_record_count') or 0)
+                    parts.append(
+                        f"\n- {change_type.upper()}: {change['dataset_name']} "
+                        f"(snapshot: {change.get('prior_snapshot', 'N/A')} → {change.get('current_snapshot', 'N/A')}, "
+                        f"records changed by {record_change:+,})"
+                    )
+                else:
+                    parts.append(
+                        f"\n- {change_type.upper()}: {change['dataset_name']}"
+                    )
+            if len(input_changes) > 10:
+                parts.append(f"\n- ... and {len(input_changes) - 10} more input changes")
+
+    return ''.join(parts)
+
+
+def build_prompt(items: List[Dict[str, Any]]) -> str:
+    """
+    One prompt for a batch of variances, asking for a JSON answer keyed by
+    the item numbers.
+    """
+    parts = [BATCH_INTRO]
+    for number, comparison_data in enumerate(items, 1):
+        parts.append(f"\n\n### Item {number}\n{describe_variance(comparison_data)}")
+    parts.append("\n\nFor each item: " + SECTIONS_PROMPT + RESPONSE_FORMAT_PROMPT)
+    return ''.join(parts)
+
+
+def parse_insights(content: str, item_count: int) -> Dict[int, str]:
+    """
+    Item number (1-based) -> analysis from a batch answer. Malformed entries
+    are skipped; their items fall back.
+    """
+    try:
+        payload = json.loads(content)
+    except (TypeError, ValueError):
+        return {}
+    entries = payload.get('insights') if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        return {}
+
+    insights = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            number = int(entry.get('item'))
+        except (TypeError, ValueError):
+            continue
+        analysis = entry.get('analysis')
+        if 1 <= number <= item_count and isinstance(analysis, str) and analysis.strip():
+            insights[number] = analysis.strip()
+    return insights
+
+
+def fallback_insight(comparison_data: Dict[str, Any]) -> str:
+    """
+    Rule-based insight used when no AI answer is available.
+    """
+    absolute_change = float(comparison_data.get('absolute_change') or 0)
+    percentage_change = comparison_data.get('percentage_change')
+
+    if comparison_data.get('prior_value') is None:
+        insight_parts = [f"The value is new in the current run ({_money(comparison_data.get('current_value'))})."]
+    elif comparison_data.get('current_value') is None:
+        insight_parts = [f"The value is no longer reported (prior value {_money(comparison_data.get('prior_value'))})."]
+    elif percentage_change is None:
+        direction = "increased" if absolute_change > 0 else "decreased"
+        insight_parts = [f"The value has {direction} by ${abs(absolute_change):,.2f} from a prior value of zero."]
+    else:
+        percentage_change = float(percentage_change)
+        if abs(percentage_change) < 0.01:
+            magnitude = "negligible"
+        elif abs(percentage_change) < 5:
+            magnitude = "minor"
+        elif abs(percentage_change) < 20:
+            magnitude = "moderate"
+        else:
+            magnitude = "significant"
+
+        direction = "increased" if absolute_change > 0 else "decreased"
+        insight_parts = [
+            f"The value has {direction} by {abs(percentage_change):.2f}% (${abs(absolute_change):,.2f}), which represents a {magnitude} change."
+        ]
+
+    if comparison_data.get('has_audit_data'):
+        changes = []
+
+        if comparison_data.get('formula_changed'):
+            changes.append("calculation formula was modified")
+
+        assumption_changes = comparison_data.get('assumption_changes', [])
+        if assumption_changes:
+            added = len([c for c in assumption_changes if c['type'] == 'added'])
+            removed = len([c for c in assumption_changes if c['type'] == 'removed'])
+            version_changed = len([c for c in assumption_changes if c['type'] == 'version_changed'])
+
+            if added:
+                changes.append(f"{added} assumption(s) were added")
+            if removed:
+                changes.append(f"{removed} assumption(s) were removed")
+            if version_changed:
+                changes.append(f"{version_changed} assumption(s) were updated to new versions")
+
+        input_changes = comparison_data.get('input_changes', [])
+        if input_changes:
+            snapshot_changed = len([c for c in input_changes if c['type'] == 'snapshot_changed'])
+            added = len([c for c in input_changes if c['type'] == 'added'])
+            removed = len([c for c in input_changes if c['type'] == 'removed'])
+
+            if snapshot_changed:
+                changes.append(f"{snapshot_changed} input dataset(s) were updated with new data snapshots")
+            if added:
+                changes.append(f"{added} input dataset(s) were added")
+            if removed:
+                changes.append(f"{removed} input dataset(s) were removed")
+
+        if changes:
+            insight_parts.append("\n\nKey drivers of the change:")
+            for i, change in enumerate(changes, 1):
+                insight_parts.append(f"\n{i}. {change.capitalize()}")
+        else:
+            insight_parts.append("\n\nNo significant changes detected in assumptions, inputs, or formulas. The change may be due to indirect factors or rounding differences.")
+    else:
+        insight_parts.append("\n\nNote: Detailed audit data is not available for these runs. Enable audit trail tracking for more comprehensive change analysis.")
+
+    return ''.join(insight_parts)
+
+
+class InsightClient:
+    """
+    Sends batch prompts to the chat completions endpoint, at most
+    ``max_concurrency`` at a time, retrying transport errors and retryable
+    statuses with jittered backoff.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.model = insight_model()
+        self.max_retries = max(_setting('AI_INSIGHT_MAX_RETRIES', 2), 0)
+        self.semaphore = asyncio.Semaphore(max(_setting('AI_INSIGHT_MAX_CONCURRENCY', 4), 1))
+
+        client_kwargs = {
+            'base_url': _setting('AI_INSIGHT_API_BASE', 'https://api.openai.com/v1').rstrip('/'),
+            'headers': {'Authorization': f"Bearer {_setting('OPENAI_API_KEY', '')}"},
+            'timeout': httpx.Timeout(max(_setting('AI_INSIGHT_TIMEOUT_SECONDS', 30), 1)),
+        }
+        if transport is not None:
+            client_kwargs['transport'] = transport
+        self._client = httpx.AsyncClient(**client_kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+
+    async def complete(self, prompt: str, item_count: int) -> str:
+        body = {
+            'model': self.model,
+            'messages': [
+                {'role': 'system', 'content': SYSTEM_PROMPT},
+                {'role': 'user', 'content': prompt},
+            ],
+            'temperature': 0.3,
+            'max_tokens': MAX_TOKENS_PER_ITEM * item_count,
+            'response_format': {'type': 'json_object'},
+        }
+        max_attempts = self.max_retries + 1
+
+        async with self.semaphore:
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    response = await self._client.post('/chat/completions', json=body)
+                except httpx.TransportError as e:
+                    if attempt >= max_attempts:
+                        raise
+                    delay = backoff_delay(attempt, BACKOFF_MIN_MS, BACKOFF_MAX_MS)
+                    logger.warning(f"AI insight request error ({e.__class__.__name__}), retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < max_attempts:
+                    delay = backoff_delay(attempt, BACKOFF_MIN_MS, BACKOFF_MAX_MS)
+                    logger.warning(f"AI insight API returned {response.status_code}, retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+
+                response.raise_for_status()
+                return response.json()['choices'][0]['message']['content']
+
+
+async def _request_insights(batches: List[List[Dict[str, Any]]],
+                            transport: Optional[httpx.AsyncBaseTransport] = None) -> List[Dict[int, str]]:
+    """
+    Answers for each batch, in order. Batches that fail or are still running
+    at the deadline come back empty.
+    """
+    async with InsightClient(transport=transport) as client:
+        tasks = [
+            asyncio.ensure_future(client.complete(build_prompt(batch), len(batch)))
+            for batch in batches
+        ]
+        await asyncio.wait(tasks, timeout=max(_setting('AI_INSIGHT_DEADLINE_SECONDS', 60), 1))
+
+        answers = []
+        for batch, task in zip(batches, tasks):
+            if not task.done():
+                task.cancel()
+                logger.warning(f"AI insight batch of {len(batch)} items missed the deadline")
+                answers.append({})
+            elif task.exception() is not None:
+                logger.error(f"AI insight batch of {len(batch)} items failed: {str(task.exception())}")
+                answers.append({})
+            else:
+                answers.append(parse_insights(task.result(), len(batch)))
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return answers
+
+
+def generate_insights(items: List[Dict[str, Any]],
+                      transport: Optional[httpx.AsyncBaseTransport] = None) -> List[str]:
+    """
+    An insight for each comparison in ``items``, in order: from the cache,
+    from the API, or the rule-based fallback.
+    """
+    hashes = [insight_hash(comparison_data) for comparison_data in items]
+    insights = {
+        input_hash: entry.insight
+        for input_hash, entry in AIInsightCache.objects.in_bulk(set(hashes), field_name='input_hash').items()
+    }
+
+    pending = {}
+    for input_hash, comparison_data in zip(hashes, items):
+        if input_hash not in insights:
+            pending.setdefault(input_hash, comparison_data)
+
+    if pending and insights_enabled():
+        batch_size = max(_setting('AI_INSIGHT_BATCH_SIZE', 10), 1)
+        max_batches = max(_setting('AI_INSIGHT_MAX_BATCHES', 20), 0)
+        pending_hashes = list(pending)
+        hash_batches = [
+            pending_hashes[start:start + batch_size]
+            for start in range(0, len(pending_hashes), batch_size)
+        ][:max_batches]
+        if len(hash_batches) * batch_size < len(pending_hashes):
+            logger.warning(
+                f"{len(pending_hashes) - len(hash_batches) * batch_size} AI insights over budget, using fallback"
+            )
+
+        answers = async_to_sync(_request_insights)(
+            [[pending[input_hash] for input_hash in batch] for batch in hash_batches], transport
+        )
+
+        model_name = insight_model()
+        generated = []
+        for batch, answer in zip(hash_batches, answers):
+            for number, input_hash in enumerate(batch, 1):
+                if number in answer:
+                    insights[input_hash] = answer[number]
+                    generated.append(AIInsightCache(input_hash=input_hash, insight=answer[number], model_name=model_name))
+        AIInsightCache.objects.bulk_create(generated, ignore_conflicts=True)
+
+    return [
+        insights[input_hash] if input_hash in insights else fallback_insight(comparison_data)
+        for input_hash, comparison_data in zip(hashes, items)
+    ]
@@ -207,4 +207,7 @@ def populate_disclosure_report_audit_trail(
         
         count += 1
     
+    engine_result.value_count = count
+    IFRSEngineResult.objects.filter(pk=engine_result.pk).update(value_count=count)
+    
     return count
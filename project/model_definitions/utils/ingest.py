@@ -0,0 +1,187 @@
+"""
+Helpers for creating data uploads in bulk
+"""
+import os
+import zipfile
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db import transaction
+from django.utils import timezone
+
+from model_definitions.models import DataUpload, DataUploadBatch, DataUploadIngestJob
+
+
+MAX_UPLOAD_FILE_SIZE = 50 * 1024 * 1024  # 50MB limit
+ALLOWED_UPLOAD_EXTENSIONS = ('.xlsx', '.xls')
+ARCHIVE_READ_CHUNK_SIZE = 1024 * 1024
+
+
+class ArchiveTooLarge(Exception):
+    pass
+
+
+def get_bulk_upload_max_items() -> int:
+    return getattr(settings, 'BULK_UPLOAD_MAX_ITEMS', 500)
+
+
+def get_bulk_ingest_max_archive_size() -> int:
+    return getattr(settings, 'BULK_INGEST_MAX_ARCHIVE_SIZE', 1024 * 1024 * 1024)
+
+
+def validate_upload_file(file) -> Optional[str]:
+    """
+    Return an error message for a file that cannot be stored as a data upload, or None.
+    """
+    if file.size > MAX_UPLOAD_FILE_SIZE:
+        return "File size cannot exceed 50MB"
+    if not file.name.lower().endswith(ALLOWED_UPLOAD_EXTENSIONS):
+        return "Only Excel files (.xlsx, .xls) are allowed"
+    return None
+
+
+def _extract_member(zip_file: zipfile.ZipFile, info: zipfile.ZipInfo, name: str) -> TemporaryUploadedFile:
+    """
+    Decompress one member in chunks into a temporary file on disk. The zip
+    reader stops at the member's declared size, and the copy is checked
+    against it as well.
+    """
+    extracted = TemporaryUploadedFile(name, 'application/octet-stream', info.file_size, None)
+    written = 0
+    try:
+        with zip_file.open(info) as member:
+            for chunk in iter(lambda: member.read(ARCHIVE_READ_CHUNK_SIZE), b''):
+                written += len(chunk)
+                if written > info.file_size:
+                    raise ArchiveTooLarge(f"'{name}' is larger than its declared size")
+                extracted.write(chunk)
+        extracted.seek(0)
+    except Exception:
+        extracted.close()
+        raise
+    return extracted
+
+
+def read_archive_files(archive, names: Iterable[str]) -> Dict[str, Any]:
+    """
+    Extract the members of a zip archive whose base filename is in ``names``
+    (the files a manifest references), keyed by that filename. Other members
+    are never decompressed.
+
+    Members are spooled to temporary files (removed when closed or garbage
+    collected) rather than held in memory. Members larger than the upload
+    size limit are not decompressed; they are returned as empty placeholders
+    carrying the declared size so validation can reject them. Raises
+    ``ArchiveTooLarge`` when the wanted members together would decompress to
+    more than ``BULK_INGEST_MAX_ARCHIVE_SIZE``.
+    """
+    wanted = set(names)
+    with zipfile.ZipFile(archive) as zip_file:
+        members = {}
+        for info in zip_file.infolist():
+            if info.is_dir() or info.filename.startswith('__MACOSX/'):
+                continue
+            name = os.path.basename(info.filename)
+            if name in wanted and not name.startswith('.'):
+                members[name] = info
+
+        total_size = sum(info.file_size for info in members.values() if info.file_size <= MAX_UPLOAD_FILE_SIZE)
+        max_archive_size = get_bulk_ingest_max_archive_size()
+        if total_size > max_archive_size:
+            raise ArchiveTooLarge(
+                f"Archive files would decompress to {total_size} bytes, more than the {max_archive_size} byte limit"
+            )
+
+        files = {}
+        try:
+            for name, info in members.items():
+                if info.file_size > MAX_UPLOAD_FILE_SIZE:
+                    placeholder = ContentFile(b'', name=name)
+                    placeholder.size = info.file_size
+                    files[name] = placeholder
+                else:
+                    files[name] = _extract_member(zip_file, info, name)
+        except Exception:
+            for file in files.values():
+                file.close()
+            raise
+    return files
+
+
+def bulk_create_uploads(
+    batch: DataUploadBatch,
+    uploads_data: List[Dict[str, Any]],
+    uploaded_by=None,
+    ingest_job: Optional[DataUploadIngestJob] = None,
+    batch_size: int = 500
+) -> List[DataUpload]:
+    """
+    Insert many uploads for one batch with a single ID allocation, chunked
+    ``bulk_create`` calls and one round of batch bookkeeping.
+
+    Files attached to the upload data are written to storage as the rows are inserted.
+    """
+    if not uploads_data:
+        return []
+
+    upload_ids = DataUpload.allocate_upload_ids(len(uploads_data))
+
+    uploads = []
+    for upload_id, upload_data in zip(upload_ids, uploads_data):
+        upload = DataUpload(
+            upload_id=upload_id,
+            batch=batch,
+            uploaded_by=uploaded_by,
+            ingest_job=ingest_job,
+            **upload_data
+        )
+        if upload.file_upload:
+            upload.original_filename = upload.file_upload.name
+            upload.file_size = upload.file_upload.size
+        uploads.append(upload)
+
+    with transaction.atomic():
+        DataUpload.objects.bulk_create(uploads, batch_size=batch_size)
+        batch.register_uploads(
+            added=len(uploads),
+            uploaded_document_types=[upload.data_type for upload in uploads if upload.file_upload]
+        )
+
+    # Not every backend returns primary keys from bulk_create, so reload the rows once.
+    created = DataUpload.objects.in_bulk(upload_ids, field_name='upload_id')
+    return [created[upload_id] for upload_id in upload_ids]
+
+
+def run_ingest_job(
+    batch: DataUploadBatch,
+    uploads_data: List[Dict[str, Any]],
+    created_by=None
+) -> DataUploadIngestJob:
+    """
+    Record an ingest job for a validated manifest and create its uploads.
+
+    The job row is committed before the uploads are inserted so a failed ingest
+    still leaves a job handle carrying the error.
+    """
+    job = DataUploadIngestJob.objects.create(
+        batch=batch,
+        total_items=len(uploads_data),
+        created_by=created_by
+    )
+
+    try:
+        uploads = bulk_create_uploads(batch, uploads_data, uploaded_by=created_by, ingest_job=job)
+    except Exception as e:
+        job.status = 'failed'
+        job.errors = [str(e)]
+        job.completed_at = timezone.now()
+        job.save(update_fields=['status', 'errors', 'completed_at', 'modified_on'])
+        raise
+
+    job.status = 'completed'
+    job.created_count = len(uploads)
+    job.completed_at = timezone.now()
+    job.save(update_fields=['status', 'created_count', 'completed_at', 'modified_on'])
+    return job
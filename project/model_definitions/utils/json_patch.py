@@ -0,0 +1,100 @@
+"""
+Minimal JSON Patch (RFC 6902) support for model definition history deltas.
+
+Only ``add``, ``remove`` and ``replace`` are produced and understood. Lists
+of equal length are diffed element by element; any other list change
+replaces the list as a whole, which keeps patches small for the common edit
+(changing a value inside an assumption or formula) without a full LCS diff.
+"""
+import copy
+import hashlib
+import json
+from typing import Any, Dict, List
+
+
+def _canonical(config: Any) -> bytes:
+    return json.dumps(config, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def config_hash(config: Any) -> str:
+    """
+    Content hash of a config, independent of key order.
+    """
+    return hashlib.sha256(_canonical(config)).hexdigest()
+
+
+def config_size(config: Any) -> int:
+    return len(_canonical(config))
+
+
+def _escape(token) -> str:
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def make_patch(source: Any, target: Any, path: str = '') -> List[Dict[str, Any]]:
+    """
+    Operations turning ``source`` into ``target``.
+    """
+    if isinstance(source, dict) and isinstance(target, dict):
+        operations = []
+        for key in source:
+            if key not in target:
+                operations.append({'op': 'remove', 'path': f"{path}/{_escape(key)}"})
+        for key, value in target.items():
+            child_path = f"{path}/{_escape(key)}"
+            if key not in source:
+                operations.append({'op': 'add', 'path': child_path, 'value': value})
+            else:
+                operations.extend(make_patch(source[key], value, child_path))
+        return operations
+
+    if isinstance(source, list) and isinstance(target, list) and len(source) == len(target):
+        operations = []
+        for index, (old, new) in enumerate(zip(source, target)):
+            operations.extend(make_patch(old, new, f"{path}/{index}"))
+        return operations
+
+    if type(source) is type(target) and source == target:
+        return []
+    return [{'op': 'replace', 'path': path, 'value': target}]
+
+
+def apply_patch(document: Any, operations: List[Dict[str, Any]], in_place: bool = False) -> Any:
+    """
+    Apply ``operations`` to ``document`` and return the result.
+    """
+    if not in_place:
+        document = copy.deepcopy(document)
+
+    for operation in operations:
+        path = operation['path']
+        if path == '':
+            document = copy.deepcopy(operation.get('value'))
+            continue
+
+        tokens = [_unescape(token) for token in path.split('/')[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+
+        last = tokens[-1]
+        op = operation['op']
+        if isinstance(parent, list):
+            index = len(parent) if last == '-' else int(last)
+            if op == 'add':
+                parent.insert(index, copy.deepcopy(operation['value']))
+            elif op == 'remove':
+                del parent[index]
+            else:
+                parent[index] = copy.deepcopy(operation['value'])
+        else:
+            if op == 'remove':
+                del parent[last]
+            else:
+                parent[last] = copy.deepcopy(operation['value'])
+
+    return document
@@ -0,0 +1,190 @@
+"""
+Per-run summaries of ``IFRSEngineResult`` rows for the audit landing page.
+
+Runs are grouped in the database (one row per ``run_id``, newest first) and
+only the runs on the requested page are expanded into their report types and
+the attributes of their latest result. On PostgreSQL the report types come
+back with the grouped query via ``ArrayAgg``; elsewhere they take one extra
+query per page.
+
+The same figures are kept on the ``Run`` rows by ``refresh_run_summaries``;
+the runs listing reads them from there when AUDIT_RUN_SUMMARIES is on.
+"""
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Q
+
+from model_definitions.models import IFRSEngineResult, Run
+
+REFRESH_CHUNK_SIZE = 500
+
+
+def run_summaries_enabled() -> bool:
+    return getattr(settings, 'AUDIT_RUN_SUMMARIES', False)
+
+
+def _is_postgres() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def run_status(result_status: str) -> str:
+    return 'Final' if result_status == 'Success' else 'Draft'
+
+
+def filter_results(queryset, params):
+    """
+    Apply the period / model filters of the runs endpoint to engine results
+    (or runs, which use the same field names).
+    """
+    for param in ('year', 'quarter', 'model_type', 'currency'):
+        value = params.get(param)
+        if value:
+            queryset = queryset.filter(**{param: value})
+    return queryset
+
+
+def grouped_runs(results):
+    """
+    One row per run: ``run_id``, ``execution_date``, ``first_result_at``,
+    ``result_count`` and ``error_count``, newest run first, plus
+    ``report_types`` on PostgreSQL.
+    """
+    annotations = {
+        'execution_date': Max('created_at'),
+        'first_result_at': Min('created_at'),
+        'result_count': Count('id'),
+        'error_count': Count('id', filter=Q(status='Error')),
+    }
+    if _is_postgres():
+        from django.contrib.postgres.aggregates import ArrayAgg
+        annotations['report_types'] = ArrayAgg('report_type', distinct=True, ordering='report_type')
+
+    return results.order_by().values('run_id').annotate(**annotations).order_by('-execution_date', 'run_id')
+
+
+def expand_runs(results, runs: List[Dict]) -> List[Dict]:
+    """
+    Fill in the latest-result attributes and report types of grouped ``runs``.
+    """
+    run_ids = [run['run_id'] for run in runs]
+    if not run_ids:
+        return []
+
+    page_results = results.filter(run_id__in=run_ids)
+    latest_rows = page_results.order_by('run_id', '-created_at', '-id').values(
+        'run_id', 'year', 'quarter', 'model_type', 'currency', 'status'
+    )
+    if _is_postgres():
+        latest_rows = latest_rows.distinct('run_id')
+    latest = {}
+    for row in latest_rows:
+        latest.setdefault(row['run_id'], row)
+
+    report_types: Dict[str, List[str]] = {}
+    if runs and 'report_types' not in runs[0]:
+        pairs = page_results.order_by('run_id', 'report_type').values_list('run_id', 'report_type').distinct()
+        for run_id, report_type in pairs:
+            report_types.setdefault(run_id, []).append(report_type)
+
+    summaries = []
+    for run in runs:
+        row = latest.get(run['run_id'])
+        if row is None:
+            continue
+        summaries.append({
+            'run_id': run['run_id'],
+            'year': row['year'],
+            'quarter': row['quarter'],
+            'model_type': row['model_type'],
+            'currency': row['currency'],
+            'status': row['status'],
+            'execution_date': run['execution_date'],
+            'first_result_at': run['first_result_at'],
+            'result_count': run['result_count'],
+            'error_count': run['error_count'],
+            'report_types': list(run.get('report_types') or report_types.get(run['run_id'], [])),
+        })
+    return summaries
+
+
+def summary_representation(summary) -> Dict:
+    """
+    Shape a run summary (dict or ``Run``) for ``RunSummarySerializer``.
+    """
+    if isinstance(summary, Run):
+        summary = {
+            'run_id': summary.run_id,
+            'year': summary.year,
+            'quarter': summary.quarter,
+            'model_type': summary.model_type,
+            'currency': summary.currency,
+            'status': summary.status,
+            'execution_date': summary.execution_date,
+            'report_types': summary.report_types,
+        }
+    return {
+        'run_id': summary['run_id'],
+        'period': f"{summary['year']} {summary['quarter']}",
+        'legal_entity': 'Default Entity',  # TODO: Get from config
+        'currency': summary['currency'] or 'USD',
+        'status': run_status(summary['status']),
+        'execution_date': summary['execution_date'],
+        'model_type': summary['model_type'],
+        'available_reports': summary['report_types'],
+    }
+
+
+SUMMARY_FIELDS = [
+    'year', 'quarter', 'model_type', 'currency', 'status', 'started_at', 'completed_at',
+    'execution_date', 'result_count', 'error_count', 'report_types',
+]
+
+
+def _apply_summary(run: Run, summary: Optional[Dict]):
+    if summary is None:
+        # Every result of the run is gone; keep the run, drop what was derived from them
+        run.result_count = 0
+        run.error_count = 0
+        run.report_types = []
+        return
+    for field in ('year', 'quarter', 'model_type', 'currency', 'status', 'execution_date',
+                  'result_count', 'error_count', 'report_types'):
+        setattr(run, field, summary[field])
+    if run.started_at is None or run.started_at > summary['first_result_at']:
+        run.started_at = summary['first_result_at']
+    run.completed_at = summary['execution_date']
+
+
+def refresh_run_summaries(run_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Recompute the summary columns of the ``Run`` rows of ``run_ids`` (or of
+    every run that has results, when None), creating missing runs. Returns
+    the number of runs written.
+    """
+    results = IFRSEngineResult.objects.all()
+    if run_ids is None:
+        run_ids = list(results.order_by('run_id').values_list('run_id', flat=True).distinct())
+    else:
+        run_ids = list(dict.fromkeys(run_id for run_id in run_ids if run_id))
+
+    written = 0
+    with transaction.atomic():
+        for start in range(0, len(run_ids), REFRESH_CHUNK_SIZE):
+            chunk = run_ids[start:start + REFRESH_CHUNK_SIZE]
+            summaries = {
+                summary['run_id']: summary
+                for summary in expand_runs(results, list(grouped_runs(results.filter(run_id__in=chunk))))
+            }
+            runs = Run.objects.in_bulk(chunk, field_name='run_id')
+            created = [Run(run_id=run_id) for run_id in chunk if run_id not in runs and run_id in summaries]
+            for run in created:
+                _apply_summary(run, summaries[run.run_id])
+            Run.objects.bulk_create(created)
+
+            for run_id, run in runs.items():
+                _apply_summary(run, summaries.get(run_id))
+            Run.objects.bulk_update(list(runs.values()), SUMMARY_FIELDS)
+            written += len(created) + len(runs)
+    return written
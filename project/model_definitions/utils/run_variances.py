@@ -0,0 +1,114 @@
+"""
+Set-based comparison of every ``CalculationValue`` of two runs.
+
+Both runs' values are read in one grouped query keyed by ``value_id``, with
+conditional aggregates picking each run's amount. That query acts as a full
+outer join: lines present in only one run come back as ``added`` or
+``removed``. Changes, thresholds and ranking are all computed in the database,
+so the page returned is the only thing that reaches Python.
+"""
+from decimal import Decimal
+from typing import Optional
+
+from django.db.models import (
+    Case, CharField, Count, DecimalField, F, FloatField, Max, Q, Value, When,
+)
+from django.db.models.functions import Abs, Cast, Coalesce
+
+from model_definitions.models import CalculationValue
+
+CHANGE_TYPES = ['added', 'removed', 'changed', 'unchanged']
+ORDERINGS = {
+    'absolute': ['-abs_change', 'value_id'],
+    'percentage': [F('abs_percentage_change').desc(nulls_first=True), '-abs_change', 'value_id'],
+    'value_id': ['value_id'],
+}
+
+
+def value_variances(current_run_id: str, prior_run_id: str, report_type: Optional[str] = None):
+    """
+    One row per ``value_id`` found in either run, with both amounts, the
+    absolute and percentage change, and a ``change_type``.
+    """
+    values = CalculationValue.objects.filter(run_id__in=[current_run_id, prior_run_id])
+    if report_type:
+        values = values.filter(report_type=report_type)
+
+    in_current = Q(run_id=current_run_id)
+    in_prior = Q(run_id=prior_run_id)
+    amount = DecimalField(max_digits=21, decimal_places=2)
+    zero = Value(Decimal('0'), output_field=amount)
+
+    return values.order_by().values('value_id').annotate(
+        value_label=Max('label'),
+        value_report_type=Max('report_type'),
+        value_unit=Max('unit'),
+        value_line_of_business=Max('line_of_business'),
+        current_value=Max('value', filter=in_current),
+        prior_value=Max('value', filter=in_prior),
+        current_count=Count('id', filter=in_current),
+        prior_count=Count('id', filter=in_prior),
+    ).annotate(
+        absolute_change=Cast(
+            Coalesce(F('current_value'), zero) - Coalesce(F('prior_value'), zero), output_field=amount
+        ),
+    ).annotate(
+        abs_change=Abs('absolute_change'),
+        percentage_change=Case(
+            When(Q(prior_value__isnull=True) | Q(prior_value=0), then=Value(None)),
+            default=Cast('absolute_change', FloatField()) * 100.0 / Cast('prior_value', FloatField()),
+            output_field=FloatField(),
+        ),
+        change_type=Case(
+            When(prior_count=0, then=Value('added')),
+            When(current_count=0, then=Value('removed')),
+            When(absolute_change=0, then=Value('unchanged')),
+            default=Value('changed'),
+            output_field=CharField(),
+        ),
+    ).annotate(
+        abs_percentage_change=Abs('percentage_change'),
+    )
+
+
+def apply_thresholds(variances, min_abs_change: Optional[Decimal] = None,
+                     min_pct_change: Optional[float] = None, include_unchanged: bool = False):
+    """
+    Keep lines whose change reaches either threshold. A line without a
+    percentage change (added, removed, or from zero) always reaches the
+    percentage threshold.
+    """
+    if not include_unchanged:
+        variances = variances.exclude(change_type='unchanged')
+
+    breaches = Q()
+    if min_abs_change is not None:
+        breaches |= Q(abs_change__gte=min_abs_change)
+    if min_pct_change is not None:
+        breaches |= Q(abs_percentage_change__gte=min_pct_change) | Q(percentage_change__isnull=True)
+    return variances.filter(breaches) if breaches else variances
+
+
+def variance_totals(variances):
+    """
+    Number of lines per change type in ``variances``.
+    """
+    return variances.aggregate(**{
+        change_type: Count('value_id', filter=Q(change_type=change_type))
+        for change_type in CHANGE_TYPES
+    })
+
+
+def variance_representation(row) -> dict:
+    return {
+        'value_id': row['value_id'],
+        'label': row['value_label'],
+        'report_type': row['value_report_type'],
+        'unit': row['value_unit'],
+        'line_of_business': row['value_line_of_business'],
+        'current_value': row['current_value'],
+        'prior_value': row['prior_value'],
+        'absolute_change': row['absolute_change'],
+        'percentage_change': row['percentage_change'],
+        'change_type': row['change_type'],
+    }
@@ -77,3 +77,37 @@ CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=[
 ])
 
 OPENAI_API_KEY = env("OPENAI_API_KEY", default="")
+
+# Upper bound on upload descriptors accepted by a single bulk_upload / bulk_ingest call
+BULK_UPLOAD_MAX_ITEMS = env.int("BULK_UPLOAD_MAX_ITEMS", default=500)
+
+# Upper bound on the total uncompressed size of the archive members a bulk_ingest manifest references
+BULK_INGEST_MAX_ARCHIVE_SIZE = env.int("BULK_INGEST_MAX_ARCHIVE_SIZE", default=1024 * 1024 * 1024)
+
+# Number of API sources run_api_scheduler fetches at the same time
+API_SCHEDULER_MAX_CONCURRENCY = env.int("API_SCHEDULER_MAX_CONCURRENCY", default=8)
+
+# API responses larger than this (or of unknown length) are parsed incrementally
+CONNECTOR_STREAM_THRESHOLD_BYTES = env.int("CONNECTOR_STREAM_THRESHOLD_BYTES", default=8 * 1024 * 1024)
+
+# Compressed NDJSON segments of fetched API pages and offloaded payloads
+RAW_LANDING_ROOT = env("RAW_LANDING_ROOT", default=os.path.join(MEDIA_ROOT, 'raw_landing'))
+RAW_LANDING_COMPRESSION = env("RAW_LANDING_COMPRESSION", default="gzip")
+
+# Model definition history keeps a full config every N versions and JSON patches in between
+MODEL_HISTORY_SNAPSHOT_INTERVAL = env.int("MODEL_HISTORY_SNAPSHOT_INTERVAL", default=20)
+
+# Serve the audit runs listing from the summary columns on runs instead of aggregating results
+AUDIT_RUN_SUMMARIES = env.bool("AUDIT_RUN_SUMMARIES", default=False)
+
+# Variance insights: OpenAI-compatible chat completions endpoint (point it at a stub server to test)
+AI_INSIGHT_API_BASE = env("AI_INSIGHT_API_BASE", default="https://api.openai.com/v1")
+AI_INSIGHT_MODEL = env("AI_INSIGHT_MODEL", default="gpt-4o-mini")
+# Variances per prompt, prompts in flight at once, and retries / timeout per prompt
+AI_INSIGHT_BATCH_SIZE = env.int("AI_INSIGHT_BATCH_SIZE", default=10)
+AI_INSIGHT_MAX_CONCURRENCY = env.int("AI_INSIGHT_MAX_CONCURRENCY", default=4)
+AI_INSIGHT_MAX_RETRIES = env.int("AI_INSIGHT_MAX_RETRIES", default=2)
+AI_INSIGHT_TIMEOUT_SECONDS = env.int("AI_INSIGHT_TIMEOUT_SECONDS", default=30)
+# Budget per call; variances beyond it get the rule-based insight
+AI_INSIGHT_MAX_BATCHES = env.int("AI_INSIGHT_MAX_BATCHES", default=20)
+AI_INSIGHT_DEADLINE_SECONDS = env.int("AI_INSIGHT_DEADLINE_SECONDS", default=60)
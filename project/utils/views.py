@@ -0,0 +1,184 @@
+import base64
+import json
+import logging
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIST_QUERY_BUDGET = 10
+
+
+class RelationLoadingMixin:
+    """
+    Lets a viewset declare the relations its serializers follow, so they are
+    loaded with the queryset rather than once per row.
+
+    With ``DEBUG`` on, list requests are counted against ``list_query_budget``
+    and a warning is logged when a page needs more queries than that, which
+    is how a relation missing from the declaration shows up.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    list_query_budget = getattr(settings, 'LIST_QUERY_BUDGET', DEFAULT_LIST_QUERY_BUDGET)
+
+    def get_queryset(self):
+        return self.load_relations(super().get_queryset())
+
+    def load_relations(self, queryset):
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+    def dispatch(self, request, *args, **kwargs):
+        if not settings.DEBUG or self.list_query_budget is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = super().dispatch(request, *args, **kwargs)
+
+        if getattr(self, 'action', None) == 'list':
+            response['X-Query-Count'] = str(len(queries))
+            if len(queries) > self.list_query_budget:
+                logger.warning(
+                    f"{self.__class__.__name__} list ran {len(queries)} queries "
+                    f"(budget {self.list_query_budget}) for {request.get_full_path()}"
+                )
+        return response
+
+
+class KeysetPaginationMixin:
+    """
+    Cursor pagination for ``list`` over ``keyset_ordering``, which must be a
+    unique ordering such as ``('-created_at', '-id')``. Each page is read with
+    a range condition on the last row of the previous one instead of an
+    OFFSET, so deep pages cost the same as the first, and no COUNT runs
+    unless ``count=exact`` or ``count=estimate`` (the planner's row estimate
+    on PostgreSQL, an exact count elsewhere) is asked for.
+
+    Only requests with a ``cursor`` parameter (empty for the first page) are
+    paginated this way; ``keyset_response`` returns None for the others so
+    the viewset can keep serving page numbers. The cursor ordering replaces
+    any ``ordering`` parameter.
+    """
+    keyset_ordering = ('-id',)
+    keyset_page_size = 12
+    keyset_max_page_size = 500
+
+    def _keyset_fields(self, queryset, reverse=False):
+        fields = []
+        for name in self.keyset_ordering:
+            descending = name.startswith('-')
+            field = queryset.model._meta.get_field(name.lstrip('-'))
+            fields.append((field, descending != reverse))
+        return fields
+
+    def _encode_cursor(self, row, fields, reverse):
+        values = []
+        for field, _ in fields:
+            value = getattr(row, field.attname)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        token = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(token.encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, cursor, queryset):
+        """
+        ``(values, reverse)`` of a cursor, or ``(None, False)`` for the first page.
+        """
+        if not cursor:
+            return None, False
+        try:
+            token = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            values = token['v']
+            reverse = bool(token.get('r'))
+        except (ValueError, TypeError, KeyError):
+            raise ValueError("Invalid cursor")
+        fields = self._keyset_fields(queryset)
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise ValueError("Invalid cursor")
+        return [field.to_python(value) for (field, _), value in zip(fields, values)], reverse
+
+    def _after(self, fields, values):
+        condition = Q()
+        for index, (field, descending) in enumerate(fields):
+            term = Q(**{f"{field.name}__{'lt' if descending else 'gt'}": values[index]})
+            for (previous_field, _), previous_value in zip(fields[:index], values[:index]):
+                term &= Q(**{previous_field.name: previous_value})
+            condition |= term
+        return condition
+
+    def estimate_count(self, queryset):
+        queryset = queryset.order_by()
+        db_connection = connections[queryset.db]
+        if db_connection.vendor != 'postgresql':
+            return queryset.count()
+
+        sql, params = queryset.query.sql_with_params()
+        with db_connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def keyset_response(self, request, queryset):
+        if 'cursor' not in request.query_params:
+            return None
+
+        try:
+            page_size = int(request.query_params.get('page_size', self.keyset_page_size))
+            page_size = min(max(page_size, 1), self.keyset_max_page_size)
+            values, reverse = self._decode_cursor(request.query_params['cursor'], queryset)
+        except (ValueError, TypeError):
+            return Response({
+                'detail': 'cursor is invalid or page_size is not an integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        fields = self._keyset_fields(queryset, reverse=reverse)
+        page = queryset.order_by(*[f"{'-' if descending else ''}{field.name}" for field, descending in fields])
+        if values is not None:
+            page = page.filter(self._after(fields, values))
+        rows = list(page[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = values is not None if reverse else has_more
+        has_previous = has_more if reverse else values is not None
+
+        forward_fields = self._keyset_fields(queryset)
+        query = request.query_params.copy()
+        query.pop('page', None)
+        query['page_size'] = page_size
+        next_link = None
+        previous_link = None
+        if rows and has_next:
+            query['cursor'] = self._encode_cursor(rows[-1], forward_fields, reverse=False)
+            next_link = f"?{query.urlencode()}"
+        if rows and has_previous:
+            query['cursor'] = self._encode_cursor(rows[0], forward_fields, reverse=True)
+            previous_link = f"?{query.urlencode()}"
+
+        count_mode = request.query_params.get('count')
+        if count_mode == 'exact':
+            count = queryset.count()
+        elif count_mode == 'estimate':
+            count = self.estimate_count(queryset)
+        else:
+            count = None
+
+        serializer = self.get_serializer(rows, many=True)
+        return Response({
+            'count': count,
+            'next': next_link,
+            'previous': previous_link,
+            'results': serializer.data
+        })